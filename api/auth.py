@@ -8,6 +8,8 @@ from flask_login import login_user, current_user
 from marshmallow import Schema, fields, ValidationError
 from api import api
 from app.models.user import User
+from app.services import password_service
+from app.services.transaction import transaction
 
 class LoginSchema(Schema):
     email = fields.Email(required=True)
@@ -39,10 +41,17 @@ class LoginResource(Resource):
         if not user.is_active:
             return {'message': 'Account is deactivated'}, 401
         
-        if not user.check_password(data['password']):
+        try:
+            valid = password_service.check_login(user, data['password'])
+        except password_service.PasswordHashingBusy:
+            return {'message': 'Too many logins right now, please retry'}, 503, {'Retry-After': '1'}
+        
+        if not valid:
             return {'message': 'Invalid email or password'}, 401
         
-        user.update_last_login()
+        # Commits an upgraded password hash too
+        with transaction():
+            user.update_last_login()
         
         return {
             'message': 'Login successful',
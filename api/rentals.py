@@ -9,6 +9,9 @@ from marshmallow import Schema, fields, ValidationError
 from api import api
 from app.models.rental import Rental
 from app.models.scooter import Scooter
+from app.models.serializers import rental_serializer
+from app.services import rental_service
+from app.utils.pagination import keyset_paginate
 
 class StartRentalSchema(Schema):
     scooter_id = fields.Int(required=True)
@@ -33,18 +36,23 @@ class RentalListResource(Resource):
         """Get rentals"""
         status = request.args.get('status')
         limit = request.args.get('limit', 100, type=int)
+        cursor = request.args.get('cursor')
         
-        if current_user.is_admin():
-            query = Rental.query
-        else:
-            query = Rental.query.filter(Rental.user == current_user)
+        query = rental_serializer.query()
+        
+        if not current_user.is_admin():
+            query = query.filter(Rental.user_id == current_user.id)
         
         if status:
             query = query.filter(Rental.status == status)
         
-        rentals = list(query.order_by(Rental.created_at.desc()).limit(limit))
+        try:
+            rows, next_cursor = keyset_paginate(query, Rental, cursor, limit)
+        except ValueError as err:
+            return {'message': str(err)}, 400
         
-        return [r.to_dict() for r in rentals], 200
+        headers = {'X-Next-Cursor': next_cursor} if next_cursor else {}
+        return rental_serializer.dump_all(rows), 200, headers
     
     @login_required
     def post(self):
@@ -54,11 +62,6 @@ class RentalListResource(Resource):
         except ValidationError as err:
             return {'errors': err.messages}, 400
         
-        # Check if user has active rental
-        active_rental = Rental.query.filter_by(user_id=current_user.id, status='active').first()
-        if active_rental:
-            return {'message': 'User already has an active rental'}, 400
-        
         # Get scooter
         scooter = Scooter.query.get(data['scooter_id'])
         if not scooter:
@@ -68,26 +71,22 @@ class RentalListResource(Resource):
         if current_user.is_provider() and scooter.provider_id == current_user.id:
             return {'message': 'Providers cannot rent their own scooters'}, 400
         
-        if not scooter.is_available():
-            return {'message': 'Scooter is not available'}, 400
-        
+        # Availability and active rentals are checked atomically by the service
         try:
-            from app import db
-            rental = Rental(
-                user_id=current_user.id,
-                scooter_id=scooter.id,
-                start_latitude=data['start_latitude'],
-                start_longitude=data['start_longitude']
+            rental = rental_service.start_rental(
+                current_user.id,
+                scooter.id,
+                data['start_latitude'],
+                data['start_longitude']
             )
-            db.session.add(rental)
-            db.session.commit()
-            
-            rental.start_rental()
-            
-            return rental.to_dict(include_sensitive=True), 201
-            
+        except rental_service.ScooterNotFound as e:
+            return {'message': str(e)}, 404
+        except rental_service.RentalError as e:
+            return {'message': str(e)}, 400
         except Exception as e:
             return {'message': f'Error starting rental: {str(e)}'}, 400
+        
+        return rental.to_dict(include_sensitive=True), 201
 
 class RentalResource(Resource):
     @login_required
@@ -116,7 +115,7 @@ class EndRentalResource(Resource):
         except Rental.DoesNotExist:
             return {'message': 'Rental not found'}, 404
         
-        if rental.status != 'active':
+        if not rental.is_open():
             return {'message': 'Rental is not active'}, 400
         
         if not current_user.is_admin() and rental.user.id != current_user.id:
@@ -128,7 +127,8 @@ class EndRentalResource(Resource):
             return {'errors': err.messages}, 400
         
         try:
-            rental.end_rental(
+            rental_service.end_rental(
+                rental,
                 data.get('end_latitude'),
                 data.get('end_longitude')
             )
@@ -147,7 +147,7 @@ class CancelRentalResource(Resource):
         except Rental.DoesNotExist:
             return {'message': 'Rental not found'}, 404
         
-        if rental.status != 'active':
+        if not rental.is_open():
             return {'message': 'Only active rentals can be cancelled'}, 400
         
         if not current_user.is_admin() and rental.user.id != current_user.id:
@@ -157,7 +157,7 @@ class CancelRentalResource(Resource):
         reason = data.get('reason')
         
         try:
-            rental.cancel_rental(reason)
+            rental_service.cancel_rental(rental, reason)
             return rental.to_dict(include_sensitive=True), 200
         except Exception as e:
             return {'message': f'Error cancelling rental: {str(e)}'}, 400
@@ -180,7 +180,7 @@ class RateRentalResource(Resource):
             return {'errors': err.messages}, 400
         
         try:
-            rental.add_rating(data['rating'], data.get('feedback'))
+            rental_service.rate_rental(rental, data['rating'], data.get('feedback'))
             return {'message': 'Rating added successfully'}, 200
         except Exception as e:
             return {'message': f'Error adding rating: {str(e)}'}, 400
@@ -190,7 +190,7 @@ class ActiveRentalsResource(Resource):
     def get(self):
         """Get active rentals"""
         if current_user.is_admin():
-            rentals = list(Rental.query.filter(Rental.status == 'active'))
+            rentals = list(Rental.with_related().filter(Rental.status.in_(Rental.OPEN_STATUSES)))
         else:
             try:
                 rental = Rental.get(
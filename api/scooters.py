@@ -8,6 +8,13 @@ from flask_login import current_user, login_required
 from marshmallow import Schema, fields, ValidationError
 from api import api
 from app.models.scooter import Scooter
+from app.models.serializers import scooter_serializer
+from app.services.availability_service import availability_cache, public_state
+from app.services.scooter_service import scooter_changed
+from app.services.transaction import transaction
+from app.utils.distance import haversine_many, pack_coordinates
+from app.utils.geo_index import scooter_index
+from app.utils.pagination import keyset_paginate
 
 class ScooterSchema(Schema):
     identifier = fields.Str(required=True)
@@ -26,15 +33,20 @@ class ScooterListResource(Resource):
         """Get all scooters"""
         status = request.args.get('status')
         limit = request.args.get('limit', 100, type=int)
+        cursor = request.args.get('cursor')
         
-        query = Scooter.query
+        query = scooter_serializer.query()
         
         if status:
             query = query.filter(Scooter.status == status)
         
-        scooters = list(query.limit(limit))
+        try:
+            rows, next_cursor = keyset_paginate(query, Scooter, cursor, limit)
+        except ValueError as err:
+            return {'message': str(err)}, 400
         
-        return [s.to_dict() for s in scooters], 200
+        headers = {'X-Next-Cursor': next_cursor} if next_cursor else {}
+        return scooter_serializer.dump_all(rows), 200, headers
     
     @login_required
     def post(self):
@@ -101,16 +113,14 @@ class ScooterResource(Resource):
         
         allowed_fields = ['model', 'brand', 'address', 'battery_level']
         
-        for field in allowed_fields:
-            if field in data:
-                setattr(scooter, field, data[field])
-        
         try:
-            from app import db
-            db.session.commit()
+            with transaction():
+                for field in allowed_fields:
+                    if field in data:
+                        setattr(scooter, field, data[field])
+                scooter_changed(scooter)
             return scooter.to_dict(include_sensitive=True), 200
         except Exception as e:
-            db.session.rollback()
             return {'message': f'Error updating scooter: {str(e)}'}, 400
     
     @login_required
@@ -139,11 +149,9 @@ class AvailableScootersResource(Resource):
         """Get available scooters"""
         limit = request.args.get('limit', 100, type=int)
         
-        scooters = list(Scooter.query.filter(
-            (Scooter.status == 'available') & (Scooter.battery_level > 15)
-        ).limit(limit))
+        scooters = availability_cache.available(min_battery=15, limit=limit)
         
-        return [s.to_dict() for s in scooters], 200
+        return [public_state(scooter) for scooter in scooters], 200
 
 class NearbyScootersResource(Resource):
     @login_required
@@ -157,19 +165,36 @@ class NearbyScootersResource(Resource):
         if latitude is None or longitude is None:
             return {'message': 'Latitude and longitude are required'}, 400
         
-        # Simple bounding box search
-        lat_delta = radius / 111.0
-        lon_delta = radius / (111.0 * abs(latitude))
-        
-        scooters = list(Scooter.query.filter(
-            (Scooter.latitude.between(latitude - lat_delta, latitude + lat_delta)) &
-            (Scooter.longitude.between(longitude - lon_delta, longitude + lon_delta)) &
-            (Scooter.status == 'available')
-        ).limit(limit))
-        
-        # Calculate actual distances
-        for scooter in scooters:
-            scooter.distance = scooter.distance_from(latitude, longitude)
+        if scooter_index.is_warm:
+            hits = scooter_index.within_radius(latitude, longitude, radius)
+            
+            # The index only answers the spatial part, the rows still come from the database;
+            # hits that are no longer available are skipped, so walk on until limit are found
+            scooters = []
+            start, batch = 0, limit
+            while len(scooters) < limit and start < len(hits):
+                distances = {scooter_id: distance for distance, scooter_id in hits[start:start + batch]}
+                found = Scooter.query.filter(
+                    Scooter.id.in_(list(distances)),
+                    Scooter.status == 'available'
+                ).all()
+                for scooter in found:
+                    scooter.distance = distances[scooter.id]
+                scooters.extend(found)
+                start, batch = start + batch, batch * 2
+            scooters.sort(key=lambda s: s.distance)
+            scooters = scooters[:limit]
+        else:
+            # Bounding box search while the index is cold
+            scooters = Scooter.nearby_query(latitude, longitude, radius).limit(limit).all()
+            
+            # Calculate actual distances in one batch
+            lats, lons = pack_coordinates((s.latitude, s.longitude) for s in scooters)
+            for scooter, distance in zip(scooters, haversine_many(lats, lons, latitude, longitude)):
+                scooter.distance = float(distance)
+            scooters = [s for s in scooters if s.distance <= radius]
+            
+            Scooter.rebuild_index()
         
         # Sort by distance
         scooters.sort(key=lambda s: s.distance)
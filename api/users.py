@@ -8,6 +8,8 @@ from flask_login import current_user, login_required
 from marshmallow import Schema, fields, ValidationError
 from api import api
 from app.models.user import User
+from app.models.serializers import user_serializer
+from app.utils.pagination import keyset_paginate
 
 class UpdateProfileSchema(Schema):
     first_name = fields.Str()
@@ -30,15 +32,20 @@ class UserListResource(Resource):
         
         role = request.args.get('role')
         limit = request.args.get('limit', 100, type=int)
+        cursor = request.args.get('cursor')
         
-        query = User.query
+        query = user_serializer.query()
         
         if role:
-            query = query.filter_by(role=role)
+            query = query.filter(User.role == role)
         
-        users = query.limit(limit).all()
+        try:
+            rows, next_cursor = keyset_paginate(query, User, cursor, limit)
+        except ValueError as err:
+            return {'message': str(err)}, 400
         
-        return [u.to_dict() for u in users], 200
+        headers = {'X-Next-Cursor': next_cursor} if next_cursor else {}
+        return user_serializer.dump_all(rows), 200, headers
 
 class UserResource(Resource):
     @login_required
@@ -4,16 +4,16 @@ Lean E-Scooter Rental Platform
 """
 
 import os
+import click
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_login import LoginManager
 from flask_mail import Mail
 from flask_jwt_extended import JWTManager
+from app.utils.db_routing import RoutingSession
 
 # Initialize extensions
-db = SQLAlchemy()
-migrate = Migrate()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 login_manager = LoginManager()
 mail = Mail()
 jwt = JWTManager()
@@ -29,26 +29,114 @@ def create_app(config_name=None):
     app = Flask(__name__)
     app.config.from_object(config[config_name])
     
-    # Debug: Log which config is being used
+    # Log which config and database are used, without the password
+    from sqlalchemy.engine import make_url
+    database_url = make_url(app.config['SQLALCHEMY_DATABASE_URI']).render_as_string(hide_password=True)
     app.logger.info(f"Using config: {config_name}")
-    app.logger.info(f"Database URL: {app.config['SQLALCHEMY_DATABASE_URI']}")
+    app.logger.info(f"Database URL: {database_url}")
+    
+    # Pooled engines record checkout metrics
+    engine_options = app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    if 'pool_size' in engine_options and 'poolclass' not in engine_options:
+        from app.utils.db_pool import InstrumentedQueuePool
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = dict(engine_options, poolclass=InstrumentedQueuePool)
     
     # Initialize extensions
     db.init_app(app)
-    migrate.init_app(app, db)
     login_manager.init_app(app)
     mail.init_app(app)
     jwt.init_app(app)
     
+    # Configure nearby search index
+    from app.utils.geo_index import scooter_index
+    scooter_index.configure(
+        cell_size=app.config.get('SCOOTER_INDEX_CELL_SIZE'),
+        max_age=app.config.get('SCOOTER_INDEX_MAX_AGE')
+    )
+    
+    # Configure admin dashboard cache
+    from app.services.dashboard_service import fleet_summary_cache
+    fleet_summary_cache.ttl = app.config.get('FLEET_SUMMARY_CACHE_TTL', 15)
+    fleet_summary_cache.clear()
+    
+    # Configure scooter availability and user identity caches, sharing one backend
+    from app.services.availability_service import availability_cache
+    from app.services.identity_service import identity_cache
+    from app.utils.cache_backends import create_backend
+    cache_backend = create_backend(app.config.get('AVAILABILITY_CACHE_BACKEND', 'memory'),
+                                   app.config.get('AVAILABILITY_CACHE_URL'))
+    availability_cache.configure(backend=cache_backend, ttl=app.config.get('AVAILABILITY_CACHE_TTL'))
+    identity_cache.configure(backend=cache_backend, ttl=app.config.get('IDENTITY_CACHE_TTL'))
+    if not cache_backend.shared and app.config.get('WEB_CONCURRENCY', 1) > 1:
+        # Other workers would miss a commit until the ttl ran out; read availability and identities per request
+        availability_cache.configure(ttl=0)
+        identity_cache.configure(ttl=0)
+        app.logger.warning(
+            f"Caches kept per worker with {app.config['WEB_CONCURRENCY']} workers: availability and identities "
+            f"are read from the database on every request; set REDIS_URL to share them"
+        )
+    
+    # Configure SQL profiling
+    from app.utils.sql_profiler import sql_profiler
+    sql_profiler.configure(
+        enabled=app.config.get('SQL_PROFILER_ENABLED', True),
+        sample_rate=app.config.get('SQL_PROFILER_SAMPLE_RATE', 1.0),
+        slow_threshold_ms=app.config.get('SLOW_QUERY_THRESHOLD_MS', 200),
+        server_timing=app.config.get('SQL_PROFILER_SERVER_TIMING', True)
+    )
+    sql_profiler.init_app(app)
+    
+    # Configure request and domain metrics
+    from app.utils.metrics import metrics
+    from app.services import metrics_service  # noqa: F401 (registers the domain counters)
+    metrics.configure(
+        directory=app.config.get('METRICS_DIR', ''),
+        flush_interval=app.config.get('METRICS_FLUSH_INTERVAL', 1.0),
+        enabled=app.config.get('METRICS_ENABLED', True)
+    )
+    metrics.init_app(app)
+    
+    # Configure read replica routing
+    from app.utils.db_routing import REPLICA_BIND, WROTE, replica_router, request_user_id
+    replica_enabled = REPLICA_BIND in (app.config.get('SQLALCHEMY_BINDS') or {})
+    replica_router.configure(backend=cache_backend, lag_window=app.config.get('REPLICA_LAG_WINDOW'),
+                             enabled=replica_enabled)
+    if replica_enabled:
+        @app.after_request
+        def remember_writes(response):
+            # Read-your-writes: the user's next requests read from the primary
+            if db.session().info.pop(WROTE, False):
+                replica_router.remember_write(request_user_id())
+            return response
+    
+    # Configure password hashing
+    from app.services.password_service import password_hasher
+    password_hasher.configure(
+        algorithm=app.config.get('PASSWORD_HASH_ALGORITHM', 'pbkdf2'),
+        cost=app.config.get('PASSWORD_HASH_COST', 0),
+        workers=app.config.get('PASSWORD_HASH_WORKERS', 2),
+        queue=app.config.get('PASSWORD_HASH_QUEUE', 32)
+    )
+    
+    # Configure QR code cache
+    from app.utils.qr_generator import qr_cache
+    qr_cache.configure(max_entries=app.config.get('QR_CACHE_SIZE'), directory=app.config.get('QR_CACHE_DIR'))
+    
+    # Register background jobs
+    from app.services import rental_service
+    from app.services.scheduler import scheduler
+    scheduler.add_job('flag_overdue_rentals', rental_service.flag_overdue_rentals,
+                      app.config.get('OVERDUE_CHECK_INTERVAL', 60))
+    
     # Configure login manager
     login_manager.login_view = 'auth.login'
     login_manager.login_message = 'Please log in to access this page.'
     
-    # User loader
+    # User loader: cached identity, the User row is only loaded when a page reads more than the role
     @login_manager.user_loader
     def load_user(user_id):
-        from app.models.user import User
-        return User.query.get(int(user_id))
+        identity = identity_cache.get(user_id)
+        return identity if identity is not None and identity.is_active else None
     
     # Register blueprints
     from app.controllers import auth_bp, main_bp, scooter_bp, rental_bp
@@ -61,6 +149,10 @@ def create_app(config_name=None):
     from app.controllers.api_controller import api_bp
     app.register_blueprint(api_bp)
     
+    # Register metrics endpoint
+    from app.controllers.metrics_controller import metrics_bp
+    app.register_blueprint(metrics_bp)
+    
     # Error handlers
     @app.errorhandler(404)
     def not_found_error(error):
@@ -79,27 +171,80 @@ def create_app(config_name=None):
     def forbidden_error(error):
         return {'error': 'Forbidden'}, 403
     
-    # Initialize database tables on startup
-    with app.app_context():
-        try:
-            # Debug: Log which database URL is being used
-            app.logger.info(f"Database URL: {app.config['SQLALCHEMY_DATABASE_URI']}")
-            db.create_all()
-            app.logger.info("Database tables created successfully")
-        except Exception as e:
-            # Ignore duplicate table and ENUM type errors (happens on redeploy)
-            if "already exists" not in str(e) and "duplicate key value violates unique constraint" not in str(e):
-                app.logger.error(f"Database initialization error: {e}")
-            else:
-                app.logger.info("Database tables already exist - skipping creation")
+    # Create missing tables on startup (development); production schemas come from `flask db upgrade`
+    if app.config.get('DB_AUTO_CREATE'):
+        create_tables(app)
+    
+    # Run background jobs in this worker; the advisory lock keeps other workers out
+    if app.config.get('SCHEDULER_ENABLED'):
+        scheduler.start(app)
     
     # CLI commands
+    from app.utils.migrate_cli import MigrateCommand
+    app.cli.add_command(MigrateCommand(db))
+    
     @app.cli.command()
     def init_db():
         """Initialize the database"""
         db.create_all()
         print('Database initialized.')
     
+    @app.cli.command()
+    @click.option('--hours', type=int, default=None, help='Compact buckets older than this many hours')
+    def compact_tracks(hours):
+        """Downsample old scooter position history"""
+        from datetime import datetime, timedelta
+        from app.services import track_service
+        
+        older_than = datetime.utcnow() - timedelta(hours=hours) if hours is not None else None
+        stats = track_service.compact(older_than=older_than)
+        print(f"Compacted {stats['buckets']} bucket(s): {stats['points_before']} -> {stats['points_after']} points.")
+    
+    @app.cli.command()
+    @click.option('--once', is_flag=True, help='Run every job once and exit')
+    def run_jobs(once):
+        """Run the background jobs in the foreground"""
+        if once:
+            for name in scheduler.jobs:
+                print(f'{name}: {scheduler.run_job(name)}')
+            return
+        print(f"Running jobs: {', '.join(scheduler.jobs)}")
+        try:
+            scheduler.run_forever(app)
+        except KeyboardInterrupt:
+            pass
+    
+    @app.cli.command()
+    def warm_qr_codes():
+        """Render the QR codes of all scooters into the cache"""
+        from app.models.scooter import Scooter
+        from app.utils.qr_generator import SCOOTER_QR_COLOR, scooter_qr_payload
+        
+        scooters = db.session.query(Scooter.id, Scooter.qr_code).order_by(Scooter.id)
+        rendered = qr_cache.warm((scooter_qr_payload(s) for s in scooters), fill_color=SCOOTER_QR_COLOR)
+        print(f'Rendered {rendered} QR code(s).')
+    
+    @app.cli.command()
+    @click.option('--provider', 'provider_id', type=int, default=None, help='Provider user id, all scooters if omitted')
+    @click.option('--format', 'fmt', type=click.Choice(['pdf', 'png']), default='pdf')
+    @click.option('--output', type=click.Path(dir_okay=False), default=None)
+    @click.option('--workers', type=int, default=None, help='Rendering processes, every CPU by default')
+    def qr_sheets(provider_id, fmt, output, workers):
+        """Render printable QR sticker sheets for a fleet"""
+        from app.services import qr_sheet_service
+        
+        def progress(done, total):
+            click.echo(f'\rRendered {done}/{total} pages', nl=done == total)
+        
+        try:
+            data, _, filename, count = qr_sheet_service.build_fleet_sheets(provider_id, fmt, workers, progress)
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        
+        with open(output or filename, 'wb') as f:
+            f.write(data)
+        print(f'Wrote {count} QR code(s) to {output or filename}.')
+    
     @app.cli.command()
     def create_admin():
         """Create an admin user"""
@@ -128,3 +273,41 @@ def create_app(config_name=None):
             print(f'Failed to create admin user: {e}')
     
     return app
+
+def create_tables(app):
+    """Create missing tables; deployments with migrations run `flask db upgrade` instead"""
+    with app.app_context():
+        try:
+            db.create_all()
+            app.logger.info("Database tables created successfully")
+        except Exception as e:
+            # Ignore duplicate table and ENUM type errors (happens on redeploy)
+            if "already exists" not in str(e) and "duplicate key value violates unique constraint" not in str(e):
+                app.logger.error(f"Database initialization error: {e}")
+            else:
+                app.logger.info("Database tables already exist - skipping creation")
+
+def before_fork(app):
+    """
+    Prepare an app loaded in the gunicorn master (--preload) for forking workers
+    Stops the job thread and closes pooled connections, so no worker inherits them
+    """
+    from app.services.scheduler import scheduler
+    scheduler.stop()
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+def after_fork(app):
+    """Start what a worker forked from a preloaded app needs of its own"""
+    from app.services.password_service import password_hasher
+    from app.services.scheduler import scheduler
+    
+    with app.app_context():
+        for engine in db.engines.values():
+            # Leave connections the master may still hold to the master
+            engine.dispose(close=False)
+    # Fresh hashing threads; the master's do not exist in this process
+    password_hasher.configure()
+    if app.config.get('SCHEDULER_ENABLED'):
+        scheduler.start(app)
@@ -1,8 +1,16 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from app.models.scooter import Scooter
 from app.models.rental import Rental
 from app.models.user import User
+from app.models.payment import Payment
+from app.models.serializers import payment_serializer, rental_serializer, scooter_serializer
 from app import db
+from app.services import password_service, rental_service, telemetry_service
+from app.services.availability_service import availability_cache
+from app.services.transaction import transaction
+from app.utils.decorators import jwt_admin_required, replica_reads
+from app.utils.pagination import keyset_paginate
+from app.utils.streaming import stream_query
 from flask_jwt_extended import jwt_required, get_jwt_identity, create_access_token
 from datetime import datetime
 
@@ -28,7 +36,16 @@ def api_login():
         
         user = User.query.filter_by(email=data['email']).first()
         
-        if user and user.check_password(data['password']):
+        try:
+            # Commits an upgraded password hash
+            with transaction():
+                valid = user is not None and password_service.check_login(user, data['password'])
+        except password_service.PasswordHashingBusy:
+            response = jsonify({'error': 'Too many logins right now, please retry'})
+            response.headers['Retry-After'] = '1'
+            return response, 503
+        
+        if valid:
             access_token = create_access_token(identity=user.id)
             return jsonify({
                 'access_token': access_token,
@@ -48,41 +65,49 @@ def api_login():
 
 @api_bp.route('/scooters', methods=['GET'])
 @jwt_required()
+@replica_reads
 def get_scooters():
-    """Get all scooters"""
+    """Get all scooters, one page at a time"""
     try:
-        scooters = Scooter.query.all()
+        limit = request.args.get('limit', 100, type=int)
+        cursor = request.args.get('cursor')
+        
+        scooters, next_cursor = keyset_paginate(Scooter.query, Scooter, cursor, limit)
         return jsonify({
             'scooters': [
                 {
                     'id': scooter.id,
                     'model': scooter.model,
                     'license_plate': scooter.license_plate,
-                    'location': scooter.location,
+                    'location': scooter.address,
                     'battery_level': scooter.battery_level,
                     'status': scooter.status,
                     'created_at': scooter.created_at.isoformat() if scooter.created_at else None
                 }
                 for scooter in scooters
-            ]
+            ],
+            'next_cursor': next_cursor
         }), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to fetch scooters', 'details': str(e)}), 500
 
 @api_bp.route('/scooters/available', methods=['GET'])
 @jwt_required()
+@replica_reads
 def get_available_scooters():
     """Get available scooters"""
     try:
-        scooters = Scooter.query.filter_by(status='available').all()
+        scooters = availability_cache.available()
         return jsonify({
             'scooters': [
                 {
-                    'id': scooter.id,
-                    'model': scooter.model,
-                    'license_plate': scooter.license_plate,
-                    'location': scooter.location,
-                    'battery_level': scooter.battery_level
+                    'id': scooter['id'],
+                    'model': scooter['model'],
+                    'license_plate': scooter['license_plate'],
+                    'location': scooter['address'],
+                    'battery_level': scooter['battery_level']
                 }
                 for scooter in scooters
             ]
@@ -92,6 +117,7 @@ def get_available_scooters():
 
 @api_bp.route('/scooters/<int:scooter_id>', methods=['GET'])
 @jwt_required()
+@replica_reads
 def get_scooter(scooter_id):
     """Get specific scooter"""
     try:
@@ -100,7 +126,7 @@ def get_scooter(scooter_id):
             'id': scooter.id,
             'model': scooter.model,
             'license_plate': scooter.license_plate,
-            'location': scooter.location,
+            'location': scooter.address,
             'battery_level': scooter.battery_level,
             'status': scooter.status,
             'created_at': scooter.created_at.isoformat() if scooter.created_at else None
@@ -110,11 +136,17 @@ def get_scooter(scooter_id):
 
 @api_bp.route('/rentals', methods=['GET'])
 @jwt_required()
+@replica_reads
 def get_rentals():
-    """Get user rentals"""
+    """Get user rentals, one page at a time"""
     try:
         user_id = get_jwt_identity()
-        rentals = Rental.query.filter_by(user_id=user_id).all()
+        limit = request.args.get('limit', 100, type=int)
+        cursor = request.args.get('cursor')
+        
+        rentals, next_cursor = keyset_paginate(
+            Rental.with_related().filter_by(user_id=user_id), Rental, cursor, limit
+        )
         user_rentals = []
         for rental in rentals:
             rental_data = {
@@ -138,13 +170,17 @@ def get_rentals():
             
             user_rentals.append(rental_data)
         return jsonify({
-            'rentals': user_rentals
+            'rentals': user_rentals,
+            'next_cursor': next_cursor
         }), 200
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to fetch rentals', 'details': str(e)}), 500
 
 @api_bp.route('/rentals/<int:rental_id>', methods=['GET'])
 @jwt_required()
+@replica_reads
 def get_rental(rental_id):
     """Get specific rental"""
     try:
@@ -189,29 +225,14 @@ def start_rental():
         if not data or not data.get('scooter_id'):
             return jsonify({'error': 'Scooter ID required'}), 400
         
-        scooter = Scooter.query.get_or_404(data['scooter_id'])
-        
-        if scooter.status != 'available':
-            return jsonify({'error': 'Scooter not available'}), 400
-        
-        # Check if user has active rental
-        active_rental = Rental.query.filter_by(user_id=user_id, status='active').first()
-        if active_rental:
-            return jsonify({'error': 'User already has an active rental'}), 400
-        
-        # Create new rental
-        rental = Rental(
-            user_id=user_id,
-            scooter_id=data['scooter_id'],
-            start_time=datetime.utcnow(),
-            status='active'
+        # Claims the scooter and creates the rental in one transaction
+        rental = rental_service.start_rental(
+            int(user_id),
+            data['scooter_id'],
+            data.get('latitude'),
+            data.get('longitude')
         )
-        
-        # Update scooter status
-        scooter.status = 'in_use'
-        
-        db.session.add(rental)
-        db.session.commit()
+        scooter = rental.scooter
         
         return jsonify({
             'message': 'Rental started successfully',
@@ -227,6 +248,12 @@ def start_rental():
             }
         }), 201
         
+    except rental_service.ScooterNotFound:
+        return jsonify({'error': 'Scooter not found'}), 404
+    except rental_service.ScooterUnavailable:
+        return jsonify({'error': 'Scooter not available'}), 400
+    except rental_service.RentalError as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Failed to start rental', 'details': str(e)}), 500
@@ -237,18 +264,12 @@ def end_rental(rental_id):
     """End a rental"""
     try:
         user_id = get_jwt_identity()
-        rental = Rental.query.filter_by(id=rental_id, user_id=user_id, status='active').first_or_404()
+        rental = Rental.query.filter(
+            Rental.id == rental_id, Rental.user_id == user_id, Rental.status.in_(Rental.OPEN_STATUSES)
+        ).first_or_404()
         
-        # Calculate cost and end rental
-        rental.end_time = datetime.utcnow()
-        rental.total_cost = rental.calculate_cost()
-        rental.status = 'completed'
-        
-        # Update scooter status only if scooter exists
-        if rental.scooter:
-            rental.scooter.status = 'available'
-        
-        db.session.commit()
+        # Calculates the cost and releases the scooter with one commit
+        rental_service.end_rental(rental)
         
         return jsonify({
             'message': 'Rental ended successfully',
@@ -267,6 +288,7 @@ def end_rental(rental_id):
 
 @api_bp.route('/stats', methods=['GET'])
 @jwt_required()
+@replica_reads
 def get_stats():
     """Get user statistics"""
     try:
@@ -280,8 +302,121 @@ def get_stats():
             'total_rentals': total_rentals,
             'completed_rentals': completed_rentals,
             'total_spent': float(total_spent),
-            'active_rental': Rental.query.filter_by(user_id=user_id, status='active').first() is not None
+            'active_rental': Rental.query.filter(
+                Rental.user_id == user_id, Rental.status.in_(Rental.OPEN_STATUSES)
+            ).first() is not None
         }), 200
         
     except Exception as e:
         return jsonify({'error': 'Failed to fetch stats', 'details': str(e)}), 500
+
+@api_bp.route('/admin/db-pool', methods=['GET'])
+@jwt_required()
+@jwt_admin_required
+def db_pool_stats():
+    """Connection pool checkouts, wait times, overflow and timeouts of this worker"""
+    from app.utils.db_pool import pool_metrics
+    
+    stats = pool_metrics.snapshot(db.engine.pool)
+    stats['pool'] = type(db.engine.pool).__name__
+    return jsonify(stats), 200
+
+@api_bp.route('/admin/sql-profile', methods=['GET'])
+@jwt_required()
+@jwt_admin_required
+def sql_profile():
+    """Statements and database time per endpoint of this worker, sampled requests only"""
+    from app.utils.sql_profiler import sql_profiler
+    
+    return jsonify({
+        'sample_rate': sql_profiler.sample_rate,
+        'endpoints': sql_profiler.snapshot()
+    }), 200
+
+EXPORTS = {
+    'scooters': (scooter_serializer, Scooter),
+    'rentals': (rental_serializer, Rental),
+    'payments': (payment_serializer, Payment)
+}
+
+@api_bp.route('/export/<string:resource>', methods=['GET'])
+@jwt_required()
+@jwt_admin_required
+def export(resource):
+    """Stream every scooter, rental or payment as NDJSON (default) or a JSON array"""
+    if resource not in EXPORTS:
+        return jsonify({'error': 'Unknown export', 'available': sorted(EXPORTS)}), 404
+    
+    fmt = request.args.get('format', 'ndjson')
+    if fmt not in ('ndjson', 'json'):
+        return jsonify({'error': 'Format must be ndjson or json'}), 400
+    
+    serializer, model = EXPORTS[resource]
+    query = serializer.query(include_sensitive=True).order_by(model.id)
+    
+    return stream_query(
+        query,
+        serializer.function(include_sensitive=True),
+        fmt=fmt,
+        key=resource,
+        batch_size=current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+    )
+
+@api_bp.route('/telemetry', methods=['POST'])
+@jwt_required()
+@jwt_admin_required
+def ingest_telemetry():
+    """Apply a batch of location and battery reports sent as a JSON array or NDJSON"""
+    try:
+        if request.mimetype in ('application/x-ndjson', 'application/ndjson'):
+            records = telemetry_service.parse_ndjson(request.get_data(as_text=True))
+        else:
+            data = request.get_json(silent=True)
+            records = data.get('reports') if isinstance(data, dict) else data
+            if not isinstance(records, list):
+                return jsonify({'error': 'Expected a list of reports'}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    max_batch = current_app.config.get('TELEMETRY_MAX_BATCH', 10000)
+    if len(records) > max_batch:
+        return jsonify({'error': f'Batch exceeds {max_batch} reports'}), 413
+    
+    try:
+        stats = telemetry_service.ingest(records, current_app.config.get('TELEMETRY_CHUNK_SIZE', 500))
+    except Exception as e:
+        return jsonify({'error': 'Failed to ingest telemetry', 'details': str(e)}), 500
+    
+    current_app.logger.info(f"Telemetry batch: {stats}")
+    return jsonify(stats), 200
+
+@api_bp.route('/admin/qr-sheets', methods=['GET'])
+@jwt_required()
+@jwt_admin_required
+def qr_sheets():
+    """Printable QR sticker sheets for a provider's fleet (all scooters without provider_id)"""
+    from app.services import qr_sheet_service
+    
+    provider_id = request.args.get('provider_id', type=int)
+    fmt = request.args.get('format', 'pdf')
+    
+    def progress(done, total):
+        # Roughly every tenth of the pages
+        if done == total or done % max(total // 10, 1) == 0:
+            current_app.logger.info(f"QR sheets for provider {provider_id}: {done}/{total} pages")
+    
+    try:
+        data, mimetype, filename, count = qr_sheet_service.build_fleet_sheets(
+            provider_id, fmt, progress=progress, max_labels=current_app.config.get('QR_SHEET_MAX_LABELS', 1000)
+        )
+    except qr_sheet_service.NoScootersFound as e:
+        return jsonify({'error': str(e)}), 404
+    except qr_sheet_service.TooManyLabels as e:
+        return jsonify({'error': str(e)}), 413
+    except qr_sheet_service.QRSheetError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return current_app.response_class(data, mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename={filename}',
+        'X-Scooter-Count': str(count)
+    })
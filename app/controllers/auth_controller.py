@@ -6,6 +6,8 @@ from flask import render_template, redirect, url_for, flash, request
 from flask_login import login_user, logout_user, login_required, current_user
 from app.controllers import auth_bp
 from app.models.user import User
+from app.services import password_service
+from app.services.transaction import transaction
 from app import db
 
 @auth_bp.route('/')
@@ -36,11 +38,19 @@ def login():
             flash('Account is deactivated', 'danger')
             return render_template('auth/login.html')
         
-        if not user.check_password(password):
+        try:
+            valid = password_service.check_login(user, password)
+        except password_service.PasswordHashingBusy:
+            flash('Too many logins right now, please try again in a moment.', 'warning')
+            return render_template('auth/login.html'), 503
+        
+        if not valid:
             flash('Invalid email or password', 'danger')
             return render_template('auth/login.html')
         
-        user.update_last_login()
+        # Commits an upgraded password hash too
+        with transaction():
+            user.update_last_login()
         login_user(user)
         flash('Login successful!', 'success')
         
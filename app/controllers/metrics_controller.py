@@ -0,0 +1,21 @@
+"""
+Metrics endpoint for ScootRapid
+"""
+
+import hmac
+from flask import Blueprint, current_app, request
+from app.utils.metrics import metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Counters and histograms of all workers in the Prometheus text format"""
+    token = current_app.config.get('METRICS_TOKEN')
+    if token and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return {'error': 'Unauthorized'}, 401
+    if not token and not current_app.config.get('METRICS_PUBLIC', True):
+        # Production without a token: nobody may read them
+        return {'error': 'Forbidden'}, 403
+    
+    return current_app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
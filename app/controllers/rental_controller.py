@@ -7,24 +7,31 @@ from flask_login import login_required, current_user
 from app.controllers import rental_bp
 from app.models.rental import Rental
 from app.models.scooter import Scooter
+from app.services import rental_service
+from app.utils.decorators import replica_reads
+from app import db
 
 @rental_bp.route('/')
 @login_required
+@replica_reads
 def list_rentals():
     """List rentals"""
+    query = Rental.with_related('scooter', 'user')
+    
     if current_user.is_admin():
-        rentals = Rental.query.order_by(Rental.created_at.desc()).limit(50).all()
+        rentals = query.order_by(Rental.created_at.desc()).limit(50).all()
     elif current_user.is_provider():
         # Show rentals of provider's scooters
-        provider_scooter_ids = [s.id for s in Scooter.query.filter_by(provider_id=current_user.id).all()]
-        rentals = Rental.query.filter(Rental.scooter_id.in_(provider_scooter_ids)).order_by(Rental.created_at.desc()).limit(50).all()
+        provider_scooter_ids = db.select(Scooter.id).where(Scooter.provider_id == current_user.id)
+        rentals = query.filter(Rental.scooter_id.in_(provider_scooter_ids)).order_by(Rental.created_at.desc()).limit(50).all()
     else:
-        rentals = Rental.query.filter_by(user_id=current_user.id).order_by(Rental.created_at.desc()).limit(50).all()
+        rentals = query.filter_by(user_id=current_user.id).order_by(Rental.created_at.desc()).limit(50).all()
     
     return render_template('rentals/list.html', rentals=rentals)
 
 @rental_bp.route('/<int:rental_id>')
 @login_required
+@replica_reads
 def detail(rental_id):
     """Rental detail page"""
     rental = Rental.query.get(rental_id)
@@ -59,9 +66,9 @@ def start(scooter_id):
         return redirect(url_for('scooters.detail', scooter_id=scooter_id))
     
     # Check if user has active rental
-    active_rental = Rental.query.filter_by(
-        user_id=current_user.id, 
-        status='active'
+    active_rental = Rental.query.filter(
+        Rental.user_id == current_user.id,
+        Rental.status.in_(Rental.OPEN_STATUSES)
     ).first()
     if active_rental:
         flash('You already have an active rental', 'danger')
@@ -69,20 +76,10 @@ def start(scooter_id):
     
     if request.method == 'POST':
         try:
-            from app import db
             latitude = float(request.form.get('latitude', scooter.latitude))
             longitude = float(request.form.get('longitude', scooter.longitude))
             
-            rental = Rental(
-                user_id=current_user.id,
-                scooter_id=scooter.id,
-                start_latitude=latitude,
-                start_longitude=longitude
-            )
-            
-            rental.start_rental()
-            db.session.add(rental)
-            db.session.commit()
+            rental = rental_service.start_rental(current_user.id, scooter.id, latitude, longitude)
             
             flash('Rental started successfully!', 'success')
             return redirect(url_for('rentals.detail', rental_id=rental.id))
@@ -102,7 +99,7 @@ def end(rental_id):
         flash('Rental not found', 'danger')
         return redirect(url_for('rentals.list_rentals'))
     
-    if rental.status != 'active':
+    if not rental.is_open():
         flash('Rental is not active', 'danger')
         return redirect(url_for('rentals.detail', rental_id=rental_id))
     
@@ -111,12 +108,10 @@ def end(rental_id):
         return redirect(url_for('rentals.detail', rental_id=rental_id))
     
     try:
-        from app import db
         latitude = request.form.get('latitude', type=float)
         longitude = request.form.get('longitude', type=float)
         
-        rental.end_rental(latitude, longitude)
-        db.session.commit()
+        rental_service.end_rental(rental, latitude, longitude)
         
         flash('Rental ended successfully!', 'success')
     except Exception as e:
@@ -133,7 +128,7 @@ def cancel(rental_id):
         flash('Rental not found', 'danger')
         return redirect(url_for('rentals.list_rentals'))
     
-    if rental.status != 'active':
+    if not rental.is_open():
         flash('Only active rentals can be cancelled', 'danger')
         return redirect(url_for('rentals.detail', rental_id=rental_id))
     
@@ -142,10 +137,8 @@ def cancel(rental_id):
         return redirect(url_for('rentals.detail', rental_id=rental_id))
     
     try:
-        from app import db
         reason = request.form.get('reason')
-        rental.cancel_rental(reason)
-        db.session.commit()
+        rental_service.cancel_rental(rental, reason)
         
         flash('Rental cancelled', 'info')
     except Exception as e:
@@ -170,7 +163,7 @@ def rate(rental_id):
         rating = int(request.form.get('rating'))
         feedback = request.form.get('feedback')
         
-        rental.add_rating(rating, feedback)
+        rental_service.rate_rental(rental, rating, feedback)
         
         flash('Thank you for your rating!', 'success')
     except Exception as e:
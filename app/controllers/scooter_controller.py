@@ -2,14 +2,21 @@
 Scooter controller for ScootRapid
 """
 
-from flask import render_template, redirect, url_for, flash, request
+from flask import render_template, redirect, url_for, flash, request, abort, make_response
 from flask_login import login_required, current_user
 from app.controllers import scooter_bp
 from app.models.scooter import Scooter
 from app.models.rental import Rental
+from app.services import scooter_service, track_service
+from app.services.availability_service import availability_cache
+from app.services.scooter_service import scooter_changed, scooter_removed
+from app.services.transaction import after_commit, transaction
+from app.utils.decorators import replica_reads
+from app.utils.qr_generator import SCOOTER_QR_COLOR, qr_cache, scooter_qr_payload
 
 @scooter_bp.route('/')
 @login_required
+@replica_reads
 def list_scooters():
     """List all scooters"""
     if current_user.role == 'provider':
@@ -23,15 +30,13 @@ def list_scooters():
 @login_required
 def available():
     """List available scooters"""
-    scooters = Scooter.query.filter(
-        Scooter.status == 'available',
-        Scooter.battery_level > 15
-    ).limit(50).all()
+    scooters = availability_cache.available(min_battery=15, limit=50)
     
     return render_template('scooters/available.html', scooters=scooters)
 
 @scooter_bp.route('/<int:scooter_id>')
 @login_required
+@replica_reads
 def detail(scooter_id):
     """Scooter detail page"""
     scooter = Scooter.query.get(scooter_id)
@@ -39,26 +44,35 @@ def detail(scooter_id):
         flash('Scooter not found', 'danger')
         return redirect(url_for('scooters.list_scooters'))
     
-    # Calculate rating statistics
-    completed_rentals = Rental.query.filter_by(scooter_id=scooter.id, status='completed').all()
-    ratings = [r.rating for r in completed_rentals if r.rating]
-    avg_rating = sum(ratings) / len(ratings) if ratings else 0
-    total_ratings = len(ratings)
-    
-    stats = {
-        'total_revenue': scooter.get_total_revenue(),
-        'utilization_rate': scooter.get_utilization_rate(),
-        'rental_count': Rental.query.filter_by(scooter_id=scooter.id).count(),
-        'needs_maintenance': scooter.needs_maintenance(),
-        'avg_rating': avg_rating,
-        'total_ratings': total_ratings
-    }
-    
-    # Generate QR code
-    from app.utils.qr_generator import generate_qr_code_data
-    qr_code_data = generate_qr_code_data(scooter)
-    
-    return render_template('scooters/detail.html', scooter=scooter, stats=stats, qr_code_data=qr_code_data)
+    stats = scooter.get_rental_stats()
+    stats['needs_maintenance'] = scooter.needs_maintenance()
+    
+    return render_template('scooters/detail.html', scooter=scooter, stats=stats)
+
+@scooter_bp.route('/<int:scooter_id>/qr.png')
+@login_required
+def qr_code(scooter_id):
+    """QR code image of a scooter, cached by content"""
+    from app import db
+    
+    scooter = db.session.query(Scooter.id, Scooter.qr_code).filter(Scooter.id == scooter_id).first()
+    if scooter is None:
+        abort(404)
+    
+    payload = scooter_qr_payload(scooter)
+    etag = qr_cache.key(payload, fill_color=SCOOTER_QR_COLOR)
+    if etag in request.if_none_match:
+        response = make_response('', 304)
+    else:
+        _, png = qr_cache.get(payload, fill_color=SCOOTER_QR_COLOR)
+        response = make_response(png)
+        response.mimetype = 'image/png'
+    
+    response.set_etag(etag)
+    # The URL stays the same when the code changes, so revalidate after a day
+    response.cache_control.private = True
+    response.cache_control.max_age = 86400
+    return response
 
 @scooter_bp.route('/create', methods=['GET', 'POST'])
 @login_required
@@ -90,8 +104,11 @@ def create():
                 battery_level=int(request.form.get('battery_level', 100)),
                 provider_id=current_user.id
             )
-            db.session.add(scooter)
-            db.session.commit()
+            with transaction():
+                db.session.add(scooter)
+                scooter_changed(scooter)
+                # Render the QR code now rather than on the first detail page view
+                after_commit(lambda: qr_cache.warm([scooter_qr_payload(scooter)], fill_color=SCOOTER_QR_COLOR))
             
             flash('Scooter created successfully!', 'success')
             return redirect(url_for('scooters.detail', scooter_id=scooter.id))
@@ -131,17 +148,18 @@ def edit(scooter_id):
                 flash('Scooter with this identifier already exists', 'danger')
                 return render_template('scooters/edit.html', scooter=scooter)
             
-            scooter.identifier = new_identifier
-            scooter.license_plate = request.form.get('license_plate')
-            scooter.model = request.form.get('model')
-            scooter.brand = request.form.get('brand')
-            scooter.address = request.form.get('address')
-            scooter.latitude = float(request.form.get('latitude'))
-            scooter.longitude = float(request.form.get('longitude'))
-            scooter.location = request.form.get('location')
-            scooter.battery_level = int(request.form.get('battery_level'))
-            scooter.status = request.form.get('status')
-            db.session.commit()
+            with transaction():
+                scooter.identifier = new_identifier
+                scooter.license_plate = request.form.get('license_plate')
+                scooter.model = request.form.get('model')
+                scooter.brand = request.form.get('brand')
+                scooter.address = request.form.get('address')
+                scooter.latitude = float(request.form.get('latitude'))
+                scooter.longitude = float(request.form.get('longitude'))
+                scooter.location = request.form.get('location')
+                scooter.battery_level = int(request.form.get('battery_level'))
+                scooter.status = request.form.get('status')
+                scooter_changed(scooter)
             
             flash('Scooter updated successfully!', 'success')
             return redirect(url_for('scooters.detail', scooter_id=scooter_id))
@@ -172,16 +190,19 @@ def delete(scooter_id):
         from app import db
         from app.models.rental import Rental
         
-        # Set scooter_id to None for all rentals to maintain data integrity
-        rentals = Rental.query.filter_by(scooter_id=scooter.id).all()
-        for rental in rentals:
-            # Mark as allowed to have None scooter_id
-            rental._allow_none_scooter_id = True
-            rental.scooter_id = None
-        
-        # Now safely delete the scooter
-        db.session.delete(scooter)
-        db.session.commit()
+        with transaction():
+            # Set scooter_id to None for all rentals to maintain data integrity
+            rentals = Rental.query.filter_by(scooter_id=scooter.id).all()
+            for rental in rentals:
+                # Mark as allowed to have None scooter_id
+                rental._allow_none_scooter_id = True
+                rental.scooter_id = None
+            
+            track_service.forget(scooter.id)
+            
+            # Now safely delete the scooter
+            db.session.delete(scooter)
+            scooter_removed(scooter_id)
         
         flash(f'Scooter deleted successfully! {len(rentals)} rental(s) preserved without scooter reference.', 'success')
         return redirect(url_for('scooters.list_scooters'))
@@ -205,9 +226,7 @@ def update_status(scooter_id):
     status = request.form.get('status')
     
     try:
-        from app import db
-        scooter.set_status(status)
-        db.session.commit()
+        scooter_service.set_status(scooter, status)
         flash('Status updated successfully!', 'success')
     except Exception as e:
         flash(f'Error updating status: {str(e)}', 'danger')
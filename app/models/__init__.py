@@ -6,5 +6,6 @@ from .user import User
 from .scooter import Scooter
 from .rental import Rental
 from .payment import Payment
+from .scooter_track import ScooterTrack
 
-__all__ = ['User', 'Scooter', 'Rental', 'Payment']
+__all__ = ['User', 'Scooter', 'Rental', 'Payment', 'ScooterTrack']
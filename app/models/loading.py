@@ -0,0 +1,41 @@
+"""
+Relationship loading policy for ScootRapid models
+"""
+
+from flask import current_app, has_app_context
+from sqlalchemy.orm import joinedload, lazyload, selectinload
+
+LOADER_STRATEGIES = {
+    'joined': joinedload,
+    'selectin': selectinload,
+    'lazy': lazyload
+}
+
+DEFAULT_STRATEGY = 'joined'
+
+def get_loading_strategy():
+    """Strategy configured through RELATIONSHIP_LOADING_STRATEGY"""
+    if has_app_context():
+        return current_app.config.get('RELATIONSHIP_LOADING_STRATEGY', DEFAULT_STRATEGY)
+    return DEFAULT_STRATEGY
+
+def loader_options(model, relationships, strategy=None):
+    """Build loader options for the named relationships of a model"""
+    strategy = strategy or get_loading_strategy()
+    if strategy not in LOADER_STRATEGIES:
+        raise ValueError(f"Invalid loading strategy. Must be one of: {', '.join(LOADER_STRATEGIES)}")
+    
+    loader = LOADER_STRATEGIES[strategy]
+    return [loader(getattr(model, name)) for name in relationships]
+
+class EagerLoadingMixin:
+    """
+    Lets list queries load related rows up front instead of one lazy SELECT per row
+    Models list the relationships their serializers touch in ``__eager_relationships__``
+    """
+    __eager_relationships__ = ()
+    
+    @classmethod
+    def with_related(cls, *relationships, strategy=None):
+        names = relationships or cls.__eager_relationships__
+        return cls.query.options(*loader_options(cls, names, strategy))
@@ -43,8 +43,6 @@ class Payment(db.Model):
         
         if gateway_transaction_id:
             self.gateway_transaction_id = gateway_transaction_id
-        
-        db.session.commit()
     
     def complete_payment(self, gateway_transaction_id=None, gateway_response=None):
         if self.status == 'completed':
@@ -55,13 +53,10 @@ class Payment(db.Model):
         
         if gateway_transaction_id:
             self.gateway_transaction_id = gateway_transaction_id
-        
-        db.session.commit()
     
     def fail_payment(self, gateway_response=None):
         self.status = 'failed'
         self.processed_at = datetime.utcnow()
-        db.session.commit()
     
     def refund_payment(self, refund_amount=None, reason=None):
         if self.status != 'completed':
@@ -82,8 +77,6 @@ class Payment(db.Model):
         
         if self.refund_amount >= self.amount:
             self.status = 'refunded'
-        
-        db.session.commit()
     
     def is_refundable(self):
         if self.status != 'completed':
@@ -4,9 +4,18 @@ Rental model for ScootRapid using SQLAlchemy
 
 from datetime import datetime
 from app import db
+from app.models.loading import EagerLoadingMixin
 
-class Rental(db.Model):
+class Rental(EagerLoadingMixin, db.Model):
     __tablename__ = 'rentals'
+    __table_args__ = (
+        # Serves per-user rental history paged by (created_at, id)
+        db.Index('ix_rentals_user_created', 'user_id', 'created_at'),
+    )
+    # Rental.to_dict embeds the scooter
+    __eager_relationships__ = ('scooter',)
+    # Rentals still holding their scooter; overdue ones are flagged by a background job
+    OPEN_STATUSES = ('active', 'overdue')
     
     id = db.Column(db.Integer, primary_key=True)
     rental_code = db.Column(db.String(50), unique=True, nullable=False, index=True)
@@ -34,7 +43,7 @@ class Rental(db.Model):
     rating = db.Column(db.Integer)
     feedback = db.Column(db.Text)
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     payments = db.relationship('Payment', backref='rental', lazy='dynamic', foreign_keys='Payment.rental_id')
@@ -51,24 +60,16 @@ class Rental(db.Model):
             self.rental_code = f"RNT-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}-{self.user_id}"
     
     def start_rental(self):
-        from app.models.scooter import Scooter
+        from app.services.rental_service import claim_scooter
         
-        scooter = Scooter.query.get(self.scooter_id)
-        if not scooter:
-            raise ValueError("Scooter not found")
-        
-        if not scooter.is_available():
-            raise ValueError("Scooter is not available")
+        # Conditional UPDATE inside the caller's transaction
+        claim_scooter(self.scooter_id)
         
         self.status = 'active'
         self.start_time = datetime.utcnow()
-        
-        scooter.set_status('in_use')
-        
-        db.session.commit()
     
     def end_rental(self, end_latitude=None, end_longitude=None):
-        if self.status != 'active':
+        if not self.is_open():
             raise ValueError("Rental is not active")
         
         self.end_time = datetime.utcnow()
@@ -80,22 +81,18 @@ class Rental(db.Model):
         
         duration = (self.end_time - self.start_time).total_seconds() / 60
         self.duration_minutes = int(duration)
+        self.distance_km = self.calculate_distance()
         
         self.total_cost = self.calculate_cost()
         
         # Handle deleted scooters gracefully
-        if self.scooter_id is not None:
-            from app.models.scooter import Scooter
-            scooter = Scooter.query.get(self.scooter_id)
-            if scooter:
-                scooter.set_status('available')
-                if end_latitude and end_longitude:
-                    scooter.update_location(end_latitude, end_longitude)
-        
-        db.session.commit()
+        if self.scooter is not None:
+            self.scooter.set_status('available')
+            if end_latitude and end_longitude:
+                self.scooter.update_location(end_latitude, end_longitude)
     
     def cancel_rental(self, reason=None):
-        if self.status != 'active':
+        if not self.is_open():
             raise ValueError("Only active rentals can be cancelled")
         
         self.status = 'cancelled'
@@ -107,13 +104,27 @@ class Rental(db.Model):
         self.total_cost = min(self.calculate_cost(), self.base_fee)
         
         # Handle deleted scooters gracefully
-        if self.scooter_id is not None:
-            from app.models.scooter import Scooter
-            scooter = Scooter.query.get(self.scooter_id)
-            if scooter:
-                scooter.set_status('available')
+        if self.scooter is not None:
+            self.scooter.set_status('available')
+    
+    def is_open(self):
+        return self.status in self.OPEN_STATUSES
+    
+    def calculate_distance(self):
+        """Distance along the recorded track from the start to the end point"""
+        from app.services.track_service import trip_distance_km
+        
+        end_point = None
+        if self.end_latitude is not None and self.end_longitude is not None:
+            end_point = (self.end_latitude, self.end_longitude)
         
-        db.session.commit()
+        return trip_distance_km(
+            self.scooter_id,
+            self.start_time,
+            self.end_time or datetime.utcnow(),
+            start_point=(self.start_latitude, self.start_longitude),
+            end_point=end_point
+        )
     
     def calculate_cost(self):
         if not self.duration_minutes:
@@ -169,7 +180,6 @@ class Rental(db.Model):
         
         self.rating = rating
         self.feedback = feedback
-        db.session.commit()
     
     def check_overdue_status(self):
         from flask import current_app
@@ -182,7 +192,6 @@ class Rental(db.Model):
         
         if duration_hours > max_hours:
             self.status = 'overdue'
-            db.session.commit()
             return True
         
         return False
@@ -5,9 +5,15 @@ Scooter model for ScootRapid using SQLAlchemy
 from datetime import datetime
 from math import radians, cos, sin, asin, sqrt
 from app import db
+from app.utils.distance import bounding_box
+from app.utils.geo_index import scooter_index
 
 class Scooter(db.Model):
     __tablename__ = 'scooters'
+    __table_args__ = (
+        # Serves nearby search: equality on status, range scan on latitude
+        db.Index('ix_scooters_status_lat_lon', 'status', 'latitude', 'longitude'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     identifier = db.Column(db.String(50), unique=True, nullable=False, index=True)
@@ -29,9 +35,11 @@ class Scooter(db.Model):
     
     provider_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_maintenance = db.Column(db.DateTime)
+    # Timestamp of the newest telemetry report applied, older reports are dropped
+    last_seen_at = db.Column(db.DateTime)
     
     rentals = db.relationship('Rental', backref='scooter', lazy='dynamic', foreign_keys='Rental.scooter_id')
     
@@ -48,7 +56,13 @@ class Scooter(db.Model):
         if address:
             self.address = address
         self.updated_at = datetime.utcnow()
-        db.session.commit()
+    
+    def set_battery_level(self, battery_level):
+        if not 0 <= battery_level <= 100:
+            raise ValueError("Battery level must be between 0 and 100")
+        
+        self.battery_level = battery_level
+        self.updated_at = datetime.utcnow()
     
     def set_status(self, status):
         valid_statuses = ['available', 'in_use', 'maintenance', 'offline']
@@ -57,7 +71,6 @@ class Scooter(db.Model):
         
         self.status = status
         self.updated_at = datetime.utcnow()
-        db.session.commit()
     
     def is_available(self):
         return self.status == 'available' and self.battery_level > 15
@@ -83,25 +96,77 @@ class Scooter(db.Model):
         r = 6371
         return c * r
     
+    @classmethod
+    def nearby_filter(cls, latitude, longitude, radius_km):
+        """Filter clauses for available scooters inside the bounding box of a radius"""
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+        return (
+            cls.status == 'available',
+            cls.latitude.between(min_lat, max_lat),
+            cls.longitude.between(min_lon, max_lon)
+        )
+    
+    @classmethod
+    def nearby_query(cls, latitude, longitude, radius_km):
+        """Query available scooters near a point using the status/latitude/longitude index"""
+        return cls.query.filter(*cls.nearby_filter(latitude, longitude, radius_km))
+    
+    @classmethod
+    def rebuild_index(cls):
+        """Load the positions of all available scooters into the spatial index"""
+        rows = db.session.query(cls.id, cls.latitude, cls.longitude).filter(cls.status == 'available')
+        scooter_index.rebuild(rows)
+    
     def get_current_rental(self):
-        return self.rentals.filter_by(status='active').first()
+        from app.models.rental import Rental
+        return self.rentals.filter(Rental.status.in_(Rental.OPEN_STATUSES)).first()
+    
+    def get_rental_stats(self):
+        """
+        Revenue, usage and rating figures aggregated in a single query
+        The result is kept until the scooter is expired, e.g. by a commit;
+        callers get a copy they may change
+        """
+        stats = self.__dict__.get('_rental_stats')
+        if stats is None:
+            stats = self._rental_stats = self._query_rental_stats()
+        return dict(stats)
+    
+    def _query_rental_stats(self):
+        from app.models.rental import Rental
+        
+        completed = Rental.status == 'completed'
+        # A rating of 0 means the rental was not rated
+        rated = db.and_(completed, Rental.rating > 0)
+        rental_count, completed_count, total_revenue, rented_minutes, avg_rating, total_ratings = db.session.query(
+            db.func.count(Rental.id),
+            db.func.count(db.case((completed, Rental.id))),
+            db.func.coalesce(db.func.sum(db.case((completed, Rental.total_cost))), 0),
+            db.func.coalesce(db.func.sum(db.case((completed, Rental.duration_minutes))), 0),
+            db.func.avg(db.case((rated, Rental.rating))),
+            db.func.count(db.case((rated, Rental.rating)))
+        ).filter(Rental.scooter_id == self.id).one()
+        
+        utilization_rate = 0.0
+        if rental_count:
+            days_active = (datetime.utcnow() - self.created_at).days or 1
+            utilization_rate = rented_minutes / (days_active * 24 * 60) * 100
+        
+        return {
+            'rental_count': rental_count,
+            'completed_rentals': completed_count,
+            'total_revenue': float(total_revenue),
+            'rented_minutes': int(rented_minutes),
+            'utilization_rate': utilization_rate,
+            'avg_rating': float(avg_rating) if avg_rating is not None else 0,
+            'total_ratings': total_ratings
+        }
     
     def get_total_revenue(self):
-        completed_rentals = self.rentals.filter_by(status='completed').all()
-        return sum(r.total_cost for r in completed_rentals)
+        return self.get_rental_stats()['total_revenue']
     
     def get_utilization_rate(self):
-        total_rentals = self.rentals.count()
-        if total_rentals == 0:
-            return 0.0
-        
-        completed_rentals = self.rentals.filter_by(status='completed').all()
-        total_minutes = sum(r.duration_minutes for r in completed_rentals if r.duration_minutes)
-        
-        days_active = (datetime.utcnow() - self.created_at).days or 1
-        available_minutes = days_active * 24 * 60
-        
-        return (total_minutes / available_minutes * 100) if available_minutes > 0 else 0.0
+        return self.get_rental_stats()['utilization_rate']
     
     def to_dict(self, include_sensitive=False):
         data = {
@@ -132,3 +197,7 @@ class Scooter(db.Model):
     
     def __repr__(self):
         return f'<Scooter {self.identifier}>'
+
+@db.event.listens_for(Scooter, 'expire')
+def _forget_rental_stats(scooter, attrs):
+    scooter.__dict__.pop('_rental_stats', None)
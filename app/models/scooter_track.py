@@ -0,0 +1,27 @@
+"""
+Scooter position history for ScootRapid using SQLAlchemy
+"""
+
+from app import db
+
+# Seconds covered by one track bucket
+BUCKET_SECONDS = 3600
+
+class ScooterTrack(db.Model):
+    """One hour of positions of one scooter, packed by app.utils.tracks"""
+    __tablename__ = 'scooter_tracks'
+    __table_args__ = (
+        # Appends upsert on it, trip lookups range scan bucket_start per scooter
+        db.UniqueConstraint('scooter_id', 'bucket_start', name='uq_scooter_tracks_scooter_bucket'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    scooter_id = db.Column(db.Integer, db.ForeignKey('scooters.id'), nullable=False)
+    bucket_start = db.Column(db.DateTime, nullable=False)
+    
+    point_count = db.Column(db.Integer, nullable=False, default=0)
+    # MEDIUMBLOB on MySQL; a raw hour at one point per second is 86 KB
+    points = db.Column(db.LargeBinary(length=2 ** 24 - 1), nullable=False, default=b'')
+    
+    def __repr__(self):
+        return f'<ScooterTrack {self.scooter_id} {self.bucket_start}>'
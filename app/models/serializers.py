@@ -0,0 +1,230 @@
+"""
+Column-projected serializers for ScootRapid list endpoints
+
+Each serializer selects only the columns its output needs and turns result rows
+into dicts through a function generated once per variant (public and sensitive),
+so list endpoints skip ORM hydration and per-row to_dict calls.
+"""
+
+from datetime import datetime
+from app import db
+from app.models.user import User
+from app.models.scooter import Scooter
+from app.models.rental import Rental
+from app.models.payment import Payment
+
+ISOFORMAT = object()
+
+def _float(value):
+    return float(value) if value is not None else None
+
+def _float_or_zero(value):
+    return float(value) if value else 0.0
+
+class Serializer:
+    """
+    Field specs are tuples of ``(key, column)``, ``(key, column, convert)`` or
+    ``(key, (column, ...), convert)``. ``convert`` may be ISOFORMAT for datetimes.
+    Columns of joined tables are outer joined through ``joins``.
+    """
+
+    def __init__(self, name, model, public, sensitive=(), joins=()):
+        self.name = name
+        self.model = model
+        self.joins = joins
+        self._keys = {
+            False: tuple(field[0] for field in public),
+            True: tuple(field[0] for field in list(public) + list(sensitive))
+        }
+        self._variants = {
+            False: self._compile(f'{name}_public', public),
+            True: self._compile(f'{name}_sensitive', list(public) + list(sensitive))
+        }
+
+    def query(self, include_sensitive=False):
+        """Query selecting exactly the columns of one variant"""
+        columns, _ = self._variants[include_sensitive]
+        query = db.session.query(*columns)
+        for target, onclause in self.joins:
+            query = query.outerjoin(target, onclause)
+        return query
+
+    def dump(self, row, include_sensitive=False):
+        return self._variants[include_sensitive][1](row)
+
+    def dump_object(self, obj, include_sensitive=False):
+        """Serialize an already loaded instance of a serializer without joins"""
+        columns, serialize = self._variants[include_sensitive]
+        return serialize(tuple(getattr(obj, column.key) for column in columns))
+
+    def dump_all(self, rows, include_sensitive=False):
+        serialize = self._variants[include_sensitive][1]
+        return [serialize(row) for row in rows]
+
+    def function(self, include_sensitive=False):
+        return self._variants[include_sensitive][1]
+
+    def keys(self, include_sensitive=False):
+        """Output keys of one variant, in order"""
+        return self._keys[include_sensitive]
+
+    def _compile(self, function_name, fields):
+        columns = []
+        positions = {}
+        namespace = {}
+        items = []
+
+        for n, field in enumerate(fields):
+            key, sources = field[0], field[1]
+            convert = field[2] if len(field) > 2 else None
+            if not isinstance(sources, tuple):
+                sources = (sources,)
+
+            args = []
+            for source in sources:
+                column = source.expression
+                name = (column.table.name, column.key)
+                if name not in positions:
+                    positions[name] = len(columns)
+                    if column.table is not self.model.__table__:
+                        # Keep the primary model's column names free for keyset pagination
+                        source = source.label(f'{column.table.name}_{column.key}')
+                    columns.append(source)
+                args.append(f'row[{positions[name]}]')
+
+            if convert is None:
+                expr = args[0]
+            elif convert is ISOFORMAT:
+                expr = f'({args[0]}.isoformat() if {args[0]} is not None else None)'
+            else:
+                namespace[f'_convert{n}'] = convert
+                expr = f"_convert{n}({', '.join(args)})"
+            items.append(f'{key!r}: {expr}')
+
+        source = f"def {function_name}(row):\n    return {{{', '.join(items)}}}\n"
+        exec(compile(source, f'<serializer {function_name}>', 'exec'), namespace)
+        return columns, namespace[function_name]
+
+def _scooter_available(status, battery_level):
+    return status == 'available' and battery_level > 15
+
+def _rental_duration(duration_minutes, start_time, end_time):
+    # Mirrors Rental.get_duration_minutes
+    if duration_minutes:
+        return duration_minutes
+    if start_time:
+        return int(((end_time or datetime.utcnow()) - start_time).total_seconds() / 60)
+    return 0
+
+def _rental_scooter(scooter_id, identifier, model, brand, license_plate):
+    if scooter_id is None:
+        return None
+    return {
+        'id': scooter_id,
+        'identifier': identifier,
+        'model': model,
+        'brand': brand,
+        'license_plate': license_plate
+    }
+
+scooter_serializer = Serializer('scooter', Scooter, public=[
+    ('id', Scooter.id),
+    ('identifier', Scooter.identifier),
+    ('model', Scooter.model),
+    ('brand', Scooter.brand),
+    ('latitude', Scooter.latitude),
+    ('longitude', Scooter.longitude),
+    ('address', Scooter.address),
+    ('status', Scooter.status),
+    ('battery_level', Scooter.battery_level),
+    ('is_available', (Scooter.status, Scooter.battery_level), _scooter_available),
+    ('created_at', Scooter.created_at, ISOFORMAT)
+], sensitive=[
+    ('qr_code', Scooter.qr_code),
+    ('max_speed', Scooter.max_speed),
+    ('range_km', Scooter.range_km),
+    ('provider_id', Scooter.provider_id),
+    ('last_maintenance', Scooter.last_maintenance, ISOFORMAT),
+    ('updated_at', Scooter.updated_at, ISOFORMAT)
+])
+
+# Scooter state kept by the availability cache; templates read it like a Scooter
+scooter_state_serializer = Serializer('scooter_state', Scooter, public=[
+    ('id', Scooter.id),
+    ('identifier', Scooter.identifier),
+    ('model', Scooter.model),
+    ('brand', Scooter.brand),
+    ('license_plate', Scooter.license_plate),
+    ('latitude', Scooter.latitude),
+    ('longitude', Scooter.longitude),
+    ('address', Scooter.address),
+    ('status', Scooter.status),
+    ('battery_level', Scooter.battery_level),
+    ('is_available', (Scooter.status, Scooter.battery_level), _scooter_available),
+    ('max_speed', Scooter.max_speed),
+    ('range_km', Scooter.range_km),
+    ('provider_id', Scooter.provider_id),
+    ('created_at', Scooter.created_at, ISOFORMAT),
+    ('updated_at', Scooter.updated_at, ISOFORMAT)
+])
+
+rental_serializer = Serializer('rental', Rental, public=[
+    ('id', Rental.id),
+    ('rental_code', Rental.rental_code),
+    ('user_id', Rental.user_id),
+    ('scooter_id', Rental.scooter_id),
+    ('status', Rental.status),
+    ('start_time', Rental.start_time, ISOFORMAT),
+    ('end_time', Rental.end_time, ISOFORMAT),
+    ('duration_minutes', (Rental.duration_minutes, Rental.start_time, Rental.end_time), _rental_duration),
+    ('total_cost', Rental.total_cost, _float_or_zero),
+    ('created_at', Rental.created_at, ISOFORMAT),
+    ('scooter', (Scooter.id, Scooter.identifier, Scooter.model, Scooter.brand, Scooter.license_plate),
+     _rental_scooter)
+], sensitive=[
+    ('start_latitude', Rental.start_latitude),
+    ('start_longitude', Rental.start_longitude),
+    ('end_latitude', Rental.end_latitude),
+    ('end_longitude', Rental.end_longitude),
+    ('distance_km', Rental.distance_km),
+    ('base_fee', Rental.base_fee, _float),
+    ('per_minute_rate', Rental.per_minute_rate, _float),
+    ('rating', Rental.rating),
+    ('feedback', Rental.feedback),
+    ('updated_at', Rental.updated_at, ISOFORMAT)
+], joins=[(Scooter, Rental.scooter_id == Scooter.id)])
+
+payment_serializer = Serializer('payment', Payment, public=[
+    ('id', Payment.id),
+    ('transaction_id', Payment.transaction_id),
+    ('user_id', Payment.user_id),
+    ('rental_id', Payment.rental_id),
+    ('amount', Payment.amount, _float),
+    ('currency', Payment.currency),
+    ('payment_method', Payment.payment_method),
+    ('status', Payment.status),
+    ('created_at', Payment.created_at, ISOFORMAT)
+], sensitive=[
+    ('gateway_transaction_id', Payment.gateway_transaction_id),
+    ('refund_amount', Payment.refund_amount, _float),
+    ('refund_reason', Payment.refund_reason),
+    ('refunded_at', Payment.refunded_at, ISOFORMAT),
+    ('processed_at', Payment.processed_at, ISOFORMAT),
+    ('updated_at', Payment.updated_at, ISOFORMAT)
+])
+
+user_serializer = Serializer('user', User, public=[
+    ('id', User.id),
+    ('email', User.email),
+    ('first_name', User.first_name),
+    ('last_name', User.last_name),
+    ('full_name', (User.first_name, User.last_name), lambda first, last: f"{first} {last}"),
+    ('role', User.role),
+    ('is_active', User.is_active),
+    ('created_at', User.created_at, ISOFORMAT)
+], sensitive=[
+    ('phone', User.phone),
+    ('is_verified', User.is_verified),
+    ('last_login', User.last_login, ISOFORMAT),
+    ('updated_at', User.updated_at, ISOFORMAT)
+])
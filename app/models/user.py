@@ -3,7 +3,6 @@ User model for ScootRapid using SQLAlchemy
 """
 
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin
 from app import db
 
@@ -22,7 +21,7 @@ class User(UserMixin, db.Model):
     is_active = db.Column(db.Boolean, default=True, nullable=False)
     is_verified = db.Column(db.Boolean, default=False, nullable=False)
     
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_login = db.Column(db.DateTime)
     
@@ -36,14 +35,15 @@ class User(UserMixin, db.Model):
             self.email = kwargs['email'].lower()
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        from app.services.password_service import password_hasher
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        from app.services.password_service import password_hasher
+        return password_hasher.verify(password, self.password_hash)
     
     def update_last_login(self):
         self.last_login = datetime.utcnow()
-        db.session.commit()
     
     def get_full_name(self):
         return f"{self.first_name} {self.last_name}"
@@ -0,0 +1,10 @@
+"""
+Services for ScootRapid
+"""
+
+from .dashboard_service import get_fleet_summary, get_provider_dashboard, invalidate_fleet_summary
+from .availability_service import availability_cache
+from .rental_service import RentalError, start_rental
+
+__all__ = ['get_fleet_summary', 'get_provider_dashboard', 'invalidate_fleet_summary', 'availability_cache',
+           'RentalError', 'start_rental']
@@ -0,0 +1,170 @@
+"""
+Scooter availability cache for ScootRapid
+
+Holds the state of every scooter and the set of available scooter ids in a
+cache backend (see app.utils.cache_backends).
+
+Writes go through the cache: after a scooter change is committed, ``sync``
+stores the new state and, when the status changed, bumps the availability
+version. The available set is stored under that version, so a set filled
+from a database snapshot taken before the change can never be read again.
+With the Redis backend every gunicorn worker shares state and version;
+the in-process backend is only exact with a single worker. A ``ttl`` of 0
+turns the cache off and reads every state from the database, which the app
+does for an in-process backend with several workers.
+"""
+
+import json
+from app.utils.cache_backends import InProcessBackend
+
+VERSION_KEY = 'availability:version'
+
+
+class AvailabilityCache:
+    """Write-through cache of scooter states and the available set"""
+
+    def __init__(self, backend=None, ttl=30):
+        self.backend = backend or InProcessBackend()
+        self.ttl = ttl
+
+    def configure(self, backend=None, ttl=None):
+        """Apply settings from the app config"""
+        if backend is not None:
+            self.backend = backend
+        if ttl is not None:
+            self.ttl = ttl
+
+    def sync(self, scooter):
+        """Write the committed state of a scooter to the cache"""
+        if scooter.id is None or not self.ttl:
+            return
+
+        from app.models.serializers import scooter_state_serializer
+
+        state = scooter_state_serializer.dump_object(scooter)
+        previous = self.backend.get(self._state_key(scooter.id))
+        self.backend.set(self._state_key(scooter.id), json.dumps(state), self.ttl)
+
+        # Location and battery changes keep the set, status changes may not
+        if previous is None or json.loads(previous)['status'] != state['status']:
+            self.invalidate()
+
+    def patch(self, changes):
+        """
+        Write committed column changes of several scooters, keyed by scooter id
+        Only states already cached are patched; the others are loaded on demand
+        """
+        if not self.ttl:
+            return
+        scooter_ids = list(changes)
+        cached = self.backend.get_many([self._state_key(scooter_id) for scooter_id in scooter_ids])
+
+        for scooter_id, value in zip(scooter_ids, cached):
+            if value is None:
+                continue
+            state = json.loads(value)
+            state.update(changes[scooter_id])
+            state['is_available'] = state['status'] == 'available' and state['battery_level'] > 15
+            self.backend.set(self._state_key(scooter_id), json.dumps(state), self.ttl)
+
+    def forget(self, scooter_ids):
+        """Drop cached states so they are loaded again on the next read"""
+        for scooter_id in scooter_ids:
+            self.backend.delete(self._state_key(scooter_id))
+
+    def remove(self, scooter_id):
+        """Drop a deleted scooter"""
+        self.backend.delete(self._state_key(scooter_id))
+        self.invalidate()
+
+    def invalidate(self):
+        """Retire the current available set in every worker"""
+        self.backend.incr(VERSION_KEY)
+
+    def get(self, scooter_id):
+        """State of one scooter as a dict, or None if it does not exist"""
+        states = self._states([scooter_id])
+        return states[0] if states else None
+
+    def available(self, min_battery=None, limit=None):
+        """
+        States of all available scooters, ordered by id
+        Optionally restricted to a minimum battery level (exclusive)
+        """
+        states = [state for state in self._states(self._available_ids()) if state['status'] == 'available']
+        if min_battery is not None:
+            states = [state for state in states if state['battery_level'] > min_battery]
+        return states[:limit] if limit is not None else states
+
+    def _available_ids(self):
+        from app import db
+        from app.models.scooter import Scooter
+        from app.models.serializers import scooter_state_serializer
+        from app.utils.db_routing import primary_reads
+
+        # Read the version before the database so a concurrent change retires this fill
+        version = self.backend.get(VERSION_KEY) or '0'
+        key = f'availability:{version}:ids'
+
+        cached = self.backend.get(key) if self.ttl else None
+        if cached is not None:
+            return json.loads(cached)
+
+        # A fill from a lagging replica would be cached under the new version for the whole ttl
+        with primary_reads(db.session()):
+            rows = scooter_state_serializer.query().filter(Scooter.status == 'available').order_by(Scooter.id).all()
+        states = scooter_state_serializer.dump_all(rows)
+        self._store(states)
+        ids = [state['id'] for state in states]
+        if self.ttl:
+            self.backend.set(key, json.dumps(ids), self.ttl)
+        return ids
+
+    def _states(self, scooter_ids):
+        from app import db
+        from app.models.scooter import Scooter
+        from app.models.serializers import scooter_state_serializer
+        from app.utils.db_routing import primary_reads
+
+        if not scooter_ids:
+            return []
+
+        if self.ttl:
+            cached = self.backend.get_many([self._state_key(scooter_id) for scooter_id in scooter_ids])
+        else:
+            cached = [None] * len(scooter_ids)
+        states = {}
+        missing = []
+        for scooter_id, value in zip(scooter_ids, cached):
+            if value is None:
+                missing.append(scooter_id)
+            else:
+                states[scooter_id] = json.loads(value)
+
+        if missing:
+            with primary_reads(db.session()):
+                rows = scooter_state_serializer.query().filter(Scooter.id.in_(missing)).all()
+            loaded = scooter_state_serializer.dump_all(rows)
+            self._store(loaded)
+            states.update((state['id'], state) for state in loaded)
+
+        return [states[scooter_id] for scooter_id in scooter_ids if scooter_id in states]
+
+    def _store(self, states):
+        # Never overwrite a state written through by a newer commit
+        if self.ttl:
+            self.backend.add_many({self._state_key(state['id']): json.dumps(state) for state in states},
+                                  self.ttl)
+
+    @staticmethod
+    def _state_key(scooter_id):
+        return f'scooter:{scooter_id}:state'
+
+
+def public_state(state):
+    """Project a cached state onto the public Scooter.to_dict fields"""
+    from app.models.serializers import scooter_serializer
+    return {key: state[key] for key in scooter_serializer.keys()}
+
+
+availability_cache = AvailabilityCache()
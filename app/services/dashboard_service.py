@@ -0,0 +1,85 @@
+"""
+Dashboard data service for ScootRapid
+"""
+
+from sqlalchemy.orm import contains_eager, joinedload
+from app import db
+from app.models.scooter import Scooter
+from app.models.rental import Rental
+from app.models.user import User
+from app.utils.cache import TTLCache
+from app.utils.db_routing import primary_reads
+
+fleet_summary_cache = TTLCache()
+
+def get_fleet_summary():
+    """
+    Fleet-wide counters for the admin dashboard
+    Cached for FLEET_SUMMARY_CACHE_TTL seconds
+    """
+    return fleet_summary_cache.get_or_set('fleet', _load_fleet_summary)
+
+def invalidate_fleet_summary():
+    fleet_summary_cache.clear()
+
+def _load_fleet_summary():
+    # Cached for the whole ttl, so counts of a lagging replica would outlive the lag
+    with primary_reads(db.session()):
+        scooter_counts = dict(
+            db.session.query(Scooter.status, db.func.count(Scooter.id)).group_by(Scooter.status).all()
+        )
+        rental_counts = dict(
+            db.session.query(Rental.status, db.func.count(Rental.id)).group_by(Rental.status).all()
+        )
+        total_users = User.query.count()
+    
+    return {
+        'total_users': total_users,
+        'total_scooters': sum(scooter_counts.values()),
+        'available_scooters': scooter_counts.get('available', 0),
+        'in_use_scooters': scooter_counts.get('in_use', 0),
+        'maintenance_scooters': scooter_counts.get('maintenance', 0),
+        'total_rentals': sum(rental_counts.values()),
+        'active_rentals': rental_counts.get('active', 0),
+        'overdue_rentals': rental_counts.get('overdue', 0)
+    }
+
+def get_provider_dashboard(provider_id, recent_limit=10):
+    """
+    Collect everything the provider dashboard shows
+    Uses a fixed number of queries regardless of fleet size
+    """
+    scooters = Scooter.query.filter_by(provider_id=provider_id).order_by(Scooter.identifier).all()
+    
+    status_counts = dict(
+        db.session.query(Scooter.status, db.func.count(Scooter.id))
+        .filter(Scooter.provider_id == provider_id)
+        .group_by(Scooter.status)
+        .all()
+    )
+    
+    total_revenue = db.session.query(db.func.coalesce(db.func.sum(Rental.total_cost), 0)).join(
+        Scooter, Rental.scooter_id == Scooter.id
+    ).filter(
+        Scooter.provider_id == provider_id,
+        Rental.status == 'completed'
+    ).scalar()
+    
+    recent_rentals = Rental.query.join(
+        Scooter, Rental.scooter_id == Scooter.id
+    ).filter(
+        Scooter.provider_id == provider_id
+    ).options(
+        contains_eager(Rental.scooter),
+        joinedload(Rental.user)
+    ).order_by(Rental.created_at.desc()).limit(recent_limit).all()
+    
+    return {
+        'scooters': scooters,
+        'total_scooters': sum(status_counts.values()),
+        'available': status_counts.get('available', 0),
+        'in_use': status_counts.get('in_use', 0),
+        'maintenance': status_counts.get('maintenance', 0),
+        'total_revenue': float(total_revenue),
+        'recent_rentals': recent_rentals
+    }
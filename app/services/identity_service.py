@@ -0,0 +1,135 @@
+"""
+Cached user identities for ScootRapid
+
+Authorization only needs a user's id, role and active flag. ``IdentityCache``
+keeps those in the cache backend for IDENTITY_CACHE_TTL seconds, so the
+Flask-Login user loader and the JWT admin check answer without a query.
+The full ``User`` row is loaded only when a request reads another attribute.
+
+Changing a user's role, password or active flag drops the cached identity
+once the change is committed. That has to reach every worker, so the cache
+needs a shared backend: create_app turns it off (TTL 0) when the in-process
+backend would be used by several workers.
+"""
+
+import json
+from flask_login import UserMixin
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app import db
+from app.models.user import User
+from app.utils.cache_backends import InProcessBackend
+from app.utils.db_routing import primary_reads
+
+# Session.info key collecting ids of users whose identity changed in the transaction
+CHANGED_KEY = 'changed_identities'
+
+class Identity(UserMixin):
+    """Authorization view of a user; other attributes are read from the User row, loaded on first use"""
+
+    _fields = ('id', 'role', 'is_active', '_user')
+    # Shadows UserMixin's read-only property
+    is_active = True
+
+    def __init__(self, id, role, is_active):
+        self.id = id
+        self.role = role
+        self.is_active = is_active
+        self._user = None
+
+    @property
+    def user(self):
+        if self._user is None:
+            self._user = db.session.get(User, self.id)
+        return self._user
+
+    def __getattr__(self, name):
+        # Only called for names Identity does not define itself
+        if name.startswith('__') or name in self._fields:
+            raise AttributeError(name)
+        return getattr(self.user, name)
+
+    def __setattr__(self, name, value):
+        if name in self._fields:
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self.user, name, value)
+
+    def is_admin(self):
+        return self.role == 'admin'
+
+    def is_provider(self):
+        return self.role == 'provider'
+
+    def is_customer(self):
+        return self.role == 'customer'
+
+    def can_manage_scooters(self):
+        return self.role in ['admin', 'provider']
+
+    def __repr__(self):
+        return f'<Identity {self.id} {self.role}>'
+
+class IdentityCache:
+    """Short-lived cache of (id, role, is_active) per user"""
+
+    def __init__(self, backend=None, ttl=30):
+        self.backend = backend or InProcessBackend()
+        self.ttl = ttl
+
+    def configure(self, backend=None, ttl=None):
+        """Apply settings from the app config"""
+        if backend is not None:
+            self.backend = backend
+        if ttl is not None:
+            self.ttl = ttl
+
+    def get(self, user_id):
+        """Identity of a user, or None if the user does not exist"""
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            return None
+
+        cached = self.backend.get(self._key(user_id)) if self.ttl else None
+        if cached is not None:
+            return Identity(*json.loads(cached))
+
+        # Flask-Login may load the user inside a replica read; a cached role must not lag
+        with primary_reads(db.session()):
+            row = db.session.query(User.id, User.role, User.is_active).filter(User.id == user_id).first()
+        if row is None:
+            return None
+        if self.ttl:
+            self.backend.set(self._key(user_id), json.dumps([row.id, row.role, row.is_active]), self.ttl)
+        return Identity(row.id, row.role, row.is_active)
+
+    def invalidate(self, user_id):
+        self.backend.delete(self._key(user_id))
+
+    @staticmethod
+    def _key(user_id):
+        return f'user:{user_id}:identity'
+
+identity_cache = IdentityCache()
+
+def _identity_changed(target, value, oldvalue, initiator):
+    if target.id is None or value == oldvalue:
+        return
+    session = object_session(target)
+    if session is None:
+        identity_cache.invalidate(target.id)
+    else:
+        session.info.setdefault(CHANGED_KEY, set()).add(target.id)
+
+for attribute in (User.role, User.password_hash, User.is_active):
+    event.listen(attribute, 'set', _identity_changed)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed(session):
+    for user_id in session.info.pop(CHANGED_KEY, ()):
+        identity_cache.invalidate(user_id)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back(session):
+    session.info.pop(CHANGED_KEY, None)
@@ -0,0 +1,58 @@
+"""
+Domain counters for ScootRapid
+
+Rental and payment status changes are counted from the models themselves, so
+every code path (web, API, jobs) is covered. The changes of a transaction
+are collected in the session and counted only once it commits.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+from app.models.payment import Payment
+from app.models.rental import Rental
+from app.utils.metrics import metrics
+
+# Session.info key collecting the counters to increase when the transaction commits
+PENDING_KEY = 'pending_metrics'
+
+RENTAL_STATUS_COUNTERS = {
+    'completed': 'scootrapid_rentals_ended_total',
+    'cancelled': 'scootrapid_rentals_cancelled_total'
+}
+
+def _count_after_commit(target, name):
+    session = object_session(target)
+    if session is None:
+        metrics.inc(name)
+    else:
+        session.info.setdefault(PENDING_KEY, []).append(name)
+
+@event.listens_for(Rental, 'after_insert')
+def _rental_started(mapper, connection, target):
+    if target.status in Rental.OPEN_STATUSES:
+        _count_after_commit(target, 'scootrapid_rentals_started_total')
+
+@event.listens_for(Rental.status, 'set')
+def _rental_status_changed(target, value, oldvalue, initiator):
+    # Only status changes of stored rentals, not rentals created as completed
+    if target.id is not None and value != oldvalue and value in RENTAL_STATUS_COUNTERS:
+        _count_after_commit(target, RENTAL_STATUS_COUNTERS[value])
+
+@event.listens_for(Payment, 'after_insert')
+def _payment_recorded(mapper, connection, target):
+    if target.status == 'completed':
+        _count_after_commit(target, 'scootrapid_payments_completed_total')
+
+@event.listens_for(Payment.status, 'set')
+def _payment_status_changed(target, value, oldvalue, initiator):
+    if target.id is not None and value != oldvalue and value == 'completed':
+        _count_after_commit(target, 'scootrapid_payments_completed_total')
+
+@event.listens_for(Session, 'after_commit')
+def _count_committed(session):
+    for name in session.info.pop(PENDING_KEY, ()):
+        metrics.inc(name)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rolled_back(session):
+    session.info.pop(PENDING_KEY, None)
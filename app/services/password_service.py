@@ -0,0 +1,154 @@
+"""
+Password hashing for ScootRapid
+
+Hashing is deliberately slow, so it runs on a small thread pool instead of in
+every request thread at once: PBKDF2 (hashlib) and bcrypt both release the
+GIL, so PASSWORD_HASH_WORKERS threads use that many cores while the rest of
+the worker keeps serving. At most PASSWORD_HASH_QUEUE further hashes may
+wait; beyond that ``PasswordHashingBusy`` is raised and logins answer 503
+instead of piling up during a login wave. The limit is per process, so it only
+takes effect with threaded gunicorn workers (gthread, see gunicorn.conf.py)
+that have more request threads than PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE;
+the remaining threads keep serving other requests.
+
+Algorithm and cost are configurable. A stored hash made with other settings
+still verifies, and ``check_login`` replaces it after a successful login.
+bcrypt only reads the first 72 bytes of a password, so passwords are hashed
+with SHA-256 before bcrypt (stored as ``bcrypt-sha256$<bcrypt hash>``).
+"""
+
+import base64
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Cost used when PASSWORD_HASH_COST is 0: PBKDF2 iterations (werkzeug's default) or bcrypt rounds
+DEFAULT_COST = {'pbkdf2': 600000, 'bcrypt': 12}
+
+# Marks bcrypt hashes of the SHA-256 digest of a password
+BCRYPT_SHA256_PREFIX = 'bcrypt-sha256$'
+
+# Longest password bcrypt reads in full
+BCRYPT_MAX_BYTES = 72
+
+class PasswordHashingBusy(RuntimeError):
+    """Too many password hashes are queued"""
+
+class PasswordHasher:
+    """Hashes and verifies passwords on a bounded thread pool"""
+
+    def __init__(self, algorithm='pbkdf2', cost=0, workers=2, queue=32):
+        self._executor = None
+        self._lock = threading.Lock()
+        self.configure(algorithm, cost, workers, queue)
+
+    def configure(self, algorithm=None, cost=None, workers=None, queue=None):
+        """Apply settings from the app config"""
+        if algorithm is not None:
+            if algorithm not in DEFAULT_COST:
+                raise ValueError(f"Unknown password hash algorithm: {algorithm}")
+            self.algorithm = algorithm
+        if cost is not None:
+            self.cost_setting = cost
+        if workers is not None:
+            self.workers = workers
+        if queue is not None:
+            self.queue = queue
+
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            # Running plus waiting hashes
+            self._slots = threading.BoundedSemaphore(self.workers + self.queue)
+
+    @property
+    def cost(self):
+        return self.cost_setting or DEFAULT_COST[self.algorithm]
+
+    def hash(self, password):
+        """Hash a password with the configured algorithm and cost"""
+        return self._run(self._hash, password, self.algorithm, self.cost)
+
+    def verify(self, password, stored):
+        """Check a password against a stored hash of any supported algorithm"""
+        if not stored or password is None:
+            return False
+        return self._run(self._verify, password, stored)
+
+    def needs_rehash(self, stored):
+        """Whether a stored hash was made with other settings than the configured ones"""
+        return self._parameters(stored) != (self.algorithm, self.cost)
+
+    def _run(self, func, *args):
+        if self.workers <= 0:
+            return func(*args)
+
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHashingBusy("Too many password checks in progress")
+        try:
+            future = self._get_executor().submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-hash')
+            return self._executor
+
+    @staticmethod
+    def _hash(password, algorithm, cost):
+        if algorithm == 'bcrypt':
+            return BCRYPT_SHA256_PREFIX + bcrypt.hashpw(_digest(password), bcrypt.gensalt(rounds=cost)).decode()
+        return generate_password_hash(password, method=f'pbkdf2:sha256:{cost}')
+
+    @staticmethod
+    def _verify(password, stored):
+        if stored.startswith(BCRYPT_SHA256_PREFIX):
+            return _checkpw(_digest(password), stored[len(BCRYPT_SHA256_PREFIX):])
+        if stored.startswith('$2'):
+            # Plain bcrypt would accept anything sharing the first 72 bytes
+            password = password.encode()
+            return len(password) <= BCRYPT_MAX_BYTES and _checkpw(password, stored)
+        return check_password_hash(stored, password)
+
+    @staticmethod
+    def _parameters(stored):
+        if stored.startswith(BCRYPT_SHA256_PREFIX):
+            # bcrypt-sha256$$2b$<rounds>$<salt and hash>; plain bcrypt hashes are always replaced
+            parts = stored[len(BCRYPT_SHA256_PREFIX):].split('$')
+            return ('bcrypt', int(parts[2])) if len(parts) > 3 and parts[2].isdigit() else None
+        method = stored.split('$', 1)[0].split(':')
+        if method[0] == 'pbkdf2' and len(method) == 3 and method[1] == 'sha256' and method[2].isdigit():
+            return ('pbkdf2', int(method[2]))
+        return None
+
+def _digest(password):
+    # Base64 keeps NUL bytes out of bcrypt's input; 44 bytes fit its limit
+    return base64.b64encode(hashlib.sha256(password.encode()).digest())
+
+def _checkpw(password, stored):
+    try:
+        return bcrypt.checkpw(password, stored.encode())
+    except ValueError:
+        return False
+
+password_hasher = PasswordHasher()
+
+def check_login(user, password):
+    """
+    Verify a login password and upgrade an outdated stored hash
+    The new hash is committed with the caller's transaction (e.g. with update_last_login)
+    Raises PasswordHashingBusy when the hashing queue is full
+    """
+    if not password_hasher.verify(password, user.password_hash):
+        return False
+    if password_hasher.needs_rehash(user.password_hash):
+        user.password_hash = password_hasher.hash(password)
+    return True
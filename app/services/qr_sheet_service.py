@@ -0,0 +1,50 @@
+"""
+QR sticker sheets for a provider's fleet
+"""
+
+from flask import current_app
+from app import db
+from app.models.scooter import Scooter
+from app.utils.qr_generator import scooter_qr_payload
+from app.utils.qr_sheets import FORMATS, render_pages, write_sheets
+
+class QRSheetError(ValueError):
+    """A sheet request was rejected"""
+
+class NoScootersFound(QRSheetError):
+    pass
+
+class TooManyLabels(QRSheetError):
+    pass
+
+def fleet_labels(provider_id=None):
+    """(payload, caption) of every scooter of a provider, or of all scooters, by identifier"""
+    query = db.session.query(Scooter.id, Scooter.qr_code, Scooter.identifier).order_by(Scooter.identifier)
+    if provider_id is not None:
+        query = query.filter(Scooter.provider_id == provider_id)
+    return [(scooter_qr_payload(row), row.identifier) for row in query]
+
+def build_fleet_sheets(provider_id=None, fmt='pdf', workers=None, progress=None, max_labels=None):
+    """
+    Render the sticker sheets of a fleet
+    ``workers`` defaults to QR_SHEET_WORKERS (0 uses every CPU); ``progress(done, total)`` counts pages;
+    fleets of more than ``max_labels`` scooters are rejected with TooManyLabels
+    Returns: (data, mimetype, filename, scooter count)
+    """
+    if fmt not in FORMATS:
+        raise QRSheetError(f"Format must be one of: {', '.join(FORMATS)}")
+
+    labels = fleet_labels(provider_id)
+    if not labels:
+        raise NoScootersFound("No scooters found")
+    if max_labels and len(labels) > max_labels:
+        raise TooManyLabels(f"{len(labels)} scooters exceed the limit of {max_labels} labels per download; "
+                            "render large fleets with `flask qr-sheets`")
+
+    if workers is None:
+        workers = current_app.config.get('QR_SHEET_WORKERS') or None
+
+    pages = render_pages(labels, workers=workers, progress=progress)
+    mimetype, extension = FORMATS[fmt]
+    filename = f"qr-sheets-{provider_id if provider_id is not None else 'all'}.{extension}"
+    return write_sheets(pages, fmt), mimetype, filename, len(labels)
@@ -0,0 +1,150 @@
+"""
+Rental operations for ScootRapid
+
+Every operation applies all of its changes in one transaction. A rental start
+claims its scooter with a conditional UPDATE, so of several concurrent starts
+for one scooter exactly one matches the row.
+"""
+
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy.exc import OperationalError
+from app import db
+from app.models.rental import Rental
+from app.models.scooter import Scooter
+from app.models.user import User
+from app.services.dashboard_service import invalidate_fleet_summary
+from app.services.scooter_service import scooter_changed
+from app.services.transaction import after_commit, transaction
+
+# MySQL lock wait timeout and deadlock
+RETRYABLE_MYSQL_ERRORS = (1205, 1213)
+
+class RentalError(ValueError):
+    """A rental operation was rejected"""
+
+class ScooterNotFound(RentalError):
+    pass
+
+class ScooterUnavailable(RentalError):
+    pass
+
+class ActiveRentalExists(RentalError):
+    pass
+
+def start_rental(user_id, scooter_id, start_latitude=None, start_longitude=None, retries=None):
+    """
+    Start a rental in a single transaction
+    Retries lock timeouts and deadlocks up to ``retries`` times (RENTAL_START_RETRIES);
+    a scooter taken by someone else is reported at once as ScooterUnavailable
+    """
+    if retries is None:
+        retries = current_app.config.get('RENTAL_START_RETRIES', 3)
+
+    attempt = 0
+    while True:
+        try:
+            with transaction():
+                rental = _start_rental(user_id, scooter_id, start_latitude, start_longitude)
+            return rental
+        except OperationalError as e:
+            if attempt >= retries or not is_retryable(e):
+                raise
+            attempt += 1
+            time.sleep(0.01 * 2 ** attempt)
+
+def end_rental(rental, end_latitude=None, end_longitude=None):
+    """Complete a rental and release its scooter with one commit"""
+    with transaction():
+        rental.end_rental(end_latitude, end_longitude)
+        if rental.scooter is not None:
+            scooter_changed(rental.scooter)
+    return rental
+
+def cancel_rental(rental, reason=None):
+    """Cancel a rental and release its scooter with one commit"""
+    with transaction():
+        rental.cancel_rental(reason)
+        if rental.scooter is not None:
+            scooter_changed(rental.scooter)
+    return rental
+
+def rate_rental(rental, rating, feedback=None):
+    with transaction():
+        rental.add_rating(rating, feedback)
+    return rental
+
+def flag_overdue_rentals(max_hours=None, now=None):
+    """
+    Mark active rentals running longer than ``max_hours`` (MAX_RENTAL_TIME_HOURS) as overdue
+    Uses one set-based UPDATE; returns {'flagged': <number of rentals flagged>} for the job log
+    """
+    if max_hours is None:
+        max_hours = current_app.config.get('MAX_RENTAL_TIME_HOURS', 12)
+    now = now or datetime.utcnow()
+
+    with transaction():
+        result = db.session.execute(
+            db.update(Rental)
+            .where(Rental.status == 'active', Rental.start_time < now - timedelta(hours=max_hours))
+            .values(status='overdue', updated_at=now)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            after_commit(invalidate_fleet_summary)
+
+    return {'flagged': result.rowcount}
+
+def claim_scooter(scooter_id):
+    """
+    Mark an available scooter as in use inside the current transaction
+    Raises ScooterNotFound or ScooterUnavailable when no row was claimed
+    """
+    result = db.session.execute(
+        db.update(Scooter)
+        .where(Scooter.id == scooter_id, Scooter.status == 'available', Scooter.battery_level > 15)
+        .values(status='in_use', updated_at=datetime.utcnow())
+    )
+
+    if result.rowcount != 1:
+        if db.session.get(Scooter, scooter_id) is None:
+            raise ScooterNotFound("Scooter not found")
+        raise ScooterUnavailable("Scooter is not available")
+
+def is_retryable(error):
+    """Whether a failed start may succeed when run again"""
+    orig = getattr(error, 'orig', None)
+    if orig is not None and orig.args and orig.args[0] in RETRYABLE_MYSQL_ERRORS:
+        return True
+    return 'database is locked' in str(error)
+
+def _start_rental(user_id, scooter_id, start_latitude, start_longitude):
+    # Serialize starts of the same user; SQLite ignores FOR UPDATE but claims below take its write lock
+    user = db.session.execute(
+        db.select(User.id).where(User.id == user_id).with_for_update()
+    ).scalar()
+    if user is None:
+        raise RentalError("User not found")
+
+    claim_scooter(scooter_id)
+
+    active = db.session.query(Rental.id).filter(
+        Rental.user_id == user_id, Rental.status.in_(Rental.OPEN_STATUSES)
+    ).first()
+    if active:
+        raise ActiveRentalExists("User already has an active rental")
+
+    scooter = db.session.get(Scooter, scooter_id)
+    rental = Rental(
+        user_id=user_id,
+        scooter_id=scooter_id,
+        start_latitude=start_latitude if start_latitude is not None else scooter.latitude,
+        start_longitude=start_longitude if start_longitude is not None else scooter.longitude,
+        status='active',
+        start_time=datetime.utcnow()
+    )
+    db.session.add(rental)
+    scooter_changed(scooter)
+
+    return rental
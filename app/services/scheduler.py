@@ -0,0 +1,133 @@
+"""
+Background jobs for ScootRapid
+
+Jobs run periodically either in a daemon thread of every web worker
+(SCHEDULER_ENABLED) or in a separate process started with ``flask run-jobs``.
+Every run takes a database advisory lock named after the job and skips the
+tick when another process holds it, so with several gunicorn workers a job
+still runs in one of them at a time.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from flask import current_app
+from sqlalchemy import text
+from app import db
+
+LOCK_PREFIX = 'scootrapid:job:'
+
+# Fallback for databases without advisory locks (SQLite): exclusive within this process only
+_local_locks = {}
+_local_guard = threading.Lock()
+
+@contextmanager
+def advisory_lock(name):
+    """
+    Try to take a lock shared by every process using the database
+    Yields whether the lock was acquired; never waits for it
+    """
+    dialect = db.engine.dialect.name
+
+    if dialect in ('mysql', 'postgresql'):
+        if dialect == 'mysql':
+            acquire = text('SELECT GET_LOCK(:name, 0)')
+            release = text('SELECT RELEASE_LOCK(:name)')
+        else:
+            acquire = text('SELECT pg_try_advisory_lock(hashtext(:name))')
+            release = text('SELECT pg_advisory_unlock(hashtext(:name))')
+
+        # A dedicated connection: the lock belongs to it, not to the session's transactions
+        with db.engine.connect() as connection:
+            acquired = bool(connection.execute(acquire, {'name': name}).scalar())
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    connection.execute(release, {'name': name})
+        return
+
+    with _local_guard:
+        lock = _local_locks.setdefault(name, threading.Lock())
+    acquired = lock.acquire(blocking=False)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            lock.release()
+
+class Job:
+    """A function run every ``interval`` seconds"""
+
+    def __init__(self, name, func, interval):
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.next_run = 0.0
+        self.last_result = None
+
+class Scheduler:
+    """Runs registered jobs when they are due, each under its advisory lock"""
+
+    def __init__(self):
+        self.jobs = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_job(self, name, func, interval):
+        """Register a job; a job registered again under the same name replaces it"""
+        self.jobs[name] = Job(name, func, interval)
+
+    def run_job(self, name):
+        """
+        Run a job now unless another process is running it
+        Returns the job's result, or None when the run was skipped
+        """
+        job = self.jobs[name]
+        with advisory_lock(LOCK_PREFIX + name) as acquired:
+            if not acquired:
+                current_app.logger.info(f"Job {name} skipped: running elsewhere")
+                return None
+            started = time.perf_counter()
+            result = job.func()
+
+        job.last_result = result
+        current_app.logger.info(f"Job {name} finished in {(time.perf_counter() - started) * 1000:.1f} ms: {result}")
+        return result
+
+    def run_pending(self, now=None):
+        """Run every due job; a failing job is logged and retried on its next interval"""
+        now = time.monotonic() if now is None else now
+        results = {}
+        for job in list(self.jobs.values()):
+            if now < job.next_run:
+                continue
+            job.next_run = now + job.interval
+            try:
+                results[job.name] = self.run_job(job.name)
+            except Exception:
+                current_app.logger.exception(f"Job {job.name} failed")
+        return results
+
+    def run_forever(self, app, tick=1.0):
+        """Run due jobs every ``tick`` seconds until ``stop`` is called"""
+        while not self._stop.is_set():
+            with app.app_context():
+                self.run_pending()
+            self._stop.wait(tick)
+
+    def start(self, app, tick=1.0):
+        """Run the jobs in a daemon thread of this process"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run_forever, args=(app, tick), name='scheduler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+scheduler = Scheduler()
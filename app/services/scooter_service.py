@@ -0,0 +1,47 @@
+"""
+Scooter operations for ScootRapid
+
+Each operation commits once and then updates the nearby search index, the
+availability cache and the fleet counters.
+"""
+
+from datetime import datetime
+from app.services import track_service
+from app.services.availability_service import availability_cache
+from app.services.dashboard_service import invalidate_fleet_summary
+from app.services.transaction import after_commit, transaction
+from app.utils.geo_index import scooter_index
+
+def set_status(scooter, status):
+    with transaction():
+        scooter.set_status(status)
+        scooter_changed(scooter)
+
+def update_location(scooter, latitude, longitude, address=None):
+    with transaction():
+        scooter.update_location(latitude, longitude, address)
+        track_service.record([(scooter.id, datetime.utcnow(), latitude, longitude)])
+        scooter_changed(scooter)
+
+def set_battery_level(scooter, battery_level):
+    with transaction():
+        scooter.set_battery_level(battery_level)
+        scooter_changed(scooter)
+
+def scooter_changed(scooter):
+    """Publish a scooter change once the current transaction is committed"""
+    after_commit(_publish, scooter)
+
+def scooter_removed(scooter_id):
+    """Drop a deleted scooter once the current transaction is committed"""
+    after_commit(_unpublish, scooter_id)
+
+def _publish(scooter):
+    scooter_index.sync(scooter)
+    availability_cache.sync(scooter)
+    invalidate_fleet_summary()
+
+def _unpublish(scooter_id):
+    scooter_index.remove(scooter_id)
+    availability_cache.remove(scooter_id)
+    invalidate_fleet_summary()
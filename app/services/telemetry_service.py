@@ -0,0 +1,207 @@
+"""
+Bulk telemetry ingestion for ScootRapid
+
+The IoT gateway reports ``(identifier, latitude, longitude, battery_level, ts)``
+for thousands of scooters at a time. Reports are applied with one executemany
+UPDATE per chunk, each chunk in its own transaction. The UPDATE only matches
+rows whose ``last_seen_at`` is older than the report, so late or replayed
+reports never overwrite newer positions, even across concurrent batches.
+Applied positions are also appended to the scooter tracks, at most one per
+TRACK_MIN_INTERVAL seconds.
+"""
+
+import json
+import time
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import bindparam, or_
+from app import db
+from app.models.scooter import Scooter
+from app.services import track_service
+from app.services.availability_service import availability_cache
+from app.services.transaction import after_commit, transaction
+from app.utils.geo_index import scooter_index
+
+EPOCH = datetime(1970, 1, 1)
+
+def parse_ndjson(text):
+    """Records from newline-delimited JSON; blank lines are skipped"""
+    records = []
+    for number, line in enumerate(text.splitlines(), 1):
+        if line.strip():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                raise ValueError(f"Invalid JSON on line {number}")
+    return records
+
+def parse_timestamp(value):
+    """ISO 8601 string or epoch seconds, returned as naive UTC like the rest of the schema"""
+    if isinstance(value, bool):
+        raise ValueError("Invalid timestamp")
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value, timezone.utc).replace(tzinfo=None)
+    if isinstance(value, str):
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+        return parsed
+    raise ValueError("Invalid timestamp")
+
+def ingest(records, chunk_size=500):
+    """
+    Apply a batch of telemetry reports
+    Returns counters and throughput for the batch
+    """
+    started = time.perf_counter()
+    stats = {'received': len(records), 'applied': 0, 'stale': 0, 'rejected': 0, 'unknown': 0, 'chunks': 0}
+
+    # Keep only the newest valid report per scooter
+    latest = {}
+    for record in records:
+        report = _validate(record)
+        if report is None:
+            stats['rejected'] += 1
+            continue
+        current = latest.get(report['identifier'])
+        if current is not None:
+            stats['stale'] += 1
+            if current['ts'] >= report['ts']:
+                continue
+        latest[report['identifier']] = report
+
+    reports = list(latest.values())
+    for offset in range(0, len(reports), chunk_size):
+        _apply_chunk(reports[offset:offset + chunk_size], stats)
+        stats['chunks'] += 1
+
+    elapsed = time.perf_counter() - started
+    stats['duration_ms'] = round(elapsed * 1000, 2)
+    stats['rows_per_second'] = round(stats['received'] / elapsed) if elapsed > 0 else None
+    return stats
+
+def _validate(record):
+    if not isinstance(record, dict):
+        return None
+    try:
+        identifier = str(record['identifier']).strip().upper()
+        latitude = float(record['lat'] if 'lat' in record else record['latitude'])
+        longitude = float(record['lon'] if 'lon' in record else record['longitude'])
+        battery_level = record.get('battery_level')
+        if battery_level is not None:
+            battery_level = int(battery_level)
+        ts = parse_timestamp(record['ts'])
+    except (KeyError, TypeError, ValueError, OverflowError, OSError):
+        return None
+
+    if not identifier or not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+        return None
+    if battery_level is not None and not 0 <= battery_level <= 100:
+        return None
+
+    return {
+        'identifier': identifier,
+        'latitude': latitude,
+        'longitude': longitude,
+        'battery_level': battery_level,
+        'ts': ts
+    }
+
+def _apply_chunk(reports, stats):
+    table = Scooter.__table__
+
+    with transaction():
+        known = {
+            identifier: (scooter_id, last_seen_at)
+            for identifier, scooter_id, last_seen_at in db.session.query(
+                Scooter.identifier, Scooter.id, Scooter.last_seen_at
+            ).filter(Scooter.identifier.in_([report['identifier'] for report in reports]))
+        }
+
+        now = datetime.utcnow()
+        interval = current_app.config.get('TRACK_MIN_INTERVAL', 5)
+        params = {True: [], False: []}
+        points = []
+        for report in reports:
+            if report['identifier'] not in known:
+                stats['unknown'] += 1
+                continue
+            scooter_id, last_seen_at = known[report['identifier']]
+            if last_seen_at is not None and last_seen_at >= report['ts']:
+                stats['stale'] += 1
+                continue
+            row = {
+                'b_id': scooter_id,
+                'b_ts': report['ts'],
+                'b_latitude': report['latitude'],
+                'b_longitude': report['longitude'],
+                'b_updated_at': now
+            }
+            if report['battery_level'] is not None:
+                row['b_battery_level'] = report['battery_level']
+            params[report['battery_level'] is not None].append((report, row))
+            if last_seen_at is None or _slot(report['ts'], interval) != _slot(last_seen_at, interval):
+                points.append((scooter_id, report['ts'], report['latitude'], report['longitude']))
+
+        applied = {}
+        raced = []
+        for with_battery, rows in params.items():
+            if not rows:
+                continue
+            values = {
+                'latitude': bindparam('b_latitude'),
+                'longitude': bindparam('b_longitude'),
+                'last_seen_at': bindparam('b_ts'),
+                'updated_at': bindparam('b_updated_at')
+            }
+            if with_battery:
+                values['battery_level'] = bindparam('b_battery_level')
+
+            statement = table.update().where(
+                table.c.id == bindparam('b_id'),
+                or_(table.c.last_seen_at.is_(None), table.c.last_seen_at < bindparam('b_ts'))
+            ).values(**values)
+
+            result = db.session.execute(statement, [row for _, row in rows])
+            if db.engine.dialect.supports_sane_multi_rowcount and result.rowcount == len(rows):
+                won = rows
+            else:
+                # Some rows lost to a concurrent batch with newer reports, or the driver
+                # cannot tell how many matched; the rows carrying this report won
+                won = _rows_applied(rows)
+                won_ids = {row['b_id'] for _, row in won}
+                raced.extend(row['b_id'] for _, row in rows if row['b_id'] not in won_ids)
+            stats['stale'] += len(rows) - len(won)
+            stats['applied'] += len(won)
+
+            for report, row in won:
+                change = {'latitude': report['latitude'], 'longitude': report['longitude']}
+                if with_battery:
+                    change['battery_level'] = report['battery_level']
+                applied[row['b_id']] = change
+
+        # A point that lost a race is still a real position; tracks are sorted on read
+        track_service.record(points)
+        after_commit(_publish, applied, raced)
+
+def _rows_applied(rows):
+    """The ``(report, row)`` pairs whose values the scooters now hold"""
+    current = {
+        scooter_id: (last_seen_at, latitude, longitude)
+        for scooter_id, last_seen_at, latitude, longitude in db.session.query(
+            Scooter.id, Scooter.last_seen_at, Scooter.latitude, Scooter.longitude
+        ).filter(Scooter.id.in_([row['b_id'] for _, row in rows]))
+    }
+    return [
+        (report, row) for report, row in rows
+        if current.get(row['b_id']) == (row['b_ts'], row['b_latitude'], row['b_longitude'])
+    ]
+
+def _slot(ts, interval):
+    return int((ts - EPOCH).total_seconds() // interval) if interval else ts
+
+def _publish(changes, raced):
+    for scooter_id, change in changes.items():
+        scooter_index.move(scooter_id, change['latitude'], change['longitude'])
+    availability_cache.patch(changes)
+    availability_cache.forget(raced)
@@ -0,0 +1,160 @@
+"""
+Scooter position history for ScootRapid
+
+Positions are appended to hourly buckets (see app.models.scooter_track) with
+one upsert per batch that concatenates the packed points in the database, so
+an append never reads the bucket. Storage per scooter-day is bounded twice:
+telemetry records at most one point per TRACK_MIN_INTERVAL seconds, and
+``compact`` downsamples buckets older than TRACK_RAW_RETENTION_HOURS to one
+point per TRACK_COMPACT_RESOLUTION seconds. A trip distance reads only the
+buckets overlapping the trip and at most TRACK_MAX_DISTANCE_POINTS points.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import LargeBinary, cast, func
+from app import db
+from app.models.scooter_track import BUCKET_SECONDS, ScooterTrack
+from app.services.transaction import transaction
+from app.utils.distance import path_length_km
+from app.utils.tracks import downsample, pack_points, unpack_points
+
+def bucket_start(ts):
+    """Start of the bucket holding a naive UTC timestamp"""
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+def record(points):
+    """
+    Append positions inside the current transaction
+    ``points`` are (scooter_id, ts, latitude, longitude) tuples
+    """
+    buckets = defaultdict(list)
+    for scooter_id, ts, latitude, longitude in points:
+        start = bucket_start(ts)
+        buckets[scooter_id, start].append(((ts - start).total_seconds(), latitude, longitude))
+
+    if not buckets:
+        return 0
+
+    rows = [
+        {'scooter_id': scooter_id, 'bucket_start': start, 'point_count': len(triples), 'points': pack_points(triples)}
+        for (scooter_id, start), triples in buckets.items()
+    ]
+    db.session.execute(_append_statement(), rows)
+    return sum(row['point_count'] for row in rows)
+
+def track(scooter_id, start, end, max_points=None):
+    """
+    Recorded positions of a scooter between two timestamps, oldest first
+    Returns (latitudes, longitudes), thinned out evenly to at most ``max_points``
+    """
+    if max_points is None:
+        max_points = current_app.config.get('TRACK_MAX_DISTANCE_POINTS', 5000)
+
+    buckets = db.session.query(ScooterTrack.bucket_start, ScooterTrack.points).filter(
+        ScooterTrack.scooter_id == scooter_id,
+        ScooterTrack.bucket_start >= bucket_start(start),
+        ScooterTrack.bucket_start <= end
+    ).order_by(ScooterTrack.bucket_start).all()
+
+    latitudes = []
+    longitudes = []
+    for first, blob in buckets:
+        offsets, lats, lons = unpack_points(blob)
+        low = (start - first).total_seconds()
+        high = (end - first).total_seconds()
+        for offset, latitude, longitude in zip(offsets, lats, lons):
+            if low <= offset <= high:
+                latitudes.append(float(latitude))
+                longitudes.append(float(longitude))
+
+    if max_points and len(latitudes) > max_points:
+        # Even stride keeps the shape; the last point always stays
+        step = -(-len(latitudes) // max_points)
+        keep = list(range(len(latitudes) - 1, -1, -step))[::-1]
+        latitudes = [latitudes[i] for i in keep]
+        longitudes = [longitudes[i] for i in keep]
+
+    return latitudes, longitudes
+
+def trip_distance_km(scooter_id, start, end, start_point=None, end_point=None):
+    """
+    Distance travelled along the track between two timestamps
+    ``start_point`` and ``end_point`` are (latitude, longitude) pairs added at both ends
+    """
+    latitudes, longitudes = track(scooter_id, start, end) if scooter_id is not None else ([], [])
+
+    if start_point is not None:
+        latitudes.insert(0, start_point[0])
+        longitudes.insert(0, start_point[1])
+    if end_point is not None:
+        latitudes.append(end_point[0])
+        longitudes.append(end_point[1])
+
+    return round(path_length_km(latitudes, longitudes), 3)
+
+def compact(older_than=None, resolution=None, batch_size=200):
+    """
+    Downsample buckets that started before ``older_than`` to one point per ``resolution`` seconds
+    Each batch of buckets is rewritten in its own transaction
+    Returns counters for the run
+    """
+    config = current_app.config
+    if older_than is None:
+        older_than = datetime.utcnow() - timedelta(hours=config.get('TRACK_RAW_RETENTION_HOURS', 48))
+    if resolution is None:
+        resolution = config.get('TRACK_COMPACT_RESOLUTION', 60)
+
+    stats = {'buckets': 0, 'points_before': 0, 'points_after': 0}
+    last_id = 0
+    while True:
+        with transaction():
+            # Buckets already at most one point per slot are left alone
+            buckets = ScooterTrack.query.filter(
+                ScooterTrack.id > last_id,
+                ScooterTrack.bucket_start < older_than,
+                ScooterTrack.point_count > BUCKET_SECONDS // resolution
+            ).order_by(ScooterTrack.id).limit(batch_size).with_for_update().all()
+
+            for bucket in buckets:
+                kept = downsample(*unpack_points(bucket.points), resolution)
+                stats['buckets'] += 1
+                stats['points_before'] += bucket.point_count
+                stats['points_after'] += len(kept)
+                bucket.points = pack_points(kept)
+                bucket.point_count = len(kept)
+
+        if len(buckets) < batch_size:
+            return stats
+        last_id = buckets[-1].id
+
+def forget(scooter_id):
+    """Delete the history of a scooter inside the current transaction"""
+    ScooterTrack.query.filter_by(scooter_id=scooter_id).delete(synchronize_session=False)
+
+def _append_statement():
+    table = ScooterTrack.__table__
+    dialect = db.engine.dialect.name
+
+    if dialect == 'mysql':
+        from sqlalchemy.dialects.mysql import insert
+        statement = insert(table)
+        return statement.on_duplicate_key_update(
+            points=func.concat(table.c.points, statement.inserted.points),
+            point_count=table.c.point_count + statement.inserted.point_count
+        )
+
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    statement = insert(table)
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.scooter_id, table.c.bucket_start],
+        set_={
+            # SQLite's || yields text, the cast keeps the result a blob
+            'points': cast(table.c.points.op('||')(statement.excluded.points), LargeBinary),
+            'point_count': table.c.point_count + statement.excluded.point_count
+        }
+    )
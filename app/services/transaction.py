@@ -0,0 +1,46 @@
+"""
+Unit-of-work helpers for ScootRapid services
+
+Model methods only change state; a service wraps all mutations of one business
+operation in ``transaction()`` so they are committed together or not at all.
+"""
+
+from contextlib import contextmanager
+from app import db
+
+@contextmanager
+def transaction():
+    """
+    Commit once when the outermost block succeeds, roll back when it raises
+    Nested blocks join the outer transaction
+    """
+    session = db.session()
+    depth = session.info.get('transaction_depth', 0)
+    session.info['transaction_depth'] = depth + 1
+
+    try:
+        yield session
+        if depth == 0:
+            session.commit()
+    except Exception:
+        if depth == 0:
+            session.rollback()
+            session.info.pop('after_commit', None)
+        raise
+    finally:
+        session.info['transaction_depth'] = depth
+
+    if depth == 0:
+        for callback, args in session.info.pop('after_commit', []):
+            callback(*args)
+
+def after_commit(callback, *args):
+    """
+    Run ``callback(*args)`` once the current transaction is committed
+    Used for caches and indexes that must only see committed data
+    """
+    session = db.session()
+    if not session.info.get('transaction_depth'):
+        callback(*args)
+        return
+    session.info.setdefault('after_commit', []).append((callback, args))
@@ -2,13 +2,14 @@
 Utility functions for ScootRapid
 """
 
-from .decorators import admin_required, provider_required
+from .decorators import admin_required, provider_required, jwt_admin_required
 from .validators import validate_email, validate_password, validate_coordinates
 from .helpers import format_currency, format_duration, calculate_distance
 
 __all__ = [
     'admin_required', 
     'provider_required',
+    'jwt_admin_required',
     'validate_email', 
     'validate_password', 
     'validate_coordinates',
@@ -0,0 +1,49 @@
+"""
+Small in-process caches for ScootRapid
+"""
+
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Thread-safe key/value cache whose entries expire after ``ttl`` seconds.
+
+    The cache lives in one worker process; invalidating it does not reach other
+    gunicorn workers, so ``ttl`` is the upper bound for staleness there.
+    """
+
+    def __init__(self, ttl=15):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key, default=None):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= time.monotonic():
+            return default
+        return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+
+    def get_or_set(self, key, factory):
+        """Return the cached value or compute, store and return ``factory()``"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+
+        value = factory()
+        if self.ttl > 0:
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
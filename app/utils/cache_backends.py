@@ -0,0 +1,139 @@
+"""
+Key/value cache backends for ScootRapid
+
+Both backends offer the same small subset of Redis commands so services can be
+written once: ``InProcessBackend`` keeps the data in the worker process,
+``RedisBackend`` shares it between all workers through a Redis server.
+"""
+
+import threading
+import time
+
+
+class InProcessBackend:
+    """
+    Dictionary backed store with per-key expiry.
+
+    Every gunicorn worker has its own copy, so writes are not seen by the other
+    workers and ``ttl`` bounds how stale their entries can get.
+    """
+
+    shared = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or (entry[0] is not None and entry[0] <= time.monotonic()):
+            return None
+        return entry[1]
+
+    def get_many(self, keys):
+        return [self.get(key) for key in keys]
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._entries[key] = (self._expires(ttl), value)
+
+    def add_many(self, mapping, ttl=None):
+        """Store every pair whose key is not set yet"""
+        expires = self._expires(ttl)
+        with self._lock:
+            for key, value in mapping.items():
+                if self.get(key) is None:
+                    self._entries[key] = (expires, value)
+
+    def incr(self, key):
+        with self._lock:
+            value = int(self.get(key) or 0) + 1
+            self._entries[key] = (None, str(value))
+            return value
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @staticmethod
+    def _expires(ttl):
+        return time.monotonic() + ttl if ttl else None
+
+
+class RedisBackend:
+    """
+    Store on a Redis server, shared by every worker process.
+
+    ``client`` is a redis-py client (or anything with the same interface);
+    keys are namespaced with ``prefix``.
+    """
+
+    shared = True
+
+    def __init__(self, client, prefix='scootrapid:'):
+        self.client = client
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url, **kwargs):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError('The redis cache backend requires the redis package') from e
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, key):
+        return self._decode(self.client.get(self.prefix + key))
+
+    def get_many(self, keys):
+        if not keys:
+            return []
+        return [self._decode(value) for value in self.client.mget([self.prefix + key for key in keys])]
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, value, ex=ttl or None)
+
+    def add_many(self, mapping, ttl=None):
+        """Store every pair whose key is not set yet"""
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in mapping.items():
+            pipe.set(self.prefix + key, value, ex=ttl or None, nx=True)
+        pipe.execute()
+
+    def incr(self, key):
+        return int(self.client.incr(self.prefix + key))
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+    @staticmethod
+    def _decode(value):
+        if isinstance(value, bytes):
+            return value.decode('utf-8')
+        return value
+
+
+BACKENDS = {
+    'memory': InProcessBackend,
+    'redis': RedisBackend
+}
+
+
+def create_backend(name='memory', url=None):
+    """Build a backend from its config name"""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown cache backend '{name}'. Must be one of: {', '.join(BACKENDS)}")
+    if name == 'redis':
+        if not url:
+            raise ValueError('The redis cache backend requires a URL')
+        return RedisBackend.from_url(url)
+    return InProcessBackend()
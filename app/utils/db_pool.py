@@ -0,0 +1,116 @@
+"""
+Database connection pool instrumentation for ScootRapid
+
+``InstrumentedQueuePool`` is SQLAlchemy's QueuePool with timing around
+checkouts: how long a request waited for a free connection, how long the whole
+checkout took (including the pre-ping), how often the pool had to open
+overflow connections and how often a checkout timed out. The numbers are kept
+per worker process in ``pool_metrics``.
+"""
+
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+from sqlalchemy.pool import QueuePool
+
+# Waits at least this long (seconds) count as a wait for a busy pool
+WAIT_THRESHOLD = 0.001
+
+
+class PoolMetrics:
+    """Thread-safe checkout counters of the pools in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.checkouts = 0
+            self.checkout_seconds = 0.0
+            self.max_checkout_seconds = 0.0
+            self.waits = 0
+            self.wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+            self.overflows = 0
+            self.timeouts = 0
+            self.invalidated = 0
+
+    def record_wait(self, seconds, overflow):
+        with self._lock:
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+            if seconds >= WAIT_THRESHOLD:
+                self.waits += 1
+            if overflow:
+                self.overflows += 1
+
+    def record_checkout(self, seconds):
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_seconds += seconds
+            self.max_checkout_seconds = max(self.max_checkout_seconds, seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def record_invalidated(self):
+        with self._lock:
+            self.invalidated += 1
+
+    def snapshot(self, pool=None):
+        """Counters since the last reset, plus the current state of ``pool``"""
+        with self._lock:
+            stats = {
+                'checkouts': self.checkouts,
+                'checkout_ms_avg': round(self.checkout_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                'checkout_ms_max': round(self.max_checkout_seconds * 1000, 3),
+                'waits': self.waits,
+                'wait_ms_total': round(self.wait_seconds * 1000, 3),
+                'wait_ms_max': round(self.max_wait_seconds * 1000, 3),
+                'overflows': self.overflows,
+                'timeouts': self.timeouts,
+                'invalidated': self.invalidated
+            }
+        if isinstance(pool, QueuePool):
+            stats.update({
+                'size': pool.size(),
+                'checked_in': pool.checkedin(),
+                'checked_out': pool.checkedout(),
+                'overflow': max(pool.overflow(), 0)
+            })
+        return stats
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool recording checkout latency, wait time, overflow and timeouts into ``pool_metrics``"""
+
+    def connect(self):
+        started = time.perf_counter()
+        connection = super().connect()
+        pool_metrics.record_checkout(time.perf_counter() - started)
+        return connection
+
+    def _do_get(self):
+        overflow = self._overflow
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeout:
+            pool_metrics.record_wait(time.perf_counter() - started, False)
+            pool_metrics.record_timeout()
+            raise
+        # A connection opened past pool_size raises the overflow counter above 0
+        pool_metrics.record_wait(time.perf_counter() - started, self._overflow > max(overflow, 0))
+        return connection
+
+
+@event.listens_for(InstrumentedQueuePool, 'invalidate')
+def _invalidated(dbapi_connection, connection_record, exception):
+    # Stale connections found by the pre-ping, or broken mid-request
+    pool_metrics.record_invalidated()
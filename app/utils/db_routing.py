@@ -0,0 +1,122 @@
+"""
+Read replica routing for ScootRapid
+
+Views marked with ``@replica_reads`` send their plain SELECTs to the
+``replica`` bind of SQLALCHEMY_BINDS; everything else stays on the primary:
+
+- writes, flushes and locking reads (``with_for_update``),
+- every query of a session after it flushed a change, so a request reads
+  its own writes,
+- requests of a user who wrote within REPLICA_LAG_WINDOW seconds, so the
+  page after a rental start does not miss the rental while the replica lags.
+
+The last rule needs to know who wrote; the marker is kept in the cache backend,
+so with Redis it holds across workers. Cache fills read inside
+``primary_reads``, because a cached result outlives the replica lag. Without a
+``replica`` bind nothing changes.
+"""
+
+from contextlib import contextmanager
+from flask_jwt_extended import get_jwt_identity
+from flask_login import current_user
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql import Select
+from app.utils.cache_backends import InProcessBackend
+
+REPLICA_BIND = 'replica'
+
+# Session.info keys: reads may use the replica / the session flushed a change
+USE_REPLICA = 'use_replica'
+WROTE = 'wrote'
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends plain SELECTs of replica reads to the replica engine"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self._reads_from_replica(clause):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_replica(self, clause):
+        if not self.info.get(USE_REPLICA) or self.info.get(WROTE) or self._flushing:
+            return False
+        return isinstance(clause, Select) and clause._for_update_arg is None
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_written(session, flush_context):
+    session.info[WROTE] = True
+
+
+class ReplicaRouter:
+    """Decides per request whether reads may go to the replica"""
+
+    def __init__(self, backend=None, lag_window=5, enabled=False):
+        self.backend = backend or InProcessBackend()
+        self.lag_window = lag_window
+        self.enabled = enabled
+
+    def configure(self, backend=None, lag_window=None, enabled=None):
+        """Apply settings from the app config"""
+        if backend is not None:
+            self.backend = backend
+        if lag_window is not None:
+            self.lag_window = lag_window
+        if enabled is not None:
+            self.enabled = enabled
+
+    def remember_write(self, user_id):
+        """Keep a user's reads on the primary until the replica has caught up"""
+        if user_id is not None and self.lag_window:
+            self.backend.set(self._key(user_id), '1', self.lag_window)
+
+    def recently_wrote(self, user_id):
+        return user_id is not None and self.backend.get(self._key(user_id)) is not None
+
+    @contextmanager
+    def reads(self, session):
+        """Route the plain SELECTs of ``session`` to the replica within the block"""
+        if not self.enabled or self.recently_wrote(request_user_id()):
+            yield
+            return
+        session.info[USE_REPLICA] = True
+        try:
+            yield
+        finally:
+            session.info.pop(USE_REPLICA, None)
+
+    @staticmethod
+    def _key(user_id):
+        return f'user:{user_id}:wrote'
+
+
+replica_router = ReplicaRouter()
+
+
+@contextmanager
+def primary_reads(session):
+    """
+    Keep the SELECTs of ``session`` on the primary within the block, even in a
+    replica read; for reads whose result outlives the request, like cache fills
+    """
+    use_replica = session.info.pop(USE_REPLICA, None)
+    try:
+        yield
+    finally:
+        if use_replica is not None:
+            session.info[USE_REPLICA] = use_replica
+
+
+def request_user_id():
+    """Id of the user of the current request, logged in or by JWT, or None"""
+    if current_user and current_user.is_authenticated:
+        return current_user.id
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        # No JWT checked in this request
+        return None
@@ -3,8 +3,9 @@ Decorators for ScootRapid
 """
 
 from functools import wraps
-from flask import flash, redirect, url_for
+from flask import flash, jsonify, redirect, url_for
 from flask_login import current_user
+from flask_jwt_extended import get_jwt_identity
 
 def admin_required(f):
     """Decorator to require admin role"""
@@ -35,3 +36,27 @@ def provider_required(f):
         
         return f(*args, **kwargs)
     return decorated_function
+
+def jwt_admin_required(f):
+    """Decorator to require an admin JWT identity, use below @jwt_required()"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        from app.services.identity_service import identity_cache
+        
+        identity = identity_cache.get(get_jwt_identity())
+        if not identity or not identity.is_active or not identity.is_admin():
+            return jsonify({'error': 'Admin access required'}), 403
+        
+        return f(*args, **kwargs)
+    return decorated_function
+
+def replica_reads(f):
+    """Decorator sending the view's plain SELECTs to the read replica, place below the auth decorators"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        from app import db
+        from app.utils.db_routing import replica_router
+        
+        with replica_router.reads(db.session()):
+            return f(*args, **kwargs)
+    return decorated_function
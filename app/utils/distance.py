@@ -0,0 +1,153 @@
+"""
+Batched great-circle distance calculations for ScootRapid
+
+Works on contiguous coordinate arrays: NumPy arrays when NumPy is installed,
+``array('d')`` buffers otherwise. NumPy is imported on first use, not at
+start-up, where it would add about 50 ms to every worker boot.
+"""
+
+import heapq
+from array import array
+from math import asin, cos, radians, sin, sqrt
+
+# NumPy once load_numpy() ran and found it
+np = None
+_numpy_checked = False
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEGREE = 111.0
+
+
+def load_numpy():
+    """The numpy module, imported on the first call, or None when it is not installed"""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:  # pragma: no cover - depends on the environment
+            pass
+    return np
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Latitude-aware bounding box around a point
+    Returns: (min_lat, max_lat, min_lon, max_lon)
+    """
+    lat_delta = radius_km / KM_PER_DEGREE
+    # A degree of longitude shrinks with cos(latitude); clamp near the poles
+    lon_delta = min(radius_km / (KM_PER_DEGREE * max(cos(radians(latitude)), 0.01)), 180.0)
+
+    return (
+        max(latitude - lat_delta, -90.0),
+        min(latitude + lat_delta, 90.0),
+        longitude - lon_delta,
+        longitude + lon_delta
+    )
+
+
+def pack_coordinates(points):
+    """
+    Pack (latitude, longitude) pairs into two contiguous arrays
+    Returns: (latitudes, longitudes)
+    """
+    lats = array('d')
+    lons = array('d')
+    for latitude, longitude in points:
+        lats.append(latitude)
+        lons.append(longitude)
+
+    np = load_numpy()
+    if np is not None:
+        return np.frombuffer(lats, dtype=np.float64), np.frombuffer(lons, dtype=np.float64)
+    return lats, lons
+
+
+def haversine_many(lats, lons, latitude, longitude):
+    """
+    Distances in kilometers from one point to every coordinate in the arrays
+    """
+    np = load_numpy()
+    if np is not None:
+        lat1 = np.radians(np.asarray(lats, dtype=np.float64))
+        lon1 = np.radians(np.asarray(lons, dtype=np.float64))
+        lat2 = radians(latitude)
+        lon2 = radians(longitude)
+
+        a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    lat2 = radians(latitude)
+    lon2 = radians(longitude)
+    cos_lat2 = cos(lat2)
+
+    distances = array('d', bytes(8 * len(lats)))
+    for i, (lat, lon) in enumerate(zip(lats, lons)):
+        lat1 = radians(lat)
+        a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos_lat2 * sin((lon2 - radians(lon)) / 2) ** 2
+        distances[i] = 2 * EARTH_RADIUS_KM * asin(sqrt(min(a, 1.0)))
+    return distances
+
+
+def path_length_km(lats, lons):
+    """
+    Length in kilometers of the path through the coordinates, in order
+    """
+    if len(lats) < 2:
+        return 0.0
+
+    np = load_numpy()
+    if np is not None:
+        lat = np.radians(np.asarray(lats, dtype=np.float64))
+        lon = np.radians(np.asarray(lons, dtype=np.float64))
+
+        a = np.sin(np.diff(lat) / 2) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(np.diff(lon) / 2) ** 2
+        return float(np.sum(2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))))
+
+    total = 0.0
+    for lat1, lon1, lat2, lon2 in zip(lats, lons, lats[1:], lons[1:]):
+        lat1, lat2 = radians(lat1), radians(lat2)
+        a = sin((lat2 - lat1) / 2) ** 2 + cos(lat1) * cos(lat2) * sin(radians(lon2 - lon1) / 2) ** 2
+        total += 2 * EARTH_RADIUS_KM * asin(sqrt(min(a, 1.0)))
+    return total
+
+
+def top_k(distances, k=None, max_distance=None):
+    """
+    Partially sort distances
+    Returns a list of (distance, index) for the ``k`` smallest values, nearest first
+    """
+    count = len(distances)
+    if k is None or k > count:
+        k = count
+    if k <= 0:
+        return []
+
+    np = load_numpy()
+    if np is not None:
+        distances = np.asarray(distances)
+        if max_distance is not None:
+            candidates = np.flatnonzero(distances <= max_distance)
+        else:
+            candidates = np.arange(count)
+
+        if k < len(candidates):
+            part = np.argpartition(distances[candidates], k - 1)[:k]
+            candidates = candidates[part]
+        order = candidates[np.lexsort((candidates, distances[candidates]))]
+        return [(float(distances[i]), int(i)) for i in order]
+
+    pairs = ((d, i) for i, d in enumerate(distances))
+    if max_distance is not None:
+        pairs = (pair for pair in pairs if pair[0] <= max_distance)
+    return heapq.nsmallest(k, pairs)
+
+
+def nearest(lats, lons, latitude, longitude, k=None, max_distance=None):
+    """
+    Distances and partial sort in one call
+    Returns a list of (distance, index) for the ``k`` nearest coordinates
+    """
+    return top_k(haversine_many(lats, lons, latitude, longitude), k, max_distance)
@@ -0,0 +1,205 @@
+"""
+In-memory spatial index for available scooters
+"""
+
+import heapq
+import threading
+import time
+from math import cos, floor, radians
+
+from app.utils.distance import KM_PER_DEGREE, bounding_box, haversine_many, pack_coordinates, top_k
+
+
+class ScooterGridIndex:
+    """
+    Uniform latitude/longitude grid of available scooter positions.
+
+    Every worker process keeps its own index. It is considered cold until it has
+    been built from the database and again once it is older than ``max_age``
+    seconds, which bounds how stale it can get through updates made by other
+    gunicorn workers.
+    """
+
+    def __init__(self, cell_size=0.01, max_age=30):
+        self.cell_size = cell_size
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        self._cells = {}
+        self._positions = {}
+        self._built_at = None
+
+    def configure(self, cell_size=None, max_age=None):
+        """Apply settings from the app config, dropping any existing data"""
+        with self._lock:
+            if cell_size:
+                self.cell_size = cell_size
+            if max_age is not None:
+                self.max_age = max_age
+            self.clear()
+
+    @property
+    def is_warm(self):
+        built_at = self._built_at
+        return built_at is not None and time.monotonic() - built_at < self.max_age
+
+    def __len__(self):
+        return len(self._positions)
+
+    def clear(self):
+        with self._lock:
+            self._cells = {}
+            self._positions = {}
+            self._built_at = None
+
+    def rebuild(self, rows):
+        """Replace the index content with ``(id, latitude, longitude)`` rows"""
+        cells = {}
+        positions = {}
+        for scooter_id, latitude, longitude in rows:
+            positions[scooter_id] = (latitude, longitude)
+            cells.setdefault(self._cell(latitude, longitude), set()).add(scooter_id)
+
+        with self._lock:
+            self._cells = cells
+            self._positions = positions
+            self._built_at = time.monotonic()
+
+    def add(self, scooter_id, latitude, longitude):
+        with self._lock:
+            self._discard(scooter_id)
+            self._positions[scooter_id] = (latitude, longitude)
+            self._cells.setdefault(self._cell(latitude, longitude), set()).add(scooter_id)
+
+    def move(self, scooter_id, latitude, longitude):
+        """Update the position of a scooter that is already indexed"""
+        with self._lock:
+            if scooter_id in self._positions:
+                self.add(scooter_id, latitude, longitude)
+
+    def remove(self, scooter_id):
+        with self._lock:
+            self._discard(scooter_id)
+
+    def sync(self, scooter):
+        """Mirror the current status and position of a scooter into the index"""
+        if scooter.id is None or self._built_at is None:
+            return
+
+        if scooter.status == 'available':
+            self.add(scooter.id, scooter.latitude, scooter.longitude)
+        else:
+            self.remove(scooter.id)
+
+    def within_radius(self, latitude, longitude, radius_km, limit=None):
+        """
+        Find scooters within ``radius_km`` of a point
+        Returns a list of (distance_km, scooter_id) sorted by distance
+        """
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, radius_km)
+        min_cell = self._cell(min_lat, min_lon)
+        max_cell = self._cell(max_lat, max_lon)
+
+        with self._lock:
+            cell_count = (max_cell[0] - min_cell[0] + 1) * (max_cell[1] - min_cell[1] + 1)
+            if cell_count > len(self._cells):
+                candidates = list(self._positions)
+            else:
+                candidates = []
+                for lat_cell in range(min_cell[0], max_cell[0] + 1):
+                    for lon_cell in range(min_cell[1], max_cell[1] + 1):
+                        candidates.extend(self._cells.get((lat_cell, lon_cell), ()))
+            positions = [self._positions[scooter_id] for scooter_id in candidates]
+
+        lats, lons = pack_coordinates(positions)
+        distances = haversine_many(lats, lons, latitude, longitude)
+        return [(distance, candidates[i]) for distance, i in top_k(distances, limit, radius_km)]
+
+    def nearest(self, latitude, longitude, k, max_radius_km=None):
+        """
+        Find the ``k`` nearest scooters by searching rings of grid cells
+        Returns a list of (distance_km, scooter_id) sorted by distance
+
+        Once the rings span more cells than are occupied, e.g. for a far away
+        outlier, every indexed scooter is scanned instead.
+        """
+        if k <= 0:
+            return []
+
+        center = self._cell(latitude, longitude)
+        # The k nearest so far, as a max-heap of (-distance, scooter_id)
+        best = []
+        ring = 0
+        scan = None
+
+        with self._lock:
+            total = len(self._positions)
+            occupied = len(self._cells)
+            seen = 0
+            while seen < total:
+                if (2 * ring + 1) ** 2 > occupied:
+                    scan = list(self._positions)
+                    positions = [self._positions[scooter_id] for scooter_id in scan]
+                    break
+
+                ids = []
+                for cell in self._ring_cells(center, ring):
+                    ids.extend(self._cells.get(cell, ()))
+
+                if ids:
+                    seen += len(ids)
+                    lats, lons = pack_coordinates(self._positions[scooter_id] for scooter_id in ids)
+                    distances = haversine_many(lats, lons, latitude, longitude)
+                    for i, scooter_id in enumerate(ids):
+                        if len(best) < k:
+                            heapq.heappush(best, (-distances[i], scooter_id))
+                        elif distances[i] < -best[0][0]:
+                            heapq.heapreplace(best, (-distances[i], scooter_id))
+
+                # Every point closer than this has been visited by now
+                covered_km = ring * self.cell_size * KM_PER_DEGREE * max(
+                    cos(radians(min(abs(latitude) + (ring + 1) * self.cell_size, 89.0))), 0.01
+                )
+                if max_radius_km is not None and covered_km >= max_radius_km:
+                    break
+                if len(best) >= k and -best[0][0] <= covered_km:
+                    break
+                ring += 1
+
+        if scan is not None:
+            lats, lons = pack_coordinates(positions)
+            distances = haversine_many(lats, lons, latitude, longitude)
+            return [(distance, scan[i]) for distance, i in top_k(distances, k, max_radius_km)]
+
+        hits = sorted((-negated, scooter_id) for negated, scooter_id in best)
+        if max_radius_km is not None:
+            hits = [hit for hit in hits if hit[0] <= max_radius_km]
+        return [(float(distance), scooter_id) for distance, scooter_id in hits]
+
+    def _cell(self, latitude, longitude):
+        return (floor(latitude / self.cell_size), floor(longitude / self.cell_size))
+
+    def _discard(self, scooter_id):
+        position = self._positions.pop(scooter_id, None)
+        if position is None:
+            return
+        cell = self._cells.get(self._cell(*position))
+        if cell is not None:
+            cell.discard(scooter_id)
+            if not cell:
+                del self._cells[self._cell(*position)]
+
+    @staticmethod
+    def _ring_cells(center, ring):
+        if ring == 0:
+            yield center
+            return
+        lat0, lon0 = center
+        for lon_cell in range(lon0 - ring, lon0 + ring + 1):
+            yield (lat0 - ring, lon_cell)
+            yield (lat0 + ring, lon_cell)
+        for lat_cell in range(lat0 - ring + 1, lat0 + ring):
+            yield (lat_cell, lon0 - ring)
+            yield (lat_cell, lon0 + ring)
+
+
+scooter_index = ScooterGridIndex()
@@ -0,0 +1,296 @@
+"""
+Prometheus-style metrics for ScootRapid
+
+``MetricsRegistry`` keeps counters and histograms in memory; recording a value
+is a dictionary update under a lock. A background thread of every gunicorn
+worker writes its values to its own file in METRICS_DIR every
+METRICS_FLUSH_INTERVAL seconds when they changed (and on exit), and GET /metrics
+adds up the files of all workers, so any worker can answer a scrape. When a
+worker exits, the master folds its file into ``exited.json`` (see
+gunicorn.conf.py), which keeps counters monotonic without a file per worker
+ever started; the directory is emptied at the next start.
+
+Without METRICS_DIR the endpoint only reports the answering process.
+"""
+
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from flask import g, request
+
+try:
+    import fcntl
+except ImportError:  # Windows: no gunicorn, a single process
+    fcntl = None
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_DURATION = 'scootrapid_http_request_duration_seconds'
+REQUESTS = 'scootrapid_http_requests_total'
+
+# Values of exited workers, merged by the gunicorn master
+EXITED_FILE = 'exited.json'
+
+# Name: (type, help text) of the metrics shown by /metrics
+DESCRIPTIONS = {
+    REQUEST_DURATION: ('histogram', 'Request latency by blueprint and endpoint'),
+    REQUESTS: ('counter', 'Requests by blueprint, endpoint, method and status code'),
+    'scootrapid_rentals_started_total': ('counter', 'Rentals started'),
+    'scootrapid_rentals_ended_total': ('counter', 'Rentals ended'),
+    'scootrapid_rentals_cancelled_total': ('counter', 'Rentals cancelled'),
+    'scootrapid_payments_completed_total': ('counter', 'Payments completed')
+}
+
+
+class MetricsRegistry:
+    """Counters and histograms of this process, shared with the other workers through METRICS_DIR"""
+
+    def __init__(self, directory=None, flush_interval=1.0, enabled=True):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.directory = None
+        self._dirty = False
+        self._flusher = None
+        self._file = None
+        self.configure(directory, flush_interval, enabled)
+        if hasattr(os, 'register_at_fork'):
+            # Workers forked from a preloaded app must not count the master's values again
+            os.register_at_fork(after_in_child=self._forget)
+        atexit.register(self.flush)
+
+    def configure(self, directory=None, flush_interval=None, enabled=None):
+        """Apply settings from the app config"""
+        if directory is not None:
+            self.directory = directory or None
+            self._file = None
+        if flush_interval is not None:
+            self.flush_interval = flush_interval
+        if enabled is not None:
+            self.enabled = enabled
+
+    def init_app(self, app):
+        """Time every request"""
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+            self._dirty = True
+        if self._flusher is None and self.directory:
+            self._start_flusher()
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [list(buckets), [0] * (len(buckets) + 1), 0.0]
+            histogram[1][bisect_left(histogram[0], value)] += 1
+            histogram[2] += value
+            self._dirty = True
+        if self._flusher is None and self.directory:
+            self._start_flusher()
+
+    def flush(self):
+        """Write this process's values to its file in the metrics directory"""
+        if not self.directory:
+            return
+        with self._lock:
+            data = json.dumps(self._dump())
+            self._dirty = False
+        path = self._path()
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as f:
+            f.write(data)
+        os.replace(temporary, path)
+
+    def collect(self):
+        """Counters and histograms of all workers, added up"""
+        with self._lock:
+            sources = [self._dump()]
+        if self.directory and os.path.isdir(self.directory):
+            own = self._path() if self._file else None
+            # Not while the master moves an exited worker's values to another file
+            with _directory_lock(self.directory, exclusive=False):
+                sources.extend(_load(path) for path in glob.glob(os.path.join(self.directory, '*.json'))
+                               if path != own)
+        return _merge(sources)
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        counters, histograms = self.collect()
+        families = {}
+        for (name, labels), value in counters.items():
+            families.setdefault(name, []).append(f'{name}{_labels(labels)} {_number(value)}')
+        for (name, labels), (bounds, counts, total) in histograms.items():
+            lines = families.setdefault(name, [])
+            cumulative = 0
+            for bound, count in zip(list(bounds) + ['+Inf'], counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels(labels + (("le", _number(bound)),))} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labels)} {_number(total)}')
+            lines.append(f'{name}_count{_labels(labels)} {cumulative}')
+
+        output = []
+        for name in sorted(families):
+            kind, description = DESCRIPTIONS.get(name, ('untyped', name))
+            output.append(f'# HELP {name} {description}')
+            output.append(f'# TYPE {name} {kind}')
+            output.extend(sorted(families[name]))
+        return '\n'.join(output) + '\n'
+
+    def clear(self):
+        """Drop every value of this process, and its file"""
+        with self._lock:
+            self.counters = {}
+            self.histograms = {}
+        if self.directory and self._file and os.path.exists(self._path()):
+            os.remove(self._path())
+
+    def _start_request(self):
+        if self.enabled:
+            g.metrics_started = time.perf_counter()
+
+    def _finish_request(self, response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+
+        blueprint = request.blueprint or ''
+        # Unmatched URLs share one label instead of one series per path
+        endpoint = request.endpoint or 'unmatched'
+        self.observe(REQUEST_DURATION, time.perf_counter() - started, blueprint=blueprint, endpoint=endpoint)
+        self.inc(REQUESTS, blueprint=blueprint, endpoint=endpoint, method=request.method,
+                 status=str(response.status_code))
+        return response
+
+    def _start_flusher(self):
+        with self._lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._flush_periodically, name='metrics-flush', daemon=True)
+        self._flusher.start()
+
+    def _flush_periodically(self):
+        # Values of an idle worker and of background jobs reach the other workers too
+        while True:
+            time.sleep(self.flush_interval)
+            if self._dirty:
+                try:
+                    self.flush()
+                except OSError:
+                    # The directory was removed; the next change tries again
+                    continue
+
+    def _dump(self):
+        return _dump(self.counters, self.histograms)
+
+    def _path(self):
+        if self._file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            # A new file per process, so a recycled pid does not overwrite an exited worker's counts
+            self._file = f'{os.getpid()}-{uuid.uuid4().hex[:8]}.json'
+        return os.path.join(self.directory, self._file)
+
+    def _forget(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self._dirty = False
+        # Threads do not survive a fork
+        self._flusher = None
+        self._file = None
+
+
+metrics = MetricsRegistry()
+
+
+def clear_directory(directory):
+    """Remove the files of earlier runs; call once before the workers start"""
+    for path in glob.glob(os.path.join(directory, '*.json')):
+        os.remove(path)
+
+
+def merge_exited(directory, pid):
+    """Fold the files of an exited worker into EXITED_FILE; call from the gunicorn master"""
+    if not os.path.isdir(directory):
+        return
+    with _directory_lock(directory, exclusive=True):
+        paths = glob.glob(os.path.join(directory, f'{pid}-*.json'))
+        if not paths:
+            return
+        exited = os.path.join(directory, EXITED_FILE)
+        sources = [_load(path) for path in [exited] + paths]
+        temporary = f'{exited}.tmp'
+        with open(temporary, 'w') as f:
+            f.write(json.dumps(_dump(*_merge(sources))))
+        os.replace(temporary, exited)
+        for path in paths:
+            os.remove(path)
+
+
+@contextmanager
+def _directory_lock(directory, exclusive):
+    if fcntl is None:
+        yield
+        return
+    with open(os.path.join(directory, '.lock'), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _load(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        # Missing or cut short (a crashed worker); its values are lost or back on the next scrape
+        return {'counters': [], 'histograms': []}
+
+
+def _merge(sources):
+    counters, histograms = {}, {}
+    for source in sources:
+        for name, labels, value in source['counters']:
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, bounds, counts, total in source['histograms']:
+            key = (name, tuple(map(tuple, labels)))
+            merged = histograms.setdefault(key, [bounds, [0] * len(counts), 0.0])
+            merged[1] = [a + b for a, b in zip(merged[1], counts)]
+            merged[2] += total
+    return counters, histograms
+
+
+def _dump(counters, histograms):
+    return {
+        'counters': [[name, labels, value] for (name, labels), value in counters.items()],
+        'histograms': [[name, labels, bounds, counts, total]
+                       for (name, labels), (bounds, counts, total) in histograms.items()]
+    }
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in labels)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(labels, escaped)) + '}'
+
+
+def _number(value):
+    if isinstance(value, str):
+        return value
+    return repr(float(value)) if isinstance(value, float) else str(value)
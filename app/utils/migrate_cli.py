@@ -0,0 +1,35 @@
+"""
+Lazily loaded ``flask db`` command for ScootRapid
+
+Flask-Migrate pulls in Alembic, which costs about 150 ms per import. Web
+workers never run migrations, so ``MigrateCommand`` stands in for the
+``db`` command group and sets up Flask-Migrate only when a migration command
+is actually invoked.
+"""
+
+import click
+from flask.cli import ScriptInfo
+
+
+class MigrateCommand(click.Group):
+    """``flask db``: Flask-Migrate's commands, imported on first use"""
+
+    def __init__(self, db, directory='migrations', **kwargs):
+        super().__init__(name='db', help='Perform database migrations.', **kwargs)
+        self.db = db
+        self.directory = directory
+
+    def list_commands(self, ctx):
+        return self._commands(ctx).list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._commands(ctx).get_command(ctx, name)
+
+    def _commands(self, ctx):
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as commands
+
+        app = ctx.ensure_object(ScriptInfo).load_app()
+        if 'migrate' not in app.extensions:
+            Migrate(app, self.db, directory=self.directory)
+        return commands
@@ -0,0 +1,52 @@
+"""
+Keyset (cursor) pagination for ScootRapid list endpoints
+"""
+
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+MAX_PAGE_SIZE = 500
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """
+    Encode the sort key of the last row on a page as an opaque cursor
+    """
+    payload = json.dumps([created_at.isoformat(), row_id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+def decode_cursor(cursor: str):
+    """
+    Decode a cursor produced by encode_cursor
+    Returns: (created_at, id)
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+def keyset_paginate(query, model, cursor=None, limit=50):
+    """
+    Return one page of ``query`` ordered newest first by (created_at, id)
+    Returns: (items, next_cursor) where next_cursor is None on the last page
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            model.created_at < created_at,
+            and_(model.created_at == created_at, model.id < row_id)
+        ))
+    
+    items = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1).all()
+    
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+    
+    return items, next_cursor
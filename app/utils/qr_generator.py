@@ -1,56 +1,169 @@
 """
 QR Code Generator for ScootRapid
+
+Rendering a QR code (matrix, PIL image, PNG encoding) is CPU-heavy, and the
+PNG depends only on the payload and the rendering options. ``QRCodeCache``
+keys every PNG by a hash of those inputs, keeps recent ones in an in-process
+LRU and, when a directory is configured, on disk where all workers share
+them. The same key serves as the ETag of the image routes.
 """
 
-import qrcode
-import io
 import base64
-from flask import url_for
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+SCOOTER_QR_COLOR = '#1a237e'
+RENTAL_QR_COLOR = '#27ae60'
+
+
+def scooter_qr_payload(scooter):
+    """Text encoded in the QR code of a scooter"""
+    return f"SR-SCOOTER-{scooter.id}-{scooter.qr_code}"
+
+
+def rental_qr_payload(rental):
+    """Text encoded in the QR code of a rental"""
+    return f"SR-RENTAL-{rental.id}-{rental.qr_code or rental.id}"
+
+
+def render_qr_png(payload, fill_color=SCOOTER_QR_COLOR, back_color='white', box_size=10, border=4):
+    """Render a QR code to PNG bytes"""
+    # qrcode and PIL load only when a code is actually rendered, not at start-up
+    import qrcode
 
-def generate_qr_code_data(scooter):
-    """Generate QR code data URI for a scooter"""
-    # Create QR code with scooter information
-    qr_data = f"SR-SCOOTER-{scooter.id}-{scooter.qr_code}"
-    
-    # Generate QR code
     qr = qrcode.QRCode(
         version=1,
         error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
+        box_size=box_size,
+        border=border,
     )
-    qr.add_data(qr_data)
+    qr.add_data(payload)
     qr.make(fit=True)
-    
-    # Create image
-    img = qr.make_image(fill_color="#1a237e", back_color="white")
-    
-    # Convert to base64 for HTML embedding
+
+    img = qr.make_image(fill_color=fill_color, back_color=back_color)
+
     buffer = io.BytesIO()
     img.save(buffer, format='PNG')
-    buffer.seek(0)
-    
-    img_base64 = base64.b64encode(buffer.getvalue()).decode()
-    return f"data:image/png;base64,{img_base64}"
+    return buffer.getvalue()
+
+
+class QRCodeCache:
+    """Content-addressed PNG cache: bounded LRU in memory, optionally backed by a directory"""
+
+    def __init__(self, max_entries=256, directory=None):
+        self.max_entries = max_entries
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def configure(self, max_entries=None, directory=None):
+        """Apply settings from the app config"""
+        if max_entries is not None:
+            self.max_entries = max_entries
+        self.directory = directory or None
+        self.clear()
+
+    @staticmethod
+    def key(payload, fill_color=SCOOTER_QR_COLOR, back_color='white', box_size=10, border=4):
+        """Cache key and ETag of a rendering"""
+        spec = f"{payload}\x00{fill_color}\x00{back_color}\x00{box_size}\x00{border}"
+        return hashlib.sha256(spec.encode()).hexdigest()
+
+    def get(self, payload, **options):
+        """
+        PNG of a QR code, rendered only when neither memory nor disk has it
+        Returns: (key, png)
+        """
+        key = self.key(payload, **options)
+
+        with self._lock:
+            png = self._entries.get(key)
+            if png is not None:
+                self._entries.move_to_end(key)
+                return key, png
+
+        png = self._read(key)
+        if png is None:
+            png = render_qr_png(payload, **options)
+            self._write(key, png)
+
+        self._remember(key, png)
+        return key, png
+
+    def warm(self, payloads, **options):
+        """Render every payload not cached yet; returns how many were rendered"""
+        rendered = 0
+        for payload in payloads:
+            key = self.key(payload, **options)
+            if key in self._entries or self._exists(key):
+                continue
+            png = render_qr_png(payload, **options)
+            self._write(key, png)
+            self._remember(key, png)
+            rendered += 1
+        return rendered
+
+    def clear(self):
+        """Forget the in-memory entries; files on disk stay valid"""
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key, png):
+        with self._lock:
+            self._entries[key] = png
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f'{key}.png')
+
+    def _exists(self, key):
+        return self.directory is not None and os.path.exists(self._path(key))
+
+    def _read(self, key):
+        if self.directory is None:
+            return None
+        try:
+            with open(self._path(key), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write(self, key, png):
+        if self.directory is None:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename, so other workers never read a partial file
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(png)
+            os.replace(tmp, path)
+        except OSError:
+            # The disk layer is an optimization; memory still serves the PNG
+            pass
+
+
+qr_cache = QRCodeCache()
+
+
+def _data_uri(png):
+    return f"data:image/png;base64,{base64.b64encode(png).decode()}"
+
+
+def generate_qr_code_data(scooter):
+    """Generate QR code data URI for a scooter"""
+    _, png = qr_cache.get(scooter_qr_payload(scooter), fill_color=SCOOTER_QR_COLOR)
+    return _data_uri(png)
+
 
 def generate_rental_qr_code(rental):
     """Generate QR code for active rental"""
-    qr_data = f"SR-RENTAL-{rental.id}-{rental.qr_code or rental.id}"
-    
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_L,
-        box_size=10,
-        border=4,
-    )
-    qr.add_data(qr_data)
-    qr.make(fit=True)
-    
-    img = qr.make_image(fill_color="#27ae60", back_color="white")
-    
-    buffer = io.BytesIO()
-    img.save(buffer, format='PNG')
-    buffer.seek(0)
-    
-    img_base64 = base64.b64encode(buffer.getvalue()).decode()
-    return f"data:image/png;base64,{img_base64}"
+    _, png = qr_cache.get(rental_qr_payload(rental), fill_color=RENTAL_QR_COLOR)
+    return _data_uri(png)
@@ -0,0 +1,125 @@
+"""
+Printable QR sticker sheets for ScootRapid
+
+Labels are laid out on A4 pages at 150 dpi. Each page, from rendering its QR
+codes to encoding it as PNG, is an independent task, so large fleets are
+spread over a ``ProcessPoolExecutor``; the parent only collects the encoded
+pages and writes them into a PDF or a ZIP of PNGs.
+"""
+
+import io
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+PAGE_SIZE = (1240, 1754)
+DPI = 150
+MARGIN = 60
+COLUMNS = 4
+ROWS = 6
+LABEL_HEIGHT = 36
+
+# Below this many pages starting worker processes costs more than it saves
+MIN_PAGES_FOR_POOL = 4
+
+FORMATS = {
+    'pdf': ('application/pdf', 'pdf'),
+    'png': ('application/zip', 'zip')
+}
+
+
+def paginate(labels, per_page=COLUMNS * ROWS):
+    """Split (payload, caption) labels into pages"""
+    return [labels[i:i + per_page] for i in range(0, len(labels), per_page)]
+
+
+def render_page(labels):
+    """Render one page of (payload, caption) labels to PNG bytes"""
+    import qrcode
+    from PIL import Image, ImageDraw, ImageFont
+
+    try:
+        font = ImageFont.load_default(size=24)
+    except TypeError:  # pragma: no cover - Pillow < 10.1 only has the small bitmap font
+        font = ImageFont.load_default()
+
+    page = Image.new('L', PAGE_SIZE, 255)
+    draw = ImageDraw.Draw(page)
+    cell_width = (PAGE_SIZE[0] - 2 * MARGIN) // COLUMNS
+    cell_height = (PAGE_SIZE[1] - 2 * MARGIN) // ROWS
+    qr_space = min(cell_width, cell_height - LABEL_HEIGHT)
+
+    for index, (payload, caption) in enumerate(labels):
+        qr = qrcode.QRCode(error_correction=qrcode.constants.ERROR_CORRECT_L, border=2)
+        qr.add_data(payload)
+        qr.make(fit=True)
+        # One pixel per module straight from the matrix, skipping the per-module drawing
+        matrix = qr.get_matrix()
+        code = Image.frombytes('L', (len(matrix), len(matrix)), bytes(0 if dark else 255 for row in matrix for dark in row))
+
+        # Whole pixels per module keep the code sharp for scanners
+        scale = max(qr_space // code.size[0], 1)
+        code = code.resize((code.size[0] * scale, code.size[1] * scale), Image.NEAREST)
+
+        left = MARGIN + (index % COLUMNS) * cell_width
+        top = MARGIN + (index // COLUMNS) * cell_height
+        page.paste(code, (left + (cell_width - code.size[0]) // 2, top))
+
+        text_width = draw.textlength(caption, font=font)
+        draw.text((left + (cell_width - text_width) / 2, top + code.size[1] + 6), caption, fill=0, font=font)
+
+    # Bilevel pages are a fraction of the size and go into the PDF without conversion
+    buffer = io.BytesIO()
+    page.convert('1', dither=0).save(buffer, format='PNG', dpi=(DPI, DPI))
+    return buffer.getvalue()
+
+
+def render_pages(labels, workers=None, progress=None):
+    """
+    Render all labels into page PNGs, in order
+    ``progress(done, total)`` is called after every page
+    """
+    pages = paginate(labels)
+    total = len(pages)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers <= 1 or total < MIN_PAGES_FOR_POOL:
+        rendered = []
+        for page in pages:
+            rendered.append(render_page(page))
+            if progress:
+                progress(len(rendered), total)
+        return rendered
+
+    # Forking a threaded web worker can deadlock; spawned workers start clean
+    context = multiprocessing.get_context('spawn')
+    rendered = []
+    with ProcessPoolExecutor(max_workers=min(workers, total), mp_context=context) as executor:
+        for png in executor.map(render_page, pages):
+            rendered.append(png)
+            if progress:
+                progress(len(rendered), total)
+    return rendered
+
+
+def write_sheets(pages, fmt='pdf'):
+    """Combine page PNGs into one PDF, or a ZIP of PNGs for ``png``"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown sheet format: {fmt}")
+
+    buffer = io.BytesIO()
+    if fmt == 'png':
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+            for number, png in enumerate(pages, 1):
+                archive.writestr(f'page-{number:04d}.png', png)
+        return buffer.getvalue()
+
+    from PIL import Image
+
+    if not pages:
+        raise ValueError("No pages to write")
+    images = [Image.open(io.BytesIO(png)) for png in pages]
+    images[0].save(buffer, format='PDF', save_all=True, append_images=images[1:], resolution=DPI)
+    return buffer.getvalue()
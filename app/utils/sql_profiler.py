@@ -0,0 +1,162 @@
+"""
+Per-request SQL profiling for ScootRapid
+
+``SQLProfiler`` times every statement through SQLAlchemy's cursor events:
+
+- statements slower than SLOW_QUERY_THRESHOLD_MS are logged with the line of
+  application code that issued them,
+- for a sampled share of requests (SQL_PROFILER_SAMPLE_RATE) it counts the
+  statements and their total time, adds a ``Server-Timing`` header and keeps
+  per-endpoint totals including the slowest statement, readable at
+  GET /api/admin/sql-profile.
+
+The totals are kept per worker process.
+"""
+
+import os
+import random
+import sys
+import threading
+import time
+from flask import current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Characters of a statement kept in logs and endpoint stats
+STATEMENT_PREVIEW = 500
+
+
+class RequestProfile:
+    """Statements of one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = 0
+        self.seconds = 0.0
+        self.slowest = (0.0, None)
+
+    def record(self, statement, seconds):
+        self.statements += 1
+        self.seconds += seconds
+        if seconds > self.slowest[0]:
+            self.slowest = (seconds, statement)
+
+
+class SQLProfiler:
+    """Statement timing, slow-query log and per-endpoint SQL totals"""
+
+    def __init__(self, enabled=True, sample_rate=1.0, slow_threshold_ms=200, server_timing=True):
+        self._lock = threading.Lock()
+        self.endpoints = {}
+        self.configure(enabled, sample_rate, slow_threshold_ms, server_timing)
+
+    def configure(self, enabled=None, sample_rate=None, slow_threshold_ms=None, server_timing=None):
+        """Apply settings from the app config"""
+        if enabled is not None:
+            self.enabled = enabled
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        if slow_threshold_ms is not None:
+            self.slow_threshold = slow_threshold_ms / 1000
+        if server_timing is not None:
+            self.server_timing = server_timing
+
+    def init_app(self, app):
+        """Register the request hooks and, once per process, the engine events"""
+        if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            event.listen(Engine, 'handle_error', _handle_error)
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+    def reset(self):
+        with self._lock:
+            self.endpoints = {}
+
+    def snapshot(self):
+        """Per-endpoint totals, the endpoints with the most database time first"""
+        with self._lock:
+            endpoints = [dict(stats, endpoint=name) for name, stats in self.endpoints.items()]
+        for stats in endpoints:
+            stats['statements_avg'] = round(stats['statements'] / stats['requests'], 1)
+            stats['db_ms_avg'] = round(stats['db_ms'] / stats['requests'], 3)
+            stats['db_ms'] = round(stats['db_ms'], 3)
+        return sorted(endpoints, key=lambda stats: stats['db_ms'], reverse=True)
+
+    def record_statement(self, statement, seconds):
+        if has_request_context():
+            profile = g.get('sql_profile')
+            if profile is not None:
+                profile.record(statement, seconds)
+        if seconds >= self.slow_threshold and has_app_context():
+            current_app.logger.warning(
+                f"Slow query ({seconds * 1000:.1f} ms) at {call_site()}: {statement[:STATEMENT_PREVIEW]}"
+            )
+
+    def _start_request(self):
+        if self.enabled and random.random() < self.sample_rate:
+            g.sql_profile = RequestProfile()
+
+    def _finish_request(self, response):
+        profile = g.pop('sql_profile', None)
+        if profile is None:
+            return response
+
+        self._add_to_endpoint(request.endpoint or 'unknown', profile)
+        if self.server_timing:
+            total_ms = (time.perf_counter() - profile.started) * 1000
+            response.headers.add(
+                'Server-Timing',
+                f'db;dur={profile.seconds * 1000:.2f};desc="{profile.statements} queries", total;dur={total_ms:.2f}'
+            )
+        return response
+
+    def _add_to_endpoint(self, endpoint, profile):
+        slowest_seconds, slowest_statement = profile.slowest
+        with self._lock:
+            stats = self.endpoints.setdefault(endpoint, {
+                'requests': 0, 'statements': 0, 'db_ms': 0.0, 'max_statements': 0,
+                'slowest_ms': 0.0, 'slowest_statement': None
+            })
+            stats['requests'] += 1
+            stats['statements'] += profile.statements
+            stats['db_ms'] += profile.seconds * 1000
+            stats['max_statements'] = max(stats['max_statements'], profile.statements)
+            if slowest_seconds * 1000 > stats['slowest_ms']:
+                stats['slowest_ms'] = round(slowest_seconds * 1000, 3)
+                stats['slowest_statement'] = slowest_statement[:STATEMENT_PREVIEW]
+
+
+sql_profiler = SQLProfiler()
+
+
+def call_site():
+    """``path:line in function`` of the innermost application frame outside this module"""
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(APP_DIR) and filename != __file__:
+            return f"{os.path.relpath(filename, os.path.dirname(APP_DIR))}:{frame.f_lineno} in {frame.f_code.co_name}"
+        frame = frame.f_back
+    return 'unknown'
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if sql_profiler.enabled:
+        conn.info.setdefault('sql_profiler_started', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get('sql_profiler_started')
+    if started:
+        sql_profiler.record_statement(statement, time.perf_counter() - started.pop())
+
+
+def _handle_error(context):
+    # A failed statement gets no after_cursor_execute
+    started = context.connection.info.get('sql_profiler_started') if context.connection is not None else None
+    if started:
+        started.pop()
@@ -0,0 +1,48 @@
+"""
+Streaming JSON responses for large ScootRapid listings
+"""
+
+import json
+from flask import Response, stream_with_context
+
+DEFAULT_BATCH_SIZE = 1000
+
+def _dumps(data):
+    return json.dumps(data, separators=(',', ':'), default=str)
+
+def ndjson_lines(rows, serialize):
+    """
+    Yield one JSON document per row, newline delimited
+    """
+    for row in rows:
+        yield _dumps(serialize(row)) + '\n'
+
+def json_array_chunks(rows, serialize, key=None):
+    """
+    Yield a JSON array piece by piece, optionally wrapped as {key: [...]}
+    """
+    yield f'{{{_dumps(key)}:[' if key else '['
+    
+    first = True
+    for row in rows:
+        yield ('' if first else ',') + _dumps(serialize(row))
+        first = False
+    
+    yield ']}' if key else ']'
+
+def stream_query(query, serialize, fmt='ndjson', key=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Stream a query as NDJSON or a chunked JSON array
+    Rows are fetched through a server-side cursor in batches of ``batch_size``
+    so memory stays constant regardless of table size
+    """
+    rows = query.yield_per(batch_size)
+    
+    if fmt == 'json':
+        body = json_array_chunks(rows, serialize, key)
+        mimetype = 'application/json'
+    else:
+        body = ndjson_lines(rows, serialize)
+        mimetype = 'application/x-ndjson'
+    
+    return Response(stream_with_context(body), mimetype=mimetype)
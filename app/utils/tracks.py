@@ -0,0 +1,62 @@
+"""
+Packed position tracks for ScootRapid
+
+A track bucket stores its points as consecutive little-endian float64
+triples ``(offset, latitude, longitude)``, where ``offset`` is the number of
+seconds since the start of the bucket. Concatenating two packed buffers
+yields a valid buffer, so new points can be appended by the database
+without reading the bucket first.
+"""
+
+import sys
+from array import array
+from app.utils.distance import load_numpy
+
+POINT_SIZE = 24
+
+
+def pack_points(points):
+    """Pack (offset, latitude, longitude) triples into bytes"""
+    values = array('d')
+    for offset, latitude, longitude in points:
+        values.extend((offset, latitude, longitude))
+    if sys.byteorder == 'big':  # pragma: no cover - depends on the platform
+        values.byteswap()
+    return values.tobytes()
+
+
+def unpack_points(blob):
+    """
+    Unpack a buffer into three arrays, ordered by offset
+    Returns: (offsets, latitudes, longitudes)
+    """
+    blob = bytes(blob or b'')
+    # Ignore a trailing partial point rather than failing the whole track
+    blob = blob[:len(blob) - len(blob) % POINT_SIZE]
+
+    np = load_numpy()
+    if np is not None:
+        values = np.frombuffer(blob, dtype='<f8').reshape(-1, 3)
+        values = values[np.argsort(values[:, 0], kind='stable')]
+        return values[:, 0], values[:, 1], values[:, 2]
+
+    values = array('d', blob)
+    if sys.byteorder == 'big':  # pragma: no cover - depends on the platform
+        values.byteswap()
+    triples = sorted(zip(values[0::3], values[1::3], values[2::3]), key=lambda point: point[0])
+    return (
+        array('d', (point[0] for point in triples)),
+        array('d', (point[1] for point in triples)),
+        array('d', (point[2] for point in triples))
+    )
+
+
+def downsample(offsets, latitudes, longitudes, resolution):
+    """
+    Keep the last point of every ``resolution`` seconds slot
+    Returns a list of (offset, latitude, longitude) triples
+    """
+    kept = {}
+    for offset, latitude, longitude in zip(offsets, latitudes, longitudes):
+        kept[int(offset // resolution)] = (float(offset), float(latitude), float(longitude))
+    return [kept[slot] for slot in sorted(kept)]
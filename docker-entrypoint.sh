@@ -0,0 +1,12 @@
+#!/bin/sh
+# Bring the schema up to date once, before gunicorn starts its workers.
+# A database created by db.create_all() before migrations were used has the
+# tables already: run `flask db stamp make_scooter_id_nullable` against it once
+# first, so that the upgrade only applies the revisions it is missing.
+set -e
+
+if [ "${DB_MIGRATE_ON_START:-true}" = "true" ]; then
+    flask db upgrade
+fi
+
+exec "$@"
@@ -0,0 +1,55 @@
+"""
+Gunicorn settings for ScootRapid
+
+Command line options take precedence. Set the number of workers with
+WEB_CONCURRENCY rather than ``-w``: the app reads it too, to tell whether
+caches kept in memory are shared by every worker.
+
+With ``--preload`` the app is created once in the master and the workers are
+forked from it; the hooks below keep connections and threads out of that
+shared state.
+"""
+
+import os
+
+# Threaded workers: a login waiting for its password hash holds one request
+# thread, not the whole process, and the hashing queue of each process can fill
+# up and answer 503 (PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE < threads)
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS') or 8)
+
+
+def on_starting(server):
+    # Workers started with -w create the app with the same worker count
+    os.environ.setdefault('WEB_CONCURRENCY', str(server.cfg.workers))
+    # Counters of the previous run would otherwise be added to this one's
+    from app.utils.metrics import clear_directory
+    from config import Config
+    if Config.METRICS_DIR and os.path.isdir(Config.METRICS_DIR):
+        clear_directory(Config.METRICS_DIR)
+
+
+def worker_exit(server, worker):
+    # Values recorded since the last periodic write
+    from app.utils.metrics import metrics
+    metrics.flush()
+
+
+def child_exit(server, worker):
+    # One file for every exited worker instead of one per worker ever started
+    from app.utils.metrics import merge_exited
+    from config import Config
+    if Config.METRICS_DIR:
+        merge_exited(Config.METRICS_DIR, worker.pid)
+
+
+def when_ready(server):
+    if server.cfg.preload_app:
+        from app import before_fork
+        before_fork(server.app.wsgi())
+
+
+def post_fork(server, worker):
+    if server.cfg.preload_app:
+        from app import after_fork
+        after_fork(server.app.wsgi())
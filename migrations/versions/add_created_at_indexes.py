@@ -0,0 +1,30 @@
+"""Add created_at indexes for keyset pagination
+
+Revision ID: add_created_at_indexes
+Revises: add_scooter_location_index
+Create Date: 2026-10-17 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_created_at_indexes'
+down_revision = 'add_scooter_location_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(op.f('ix_scooters_created_at'), 'scooters', ['created_at'], unique=False)
+    op.create_index(op.f('ix_rentals_created_at'), 'rentals', ['created_at'], unique=False)
+    op.create_index('ix_rentals_user_created', 'rentals', ['user_id', 'created_at'], unique=False)
+    op.create_index(op.f('ix_users_created_at'), 'users', ['created_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_users_created_at'), table_name='users')
+    op.drop_index('ix_rentals_user_created', table_name='rentals')
+    op.drop_index(op.f('ix_rentals_created_at'), table_name='rentals')
+    op.drop_index(op.f('ix_scooters_created_at'), table_name='scooters')
@@ -1,7 +1,7 @@
 """Add license_plate to scooters
 
 Revision ID: add_license_plate
-Revises: 
+Revises: initial_schema
 Create Date: 2026-01-20 16:20:00.000000
 
 """
@@ -11,7 +11,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision = 'add_license_plate'
-down_revision = None
+down_revision = 'initial_schema'
 branch_labels = None
 depends_on = None
 
@@ -1,7 +1,7 @@
 """Add qr_code to rentals table
 
 Revision ID: add_qr_code_to_rentals
-Revises: 
+Revises: initial_schema
 Create Date: 2026-01-10 18:54:00.000000
 
 """
@@ -10,7 +10,7 @@ import sqlalchemy as sa
 
 # revision identifiers, used by Alembic.
 revision = 'add_qr_code_to_rentals'
-down_revision = None
+down_revision = 'initial_schema'
 branch_labels = None
 depends_on = None
 
@@ -0,0 +1,24 @@
+"""Add scooters.last_seen_at for telemetry ordering
+
+Revision ID: add_scooter_last_seen_at
+Revises: add_created_at_indexes
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_scooter_last_seen_at'
+down_revision = 'add_created_at_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('scooters', sa.Column('last_seen_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column('scooters', 'last_seen_at')
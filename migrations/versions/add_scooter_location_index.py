@@ -0,0 +1,24 @@
+"""Add composite status/location index to scooters
+
+Revision ID: add_scooter_location_index
+Revises: make_scooter_id_nullable
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_scooter_location_index'
+down_revision = 'make_scooter_id_nullable'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_scooters_status_lat_lon', 'scooters', ['status', 'latitude', 'longitude'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_scooters_status_lat_lon', table_name='scooters')
@@ -0,0 +1,34 @@
+"""Add scooter_tracks for position history
+
+Revision ID: add_scooter_tracks
+Revises: add_scooter_last_seen_at
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_scooter_tracks'
+down_revision = 'add_scooter_last_seen_at'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'scooter_tracks',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('scooter_id', sa.Integer(), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('point_count', sa.Integer(), nullable=False),
+        sa.Column('points', sa.LargeBinary(length=2 ** 24 - 1), nullable=False),
+        sa.ForeignKeyConstraint(['scooter_id'], ['scooters.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('scooter_id', 'bucket_start', name='uq_scooter_tracks_scooter_bucket')
+    )
+
+
+def downgrade():
+    op.drop_table('scooter_tracks')
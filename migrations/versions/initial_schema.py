@@ -0,0 +1,132 @@
+"""Create the users, scooters, rentals and payments tables
+
+Revision ID: initial_schema
+Revises: 
+Create Date: 2026-01-01 00:00:00.000000
+
+The schema the first deployments created with db.create_all(), before the
+other revisions. Databases created that way have the tables already and
+match make_scooter_id_nullable; stamp them once with
+`flask db stamp make_scooter_id_nullable` and upgrade from there.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'initial_schema'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('password_hash', sa.String(length=255), nullable=False),
+        sa.Column('first_name', sa.String(length=50), nullable=False),
+        sa.Column('last_name', sa.String(length=50), nullable=False),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('role', sa.String(length=20), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=False),
+        sa.Column('is_verified', sa.Boolean(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('last_login', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_index(op.f('ix_users_role'), 'users', ['role'], unique=False)
+
+    op.create_table(
+        'scooters',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('identifier', sa.String(length=50), nullable=False),
+        sa.Column('qr_code', sa.String(length=100), nullable=True),
+        sa.Column('model', sa.String(length=100), nullable=False),
+        sa.Column('brand', sa.String(length=100), nullable=False),
+        sa.Column('latitude', sa.Float(), nullable=False),
+        sa.Column('longitude', sa.Float(), nullable=False),
+        sa.Column('address', sa.String(length=255), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('battery_level', sa.Integer(), nullable=False),
+        sa.Column('max_speed', sa.Integer(), nullable=True),
+        sa.Column('range_km', sa.Integer(), nullable=True),
+        sa.Column('provider_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('last_maintenance', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['provider_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_scooters_identifier'), 'scooters', ['identifier'], unique=True)
+    op.create_index(op.f('ix_scooters_qr_code'), 'scooters', ['qr_code'], unique=True)
+    op.create_index(op.f('ix_scooters_status'), 'scooters', ['status'], unique=False)
+    op.create_index(op.f('ix_scooters_provider_id'), 'scooters', ['provider_id'], unique=False)
+
+    op.create_table(
+        'rentals',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('rental_code', sa.String(length=50), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('scooter_id', sa.Integer(), nullable=False),
+        sa.Column('start_time', sa.DateTime(), nullable=False),
+        sa.Column('end_time', sa.DateTime(), nullable=True),
+        sa.Column('start_latitude', sa.Float(), nullable=False),
+        sa.Column('start_longitude', sa.Float(), nullable=False),
+        sa.Column('end_latitude', sa.Float(), nullable=True),
+        sa.Column('end_longitude', sa.Float(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('duration_minutes', sa.Integer(), nullable=True),
+        sa.Column('distance_km', sa.Float(), nullable=True),
+        sa.Column('base_fee', sa.Float(), nullable=True),
+        sa.Column('per_minute_rate', sa.Float(), nullable=True),
+        sa.Column('total_cost', sa.Float(), nullable=True),
+        sa.Column('rating', sa.Integer(), nullable=True),
+        sa.Column('feedback', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['scooter_id'], ['scooters.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_rentals_rental_code'), 'rentals', ['rental_code'], unique=True)
+    op.create_index(op.f('ix_rentals_user_id'), 'rentals', ['user_id'], unique=False)
+    op.create_index(op.f('ix_rentals_scooter_id'), 'rentals', ['scooter_id'], unique=False)
+    op.create_index(op.f('ix_rentals_status'), 'rentals', ['status'], unique=False)
+
+    op.create_table(
+        'payments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('transaction_id', sa.String(length=100), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('rental_id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('payment_method', sa.String(length=50), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('gateway_transaction_id', sa.String(length=255), nullable=True),
+        sa.Column('refund_amount', sa.Float(), nullable=True),
+        sa.Column('refund_reason', sa.Text(), nullable=True),
+        sa.Column('refunded_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('processed_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['rental_id'], ['rentals.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_payments_transaction_id'), 'payments', ['transaction_id'], unique=True)
+    op.create_index(op.f('ix_payments_user_id'), 'payments', ['user_id'], unique=False)
+    op.create_index(op.f('ix_payments_rental_id'), 'payments', ['rental_id'], unique=False)
+    op.create_index(op.f('ix_payments_status'), 'payments', ['status'], unique=False)
+
+
+def downgrade():
+    op.drop_table('payments')
+    op.drop_table('rentals')
+    op.drop_table('scooters')
+    op.drop_table('users')
@@ -17,16 +17,15 @@ depends_on = None
 
 
 def upgrade():
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.alter_column('rentals', 'scooter_id',
-                    existing_type=sa.Integer(),
-                    nullable=True)
-    # ### end Alembic commands ###
+    # Batch mode: SQLite can only change a column by copying the table; MySQL alters it in place
+    with op.batch_alter_table('rentals') as batch_op:
+        batch_op.alter_column('scooter_id',
+                              existing_type=sa.Integer(),
+                              nullable=True)
 
 
 def downgrade():
-    # ### commands auto generated by Alembic - please adjust! ###
-    op.alter_column('rentals', 'scooter_id',
-                    existing_type=sa.Integer(),
-                    nullable=False)
-    # ### end Alembic commands ###
+    with op.batch_alter_table('rentals') as batch_op:
+        batch_op.alter_column('scooter_id',
+                              existing_type=sa.Integer(),
+                              nullable=False)
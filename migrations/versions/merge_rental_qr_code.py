@@ -0,0 +1,24 @@
+"""Merge the rental QR code branch into the main line
+
+Revision ID: merge_rental_qr_code
+Revises: add_scooter_tracks, add_qr_code_to_rentals
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'merge_rental_qr_code'
+down_revision = ('add_scooter_tracks', 'add_qr_code_to_rentals')
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    pass
+
+
+def downgrade():
+    pass
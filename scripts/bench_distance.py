@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark: scalar distance_from loop vs. batched haversine with top-k
+
+Usage: python scripts/bench_distance.py [--k 50] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils import distance
+from app.utils.distance import nearest, pack_coordinates
+from app.utils.helpers import calculate_distance
+
+CENTER = (47.3769, 8.5417)
+
+
+def make_fleet(size):
+    rng = random.Random(size)
+    return [(CENTER[0] + rng.uniform(-0.1, 0.1), CENTER[1] + rng.uniform(-0.15, 0.15)) for _ in range(size)]
+
+
+def scalar_path(fleet, k):
+    hits = [(calculate_distance(CENTER[0], CENTER[1], lat, lon), i) for i, (lat, lon) in enumerate(fleet)]
+    hits.sort(key=lambda hit: hit[0])
+    return hits[:k]
+
+
+def batch_path(lats, lons, k):
+    return nearest(lats, lons, CENTER[0], CENTER[1], k)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--k', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    backend = 'numpy' if distance.load_numpy() is not None else "array('d')"
+    print(f"Batch backend: {backend}")
+    print(f"{'scooters':>10} {'scalar ms':>12} {'batch ms':>12} {'speedup':>9}")
+
+    for size in (1_000, 10_000, 100_000):
+        fleet = make_fleet(size)
+        lats, lons = pack_coordinates(fleet)
+
+        assert [i for _, i in scalar_path(fleet, args.k)] == [i for _, i in batch_path(lats, lons, args.k)]
+
+        scalar = min(timeit.repeat(lambda: scalar_path(fleet, args.k), number=1, repeat=args.repeat))
+        batch = min(timeit.repeat(lambda: batch_path(lats, lons, args.k), number=1, repeat=args.repeat))
+        print(f"{size:>10} {scalar * 1000:>12.2f} {batch * 1000:>12.2f} {scalar / batch:>8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: login password checks under concurrent request threads
+
+Models one gthread gunicorn worker: each request thread verifies a password
+the way a login does, with the hashing inline in the thread (workers 0) or on
+the bounded pool. Reports logins per second, latency percentiles and logins
+rejected with 503 because the hashing queue was full. The limit is per
+process, so these numbers hold for every worker of a deployment.
+
+Usage: python scripts/bench_login.py [--logins 200] [--threads 8]
+       [--settings pbkdf2:600000,bcrypt:12] [--workers 0,1,2] [--queue 2]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.password_service import PasswordHasher, PasswordHashingBusy
+
+
+def run(hasher, stored, logins, threads):
+    latencies = []
+    rejected = 0
+    remaining = iter(range(logins))
+    lock = threading.Lock()
+
+    def request_thread():
+        nonlocal rejected
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            started = time.perf_counter()
+            try:
+                hasher.verify('correct horse battery staple', stored)
+            except PasswordHashingBusy:
+                with lock:
+                    rejected += 1
+                continue
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    pool = [threading.Thread(target=request_thread) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return time.perf_counter() - started, sorted(latencies), rejected
+
+
+def percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=8, help='request threads of the worker (WEB_THREADS)')
+    parser.add_argument('--settings', default='pbkdf2:600000,bcrypt:12', help='algorithm:cost pairs')
+    parser.add_argument('--workers', default='0,1,2')
+    parser.add_argument('--queue', type=int, default=2)
+    args = parser.parse_args()
+
+    print(f"{args.logins} logins from {args.threads} threads on {os.cpu_count()} CPU(s)")
+    print(f"{'algorithm':>9} {'cost':>7} {'workers':>7} {'logins/s':>9} {'p50 ms':>7} {'p99 ms':>7} {'503s':>5}")
+    for setting in args.settings.split(','):
+        algorithm, cost = setting.split(':')
+        stored = PasswordHasher(algorithm, int(cost), workers=0).hash('correct horse battery staple')
+        for workers in (int(n) for n in args.workers.split(',')):
+            hasher = PasswordHasher(algorithm, int(cost), workers=workers, queue=args.queue)
+            elapsed, latencies, rejected = run(hasher, stored, args.logins, args.threads)
+            print(f"{algorithm:>9} {cost:>7} {workers:>7} {len(latencies) / elapsed:>9.1f} "
+                  f"{percentile(latencies, 0.5) * 1000:>7.0f} {percentile(latencies, 0.99) * 1000:>7.0f} {rejected:>5}")
+
+
+if __name__ == '__main__':
+    main()
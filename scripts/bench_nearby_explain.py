@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark: nearby search with and without the status/latitude/longitude index
+
+Seeds a scratch database with scooters, then runs the nearby query from
+Scooter.nearby_filter once without and once with ix_scooters_status_lat_lon
+and prints the query plan and rows examined.
+
+On MySQL rows examined come from EXPLAIN and the Handler_read_* counters.
+SQLite does not expose row counts, so only its query plan and timings are shown.
+
+Usage:
+    python scripts/bench_nearby_explain.py --database-url mysql+pymysql://user:pw@host/scratch
+    python scripts/bench_nearby_explain.py              # temporary SQLite file
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sqlalchemy as sa
+
+from app.models.scooter import Scooter
+from app.models.user import User
+
+CENTER = (47.3769, 8.5417)
+INDEX_NAME = 'ix_scooters_status_lat_lon'
+
+
+def seed(engine, size):
+    users = User.__table__
+    scooters = Scooter.__table__
+    rng = random.Random(size)
+    statuses = ['available'] * 6 + ['in_use', 'in_use', 'maintenance', 'offline']
+
+    with engine.begin() as conn:
+        conn.execute(users.insert().values(
+            id=1, email='bench@example.com', password_hash='x',
+            first_name='Bench', last_name='Provider', role='provider', is_active=True, is_verified=True
+        ))
+        batch = []
+        for i in range(size):
+            batch.append({
+                'identifier': f'BENCH{i:07d}',
+                'qr_code': f'SR-BENCH{i:07d}',
+                'model': 'Mi Pro 2',
+                'brand': 'Xiaomi',
+                'latitude': CENTER[0] + rng.uniform(-0.5, 0.5),
+                'longitude': CENTER[1] + rng.uniform(-0.7, 0.7),
+                'status': rng.choice(statuses),
+                'battery_level': 100,
+                'provider_id': 1
+            })
+            if len(batch) == 5000:
+                conn.execute(scooters.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(scooters.insert(), batch)
+
+
+def nearby_statement(radius_km):
+    return sa.select(Scooter.__table__.c.id).where(*Scooter.nearby_filter(CENTER[0], CENTER[1], radius_km))
+
+
+def explain(conn, statement):
+    sql = str(statement.compile(conn.engine, compile_kwargs={'literal_binds': True}))
+
+    if conn.dialect.name == 'mysql':
+        rows = conn.exec_driver_sql(f'EXPLAIN {sql}').mappings().all()
+        plan = [f"type={r['type']} key={r['key']} rows={r['rows']} extra={r['Extra']}" for r in rows]
+
+        conn.exec_driver_sql('FLUSH STATUS')
+        conn.execute(statement).all()
+        handler = conn.exec_driver_sql("SHOW SESSION STATUS LIKE 'Handler_read%%'").all()
+        examined = sum(int(value) for _, value in handler)
+        return plan, examined
+
+    rows = conn.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}').all()
+    return [row[-1] for row in rows], None
+
+
+def run(conn, label, radius_km, repeat):
+    statement = nearby_statement(radius_km)
+    plan, examined = explain(conn, statement)
+    matched = len(conn.execute(statement).all())
+    seconds = min(timeit.repeat(lambda: conn.execute(statement).all(), number=1, repeat=repeat))
+
+    print(f"\n[{label}] matched={matched} time={seconds * 1000:.2f} ms")
+    for line in plan:
+        print(f"    plan: {line}")
+    if examined is not None:
+        print(f"    rows examined (Handler_read_*): {examined}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url')
+    parser.add_argument('--size', type=int, default=100_000)
+    parser.add_argument('--radius', type=float, default=1.0)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    scratch = None
+    url = args.database_url
+    if not url:
+        scratch = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        url = f'sqlite:///{scratch.name}'
+
+    engine = sa.create_engine(url)
+    tables = [User.__table__, Scooter.__table__]
+    Scooter.__table__.metadata.drop_all(engine, tables=tables[::-1])
+    Scooter.__table__.metadata.create_all(engine, tables=tables)
+    print(f"Seeding {args.size} scooters into {engine.url.render_as_string(hide_password=True)}")
+    seed(engine, args.size)
+
+    index = next(ix for ix in Scooter.__table__.indexes if ix.name == INDEX_NAME)
+    try:
+        with engine.connect() as conn:
+            index.drop(conn)
+            conn.commit()
+            run(conn, 'before: single-column indexes only', args.radius, args.repeat)
+
+            index.create(conn)
+            conn.commit()
+            if conn.dialect.name == 'mysql':
+                conn.exec_driver_sql('ANALYZE TABLE scooters')
+            else:
+                conn.exec_driver_sql('ANALYZE')
+            run(conn, f'after: {INDEX_NAME}', args.radius, args.repeat)
+    finally:
+        Scooter.__table__.metadata.drop_all(engine, tables=tables[::-1])
+        engine.dispose()
+        if scratch is not None:
+            os.unlink(scratch.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Benchmark: QR sticker sheet rendering with 1..N worker processes
+
+Renders the sheets of a synthetic fleet and writes them to a PDF, reporting
+wall time per worker count. Process start-up is included, as in a real run.
+
+Usage: python scripts/bench_qr_sheets.py [--scooters 5000] [--workers 1,2,4,8]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.qr_sheets import render_pages, write_sheets
+
+
+def make_labels(count):
+    return [(f'SR-SCOOTER-{i}-SR-BENCH{i:06d}-1792231200.123456', f'BENCH{i:06d}') for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scooters', type=int, default=5000)
+    parser.add_argument('--workers', default=','.join(str(n) for n in (1, 2, 4, 8) if n <= (os.cpu_count() or 1)))
+    args = parser.parse_args()
+
+    labels = make_labels(args.scooters)
+    print(f"{args.scooters} scooters on {os.cpu_count()} CPU(s)")
+    print(f"{'workers':>7} {'render s':>9} {'pdf s':>6} {'labels/s':>9}")
+    for workers in (int(n) for n in args.workers.split(',')):
+        started = time.perf_counter()
+        pages = render_pages(labels, workers=workers)
+        rendered = time.perf_counter()
+        write_sheets(pages, 'pdf')
+        finished = time.perf_counter()
+        print(f"{workers:>7} {rendered - started:>9.2f} {finished - rendered:>6.2f} "
+              f"{args.scooters / (finished - started):>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
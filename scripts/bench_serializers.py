@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-row to_dict vs. column-projected serializers
+
+Seeds an in-memory SQLite database and reports, per 1k rows, the time to
+serialize already-fetched rows (CPU only) and the full query + serialize path.
+
+Usage: python scripts/bench_serializers.py [--rows 5000] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db
+from app.models.rental import Rental
+from app.models.scooter import Scooter
+from app.models.serializers import rental_serializer, scooter_serializer
+from app.models.user import User
+
+
+def seed(rows):
+    provider = User(email='bench@example.com', first_name='Bench', last_name='Provider', role='provider')
+    provider.set_password('bench-password')
+    db.session.add(provider)
+    db.session.flush()
+
+    scooters = [
+        Scooter(identifier=f'BENCH{i:06d}', model='Mi Pro 2', brand='Xiaomi',
+                latitude=47.37, longitude=8.54, provider_id=provider.id)
+        for i in range(rows)
+    ]
+    db.session.add_all(scooters)
+    db.session.flush()
+
+    db.session.add_all(
+        Rental(rental_code=f'RNT-BENCH-{i}', user_id=provider.id, scooter_id=s.id,
+               start_latitude=47.37, start_longitude=8.54, status='completed',
+               duration_minutes=12, total_cost=5.1)
+        for i, s in enumerate(scooters)
+    )
+    db.session.commit()
+
+
+def measure(fn, repeat, rows):
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) / rows * 1000 * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        seed(args.rows)
+
+        cases = [
+            ('scooters', lambda: Scooter.query.all(), lambda objs: [o.to_dict() for o in objs],
+             lambda: scooter_serializer.query().all(), scooter_serializer.dump_all),
+            ('rentals', lambda: Rental.with_related().all(), lambda objs: [o.to_dict() for o in objs],
+             lambda: rental_serializer.query().all(), rental_serializer.dump_all)
+        ]
+
+        print(f"{args.rows} rows, times in ms per 1k rows")
+        print(f"{'list':<10} {'path':<12} {'to_dict':>10} {'serializer':>11} {'speedup':>8}")
+        for name, load_objects, dump_objects, load_rows, dump_rows in cases:
+            objects = load_objects()
+            rows = load_rows()
+            assert dump_objects(objects[:50]) == dump_rows(rows[:50])
+
+            cpu_old = measure(lambda: dump_objects(objects), args.repeat, args.rows)
+            cpu_new = measure(lambda: dump_rows(rows), args.repeat, args.rows)
+            print(f"{name:<10} {'serialize':<12} {cpu_old:>10.2f} {cpu_new:>11.2f} {cpu_old / cpu_new:>7.1f}x")
+
+            def full_old():
+                db.session.expunge_all()
+                return dump_objects(load_objects())
+
+            full_new = lambda: dump_rows(load_rows())
+            old = measure(full_old, args.repeat, args.rows)
+            new = measure(full_new, args.repeat, args.rows)
+            print(f"{name:<10} {'query+dump':<12} {old:>10.2f} {new:>11.2f} {old / new:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark: cold start of a worker (import the app package and create_app)
+
+Starts fresh interpreters, as gunicorn does for every worker without
+--preload, and reports the median wall time of the import and of create_app,
+plus the slowest imports from ``python -X importtime``.
+
+Usage: python scripts/bench_startup.py [--runs 5] [--config testing] [--top 15]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TIMED = """
+import time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app({config!r})
+print(imported - started, time.perf_counter() - imported)
+"""
+
+
+def parse_importtime(stderr):
+    """(cumulative microseconds, module) of every import, nested ones included"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line.split('|')
+        # Nesting is kept as the indentation of the module name
+        imports.append((int(cumulative), module[1:]))
+    return imports
+
+
+def top_level_ms(imports):
+    """Total import time: the sum over modules imported directly by the script"""
+    return sum(cumulative for cumulative, module in imports if not module.startswith(' ')) / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--config', default='testing')
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    import_times, create_times = [], []
+    for _ in range(args.runs):
+        output = subprocess.run([sys.executable, '-c', TIMED.format(config=args.config)], cwd=ROOT,
+                                capture_output=True, text=True, check=True).stdout.split()
+        import_times.append(float(output[-2]))
+        create_times.append(float(output[-1]))
+    print(f"{args.runs} runs, config {args.config}")
+    print(f"import app:  {statistics.median(import_times) * 1000:7.1f} ms (median)")
+    print(f"create_app:  {statistics.median(create_times) * 1000:7.1f} ms (median)")
+
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+                             f'from app import create_app; create_app({args.config!r})'],
+                            cwd=ROOT, capture_output=True, text=True, check=True).stderr
+    imports = parse_importtime(stderr)
+    print(f"\nimporttime total: {top_level_ms(imports):.1f} ms; slowest top-level imports:")
+    top = sorted((item for item in imports if not item[1].startswith(' ')), reverse=True)[:args.top]
+    for cumulative, module in top:
+        print(f"{cumulative / 1000:9.1f} ms  {module.strip()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: commit-per-mutation vs. one commit per business operation
+
+Ends and cancels rentals on a temporary SQLite file (so every commit pays for
+its fsync) and reports commits and mean latency per operation. The "before"
+column replays the commit pattern the model methods used to have: the scooter
+status, the scooter location and the rental each committed separately.
+
+Usage: python scripts/bench_unit_of_work.py [--operations 200]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models.rental import Rental
+from app.models.scooter import Scooter
+from app.models.user import User
+from app.services import rental_service
+from config import TestingConfig, config
+
+
+def legacy_end_rental(rental, end_latitude, end_longitude):
+    scooter = rental.scooter
+    scooter.set_status('available')
+    db.session.commit()
+    scooter.update_location(end_latitude, end_longitude)
+    db.session.commit()
+    rental.end_rental(end_latitude, end_longitude)
+    db.session.commit()
+
+
+def legacy_cancel_rental(rental):
+    rental.scooter.set_status('available')
+    db.session.commit()
+    rental.cancel_rental()
+    db.session.commit()
+
+
+def seed(count):
+    user = User(email='bench@example.com', first_name='Bench', last_name='Rider', role='customer')
+    user.password_hash = 'x'
+    db.session.add(user)
+    db.session.flush()
+
+    scooters = [
+        Scooter(identifier=f'BENCH{i:06d}', model='Mi Pro 2', brand='Xiaomi',
+                latitude=47.37, longitude=8.54, provider_id=user.id, status='in_use')
+        for i in range(count)
+    ]
+    db.session.add_all(scooters)
+    db.session.flush()
+
+    started = datetime.utcnow() - timedelta(minutes=20)
+    rentals = [
+        Rental(rental_code=f'RNT-BENCH-{i}', user_id=user.id, scooter_id=s.id, start_time=started,
+               start_latitude=47.37, start_longitude=8.54, status='active')
+        for i, s in enumerate(scooters)
+    ]
+    db.session.add_all(rentals)
+    db.session.commit()
+    return [rental.id for rental in rentals]
+
+
+def measure(rental_ids, operation):
+    commits = []
+    listener = lambda session: commits.append(session)
+    event.listen(db.session, 'after_commit', listener)
+
+    elapsed = 0.0
+    try:
+        for rental_id in rental_ids:
+            rental = db.session.get(Rental, rental_id)
+            start = time.perf_counter()
+            operation(rental)
+            elapsed += time.perf_counter() - start
+    finally:
+        event.remove(db.session, 'after_commit', listener)
+
+    return len(commits) / len(rental_ids), elapsed / len(rental_ids) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--operations', type=int, default=200)
+    args = parser.parse_args()
+
+    scratch = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+    config['bench'] = type('BenchConfig', (TestingConfig,), {'SQLALCHEMY_DATABASE_URI': f'sqlite:///{scratch.name}'})
+    app = create_app('bench')
+
+    cases = [
+        ('end rental', lambda r: legacy_end_rental(r, 47.40, 8.60),
+         lambda r: rental_service.end_rental(r, 47.40, 8.60)),
+        ('cancel rental', legacy_cancel_rental, rental_service.cancel_rental)
+    ]
+
+    try:
+        with app.app_context():
+            db.create_all()
+            print(f"{args.operations} operations each on {scratch.name}")
+            print(f"{'operation':<14} {'commits before':>14} {'after':>6} {'ms before':>10} {'after':>7}")
+            for name, before, after in cases:
+                rental_ids = seed(args.operations * 2)
+                old_commits, old_ms = measure(rental_ids[:args.operations], before)
+                new_commits, new_ms = measure(rental_ids[args.operations:], after)
+                print(f"{name:<14} {old_commits:>14.1f} {new_commits:>6.1f} {old_ms:>10.2f} {new_ms:>7.2f}")
+
+                db.session.remove()
+                db.drop_all()
+                db.create_all()
+            db.drop_all()
+    finally:
+        os.unlink(scratch.name)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,178 @@
+import pytest
+from app import create_app, db
+
+
+@pytest.fixture
+def app():
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def provider(app):
+    from app.models.user import User
+
+    user = User(
+        email='provider@example.com',
+        first_name='Pia',
+        last_name='Provider',
+        role='provider'
+    )
+    user.set_password('test123456')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def make_scooter(provider):
+    from app.models.scooter import Scooter
+
+    def _make_scooter(identifier, latitude=47.3769, longitude=8.5417, **kwargs):
+        scooter = Scooter(
+            identifier=identifier,
+            model='Mi Pro 2',
+            brand='Xiaomi',
+            latitude=latitude,
+            longitude=longitude,
+            provider_id=provider.id,
+            **kwargs
+        )
+        db.session.add(scooter)
+        db.session.commit()
+        return scooter
+
+    return _make_scooter
+
+
+@pytest.fixture
+def customer(app):
+    from app.models.user import User
+
+    user = User(
+        email='customer@example.com',
+        first_name='Carla',
+        last_name='Customer',
+        role='customer'
+    )
+    user.set_password('test123456')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def make_rental(customer):
+    from itertools import count
+    from app.models.rental import Rental
+
+    codes = count(1)
+
+    def _make_rental(scooter, status='completed', **kwargs):
+        kwargs.setdefault('user_id', customer.id)
+        kwargs.setdefault('rental_code', f'RNT-TEST-{next(codes)}')
+        rental = Rental(
+            scooter_id=scooter.id,
+            start_latitude=scooter.latitude,
+            start_longitude=scooter.longitude,
+            status=status,
+            **kwargs
+        )
+        db.session.add(rental)
+        db.session.commit()
+        return rental
+
+    return _make_rental
+
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager factory collecting the SQL statements executed inside it"""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def _count_queries():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    return _count_queries
+
+
+@pytest.fixture
+def login(client):
+    def _login(user, password='test123456'):
+        return client.post('/login', data={'email': user.email, 'password': password})
+
+    return _login
+
+
+@pytest.fixture
+def assert_max_queries(count_queries):
+    """Context manager failing the test when its block issues more than ``limit`` statements"""
+    from contextlib import contextmanager
+
+    @contextmanager
+    def _assert_max_queries(limit):
+        with count_queries() as statements:
+            yield statements
+        assert len(statements) <= limit, (
+            f"Expected at most {limit} statements, got {len(statements)}:\n" + '\n'.join(statements)
+        )
+
+    return _assert_max_queries
+
+
+@pytest.fixture
+def jwt_headers(app):
+    from flask_jwt_extended import create_access_token
+
+    def _jwt_headers(user):
+        return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+    return _jwt_headers
+
+
+@pytest.fixture
+def admin(app):
+    from app.models.user import User
+
+    user = User(
+        email='admin@example.com',
+        first_name='Ada',
+        last_name='Admin',
+        role='admin'
+    )
+    user.set_password('test123456')
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+@pytest.fixture
+def commits(app):
+    """Sessions committed while the test runs, one entry per commit"""
+    from sqlalchemy import event
+
+    committed = []
+    listener = lambda session: committed.append(session)
+    event.listen(db.session, 'after_commit', listener)
+    yield committed
+    event.remove(db.session, 'after_commit', listener)
@@ -0,0 +1,191 @@
+import time
+
+import pytest
+
+from app.services import scooter_service
+from app.services.availability_service import AvailabilityCache
+from app.utils.cache_backends import InProcessBackend, RedisBackend, create_backend
+
+
+class FakeRedis:
+    """The subset of the redis-py client used by RedisBackend, answering like a server would"""
+
+    def __init__(self):
+        self.data = {}
+
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry is None or (entry[1] is not None and entry[1] <= time.monotonic()):
+            self.data.pop(key, None)
+            return None
+        return entry[0]
+
+    def get(self, key):
+        return self._live(key)
+
+    def mget(self, keys):
+        return [self._live(key) for key in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and self._live(key) is not None:
+            return None
+        self.data[key] = (str(value).encode('utf-8'), time.monotonic() + ex if ex else None)
+        return True
+
+    def incr(self, key):
+        value = int(self._live(key) or 0) + 1
+        self.data[key] = (str(value).encode('utf-8'), None)
+        return value
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in list(self.data) if key.startswith(match.rstrip('*'))]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def set(self, *args, **kwargs):
+        self.commands.append((args, kwargs))
+
+    def execute(self):
+        return [self.client.set(*args, **kwargs) for args, kwargs in self.commands]
+
+
+@pytest.fixture(params=['memory', 'redis'])
+def cache(request, app):
+    from app.services.availability_service import availability_cache
+
+    backend = InProcessBackend() if request.param == 'memory' else RedisBackend(FakeRedis())
+    availability_cache.configure(backend=backend)
+    return availability_cache
+
+
+def test_available_set_is_served_from_cache(cache, make_scooter, count_queries):
+    first = make_scooter('SC001')
+    make_scooter('SC002', status='maintenance')
+    third = make_scooter('SC003', battery_level=10)
+
+    assert [s['id'] for s in cache.available()] == [first.id, third.id]
+    with count_queries() as statements:
+        states = cache.available(min_battery=15)
+    assert statements == []
+    assert [s['id'] for s in states] == [first.id]
+    assert states[0]['license_plate'] == first.license_plate
+
+
+def test_status_change_writes_through(cache, make_scooter, count_queries):
+    scooter = make_scooter('SC001')
+    other = make_scooter('SC002', status='maintenance')
+    assert [s['id'] for s in cache.available()] == [scooter.id]
+
+    scooter_id, other_id = scooter.id, other.id
+    scooter_service.set_status(scooter, 'in_use')
+    scooter_service.set_status(other, 'available')
+
+    assert [s['id'] for s in cache.available()] == [other_id]
+    with count_queries() as statements:
+        assert cache.get(scooter_id)['status'] == 'in_use'
+    assert statements == []
+
+
+def test_battery_and_location_updates_keep_the_set(cache, make_scooter, count_queries):
+    scooter = make_scooter('SC001')
+    version = cache.backend.get('availability:version')
+    cache.available()
+
+    scooter_service.set_battery_level(scooter, 12)
+    scooter_service.update_location(scooter, 47.40, 8.60)
+
+    assert cache.backend.get('availability:version') == version
+    with count_queries() as statements:
+        state, = cache.available()
+        assert cache.available(min_battery=15) == []
+    assert statements == []
+    assert (state['battery_level'], state['latitude'], state['is_available']) == (12, 47.40, False)
+
+
+def test_workers_sharing_redis_see_each_others_writes(app, make_scooter):
+    client = FakeRedis()
+    worker_a = AvailabilityCache(RedisBackend(client))
+    worker_b = AvailabilityCache(RedisBackend(client))
+
+    scooter = make_scooter('SC001')
+    assert [s['id'] for s in worker_b.available()] == [scooter.id]
+
+    scooter.status = 'maintenance'
+    worker_a.sync(scooter)
+
+    assert worker_b.available() == []
+    assert worker_b.get(scooter.id)['status'] == 'maintenance'
+
+
+def test_cache_without_ttl_reads_every_change(app, make_scooter):
+    from app import db
+
+    worker_a = AvailabilityCache(InProcessBackend(), ttl=0)
+    worker_b = AvailabilityCache(InProcessBackend(), ttl=0)
+
+    scooter = make_scooter('SC001')
+    assert [s['id'] for s in worker_b.available()] == [scooter.id]
+
+    scooter.status = 'maintenance'
+    db.session.commit()
+    worker_a.sync(scooter)
+
+    assert worker_b.available() == []
+    assert worker_b.get(scooter.id)['status'] == 'maintenance'
+    assert worker_b.backend._entries == {}
+
+
+def test_fill_never_overwrites_a_newer_state(cache, make_scooter):
+    scooter = make_scooter('SC001')
+    scooter.battery_level = 50
+    cache.sync(scooter)
+
+    # A fill loading an older snapshot of the same scooter
+    cache._store([dict(cache.get(scooter.id), battery_level=90)])
+
+    assert cache.get(scooter.id)['battery_level'] == 50
+
+
+def test_available_endpoint_matches_to_dict(app, cache, make_scooter):
+    from api.scooters import AvailableScootersResource
+
+    scooters = [make_scooter('SC001'), make_scooter('SC002', battery_level=5), make_scooter('SC003')]
+
+    with app.test_request_context('/?limit=10'):
+        data, _ = AvailableScootersResource.get.__wrapped__(AvailableScootersResource())
+
+    assert data == [scooters[0].to_dict(), scooters[2].to_dict()]
+
+
+def test_create_backend_rejects_unknown_names():
+    assert isinstance(create_backend('memory'), InProcessBackend)
+    with pytest.raises(ValueError):
+        create_backend('memcached')
+    with pytest.raises(ValueError):
+        create_backend('redis')
+
+
+def test_per_worker_cache_with_several_workers_is_reported(monkeypatch, caplog):
+    import logging
+
+    import config
+    from app import create_app
+    from app.services.availability_service import availability_cache
+
+    monkeypatch.setitem(config.config, 'workers', type('WorkersConfig', (config.TestingConfig,), {'WEB_CONCURRENCY': 4}))
+    with caplog.at_level(logging.WARNING):
+        create_app('workers')
+
+    assert 'Caches kept per worker with 4 workers' in caplog.text
+    assert availability_cache.ttl == 0
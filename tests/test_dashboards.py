@@ -0,0 +1,56 @@
+def _add_fleet(make_scooter, make_rental, start, size):
+    for i in range(start, start + size):
+        scooter = make_scooter(f'SC{i:04d}', status='available' if i % 3 else 'in_use')
+        make_rental(scooter, total_cost=2.0, duration_minutes=5)
+
+
+def test_provider_dashboard_query_count_is_constant(app, client, provider, make_scooter, make_rental,
+                                                    login, count_queries):
+    login(provider)
+
+    _add_fleet(make_scooter, make_rental, 0, 3)
+    with count_queries() as small:
+        response = client.get('/dashboard')
+    assert response.status_code == 200
+
+    _add_fleet(make_scooter, make_rental, 3, 40)
+    with count_queries() as large:
+        response = client.get('/dashboard')
+    assert response.status_code == 200
+
+    assert len(large) == len(small)
+
+
+def test_provider_dashboard_data(app, provider, make_scooter, make_rental):
+    from app.services.dashboard_service import get_provider_dashboard
+
+    _add_fleet(make_scooter, make_rental, 0, 12)
+
+    data = get_provider_dashboard(provider.id)
+
+    assert data['total_scooters'] == 12
+    assert data['available'] == 8
+    assert data['in_use'] == 4
+    assert data['total_revenue'] == 24.0
+    assert len(data['recent_rentals']) == 10
+
+
+def test_fleet_summary_is_cached_until_invalidated(app, make_scooter, make_rental, count_queries):
+    from app.services import scooter_service
+    from app.services.dashboard_service import get_fleet_summary
+
+    scooter = make_scooter('SC0001')
+    make_scooter('SC0002', status='maintenance')
+    make_rental(scooter, status='active')
+
+    with count_queries() as statements:
+        summary = get_fleet_summary()
+        assert get_fleet_summary() is summary
+    assert len(statements) == 3
+    assert summary['total_scooters'] == 2
+    assert summary['maintenance_scooters'] == 1
+    assert summary['active_rentals'] == 1
+
+    scooter_service.set_status(scooter, 'in_use')
+
+    assert get_fleet_summary()['in_use_scooters'] == 1
@@ -0,0 +1,78 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeout
+
+import config
+from app import create_app, db
+from app.utils.db_pool import InstrumentedQueuePool, pool_metrics
+
+
+@pytest.fixture
+def engine(tmp_path):
+    pool_metrics.reset()
+    engine = create_engine(f'sqlite:///{tmp_path}/pool.db', poolclass=InstrumentedQueuePool,
+                           pool_size=1, max_overflow=1, pool_timeout=0.05, pool_pre_ping=True)
+    yield engine
+    engine.dispose()
+
+
+def test_checkouts_overflow_and_timeouts_are_counted(engine):
+    first = engine.connect()
+    second = engine.connect()
+    with pytest.raises(PoolTimeout):
+        engine.connect()
+
+    stats = pool_metrics.snapshot(engine.pool)
+    assert stats['checkouts'] == 2
+    assert stats['overflows'] == 1
+    assert stats['timeouts'] == 1
+    assert stats['wait_ms_max'] >= 40
+    assert (stats['size'], stats['checked_out'], stats['overflow']) == (1, 2, 1)
+
+    first.close()
+    second.close()
+    with engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+    assert pool_metrics.snapshot()['overflows'] == 1
+
+
+def test_invalidated_connections_are_counted(engine):
+    with engine.connect() as connection:
+        connection.invalidate()
+
+    assert pool_metrics.snapshot()['invalidated'] == 1
+
+
+def test_engine_options_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv('DB_POOL_SIZE', '4')
+    monkeypatch.setenv('DB_POOL_PRE_PING', 'false')
+
+    options = config.engine_options(pool_size=10, max_overflow=5)
+
+    assert options['pool_size'] == 4
+    assert options['max_overflow'] == 5
+    assert options['pool_pre_ping'] is False
+    assert config.TestingConfig.SQLALCHEMY_ENGINE_OPTIONS == {}
+
+
+def test_pooled_config_uses_the_instrumented_pool(monkeypatch, tmp_path):
+    class PooledConfig(config.TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path}/app.db'
+        SQLALCHEMY_ENGINE_OPTIONS = config.engine_options(pool_size=2, max_overflow=1)
+
+    monkeypatch.setitem(config.config, 'pooled', PooledConfig)
+    app = create_app('pooled')
+
+    with app.app_context():
+        assert isinstance(db.engine.pool, InstrumentedQueuePool)
+        assert db.engine.pool.size() == 2
+        db.engine.dispose()
+    assert 'poolclass' not in PooledConfig.SQLALCHEMY_ENGINE_OPTIONS
+
+
+def test_admin_reads_pool_stats(app, client, admin, customer, jwt_headers):
+    response = client.get('/api/admin/db-pool', headers=jwt_headers(admin))
+    assert response.status_code == 200
+    assert {'checkouts', 'wait_ms_max', 'overflows', 'timeouts', 'pool'} <= set(response.get_json())
+
+    assert client.get('/api/admin/db-pool', headers=jwt_headers(customer)).status_code == 403
@@ -0,0 +1,65 @@
+import math
+
+import pytest
+
+from app.utils import distance
+from app.utils.distance import bounding_box, haversine_many, nearest, pack_coordinates, top_k
+from app.utils.helpers import calculate_distance
+
+POINTS = [(47.30 + i * 0.0031 % 0.2, 8.45 + i * 0.0047 % 0.2) for i in range(300)]
+
+
+@pytest.fixture(params=['numpy', 'array'])
+def backend(request, monkeypatch):
+    if request.param == 'numpy':
+        if distance.load_numpy() is None:
+            pytest.skip('NumPy is not installed')
+    else:
+        # Load first so the lazy import does not replace the patch
+        distance.load_numpy()
+        monkeypatch.setattr(distance, 'np', None)
+    return request.param
+
+
+def test_haversine_many_matches_scalar(backend):
+    lats, lons = pack_coordinates(POINTS)
+
+    distances = haversine_many(lats, lons, 47.3769, 8.5417)
+
+    for (lat, lon), value in zip(POINTS, distances):
+        assert value == pytest.approx(calculate_distance(47.3769, 8.5417, lat, lon), abs=1e-9)
+
+
+def test_haversine_many_stays_finite_for_antipodal_points(backend):
+    # Rounding puts the haversine term of antipodal points above 1
+    lats, lons = pack_coordinates([(88.37668834417208, 180.0)])
+
+    distances = haversine_many(lats, lons, -88.37668834417208, 0.0)
+
+    assert distances[0] == pytest.approx(distance.EARTH_RADIUS_KM * math.pi)
+
+
+def test_nearest_returns_sorted_top_k(backend):
+    lats, lons = pack_coordinates(POINTS)
+
+    hits = nearest(lats, lons, 47.3769, 8.5417, k=10, max_distance=5.0)
+
+    expected = sorted(
+        (calculate_distance(47.3769, 8.5417, lat, lon), i) for i, (lat, lon) in enumerate(POINTS)
+    )
+    expected = [hit for hit in expected if hit[0] <= 5.0][:10]
+    assert [i for _, i in hits] == [i for _, i in expected]
+
+
+def test_top_k_handles_empty_input(backend):
+    lats, lons = pack_coordinates([])
+    assert top_k(haversine_many(lats, lons, 0.0, 0.0), 5) == []
+
+
+def test_bounding_box_widens_longitude_with_latitude():
+    min_lat, max_lat, min_lon, max_lon = bounding_box(0.0, 10.0, 11.1)
+    assert (max_lat - min_lat) == pytest.approx(0.2)
+    assert (max_lon - min_lon) == pytest.approx(0.2)
+
+    _, _, min_lon, max_lon = bounding_box(60.0, 10.0, 11.1)
+    assert (max_lon - min_lon) == pytest.approx(0.4)
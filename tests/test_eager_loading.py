@@ -0,0 +1,40 @@
+import pytest
+
+from app import db
+from app.models.rental import Rental
+
+
+@pytest.fixture
+def rentals(make_scooter, make_rental):
+    for i in range(15):
+        make_rental(make_scooter(f'SC{i:04d}'))
+    db.session.expire_all()
+
+
+@pytest.mark.parametrize('strategy, limit', [('joined', 1), ('selectin', 2)])
+def test_rental_listing_serializes_with_bounded_queries(app, rentals, assert_max_queries, strategy, limit):
+    app.config['RELATIONSHIP_LOADING_STRATEGY'] = strategy
+
+    with assert_max_queries(limit):
+        data = [r.to_dict() for r in Rental.with_related().order_by(Rental.created_at.desc()).limit(50)]
+
+    assert len(data) == 15
+    assert all(item['scooter']['identifier'].startswith('SC') for item in data)
+
+
+def test_lazy_strategy_issues_one_query_per_row(app, rentals, count_queries):
+    app.config['RELATIONSHIP_LOADING_STRATEGY'] = 'lazy'
+
+    with count_queries() as statements:
+        [r.to_dict() for r in Rental.with_related().all()]
+
+    assert len(statements) == 16
+
+
+def test_rentals_page_for_provider(app, client, provider, rentals, login, assert_max_queries):
+    login(provider)
+
+    with assert_max_queries(4):
+        response = client.get('/rentals/')
+
+    assert response.status_code == 200
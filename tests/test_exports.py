@@ -0,0 +1,33 @@
+import json
+
+
+def test_export_streams_ndjson(app, client, admin, make_scooter, make_rental, jwt_headers):
+    for i in range(7):
+        make_rental(make_scooter(f'SC{i:04d}'))
+
+    response = client.get('/api/export/rentals', headers=jwt_headers(admin))
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(rows) == 7
+    assert rows[0]['scooter']['identifier'] == 'SC0000'
+
+
+def test_export_streams_json_array(app, client, admin, make_scooter, jwt_headers):
+    for i in range(3):
+        make_scooter(f'SC{i:04d}')
+
+    response = client.get('/api/export/scooters?format=json', headers=jwt_headers(admin))
+
+    assert [s['identifier'] for s in response.get_json()['scooters']] == ['SC0000', 'SC0001', 'SC0002']
+
+    empty = client.get('/api/export/payments?format=json', headers=jwt_headers(admin))
+    assert empty.get_json() == {'payments': []}
+
+
+def test_export_requires_admin(app, client, customer, jwt_headers):
+    response = client.get('/api/export/scooters', headers=jwt_headers(customer))
+
+    assert response.status_code == 403
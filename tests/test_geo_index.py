@@ -0,0 +1,102 @@
+from app.services import scooter_service
+from app.utils.geo_index import ScooterGridIndex, scooter_index
+from app.utils.helpers import calculate_distance
+
+
+def test_within_radius_matches_brute_force():
+    index = ScooterGridIndex(cell_size=0.01)
+    points = [(i, 47.30 + (i % 20) * 0.007, 8.50 + (i // 20) * 0.009) for i in range(400)]
+    index.rebuild(points)
+
+    hits = index.within_radius(47.37, 8.54, 1.5)
+
+    expected = sorted(
+        (calculate_distance(47.37, 8.54, lat, lon), i)
+        for i, lat, lon in points
+        if calculate_distance(47.37, 8.54, lat, lon) <= 1.5
+    )
+    assert hits == expected
+
+
+def test_nearest_matches_brute_force():
+    index = ScooterGridIndex(cell_size=0.005)
+    points = [(i, 47.30 + (i % 25) * 0.004, 8.50 + (i // 25) * 0.006) for i in range(500)]
+    index.rebuild(points)
+
+    hits = index.nearest(47.355, 8.561, 7)
+
+    expected = sorted((calculate_distance(47.355, 8.561, lat, lon), i) for i, lat, lon in points)[:7]
+    assert hits == expected
+
+
+def test_sync_follows_status_and_location(app, make_scooter):
+    scooter = make_scooter('SC001')
+    scooter_index.rebuild([])
+
+    scooter_index.sync(scooter)
+    assert [i for _, i in scooter_index.nearest(47.3769, 8.5417, 1)] == [scooter.id]
+
+    scooter_service.update_location(scooter, 47.40, 8.60)
+    assert scooter_index.within_radius(47.3769, 8.5417, 1.0) == []
+    assert [i for _, i in scooter_index.within_radius(47.40, 8.60, 0.1)] == [scooter.id]
+
+    scooter_service.set_status(scooter, 'maintenance')
+    assert len(scooter_index) == 0
+
+
+def test_nearby_endpoint_warms_index(app, make_scooter):
+    from api.scooters import NearbyScootersResource
+
+    near = make_scooter('SC001', 47.3770, 8.5418)
+    far = make_scooter('SC002', 47.3800, 8.5418)
+    make_scooter('SC003', 47.3771, 8.5419, status='maintenance')
+    scooter_index.clear()
+
+    resource = NearbyScootersResource.get.__wrapped__
+    query = '/?latitude=47.3769&longitude=8.5417&radius=2'
+    with app.test_request_context(query):
+        cold, _ = resource(NearbyScootersResource())
+    assert scooter_index.is_warm
+
+    with app.test_request_context(query):
+        warm, _ = resource(NearbyScootersResource())
+
+    assert [s['id'] for s in cold] == [near.id, far.id]
+    assert warm == cold
+
+
+def test_nearby_endpoint_fills_the_limit_past_stale_hits(app, make_scooter):
+    from sqlalchemy import update
+
+    from api.scooters import NearbyScootersResource
+    from app import db
+    from app.models.scooter import Scooter
+
+    stale = [make_scooter(f'SC00{i}', 47.3770 + i * 0.0001, 8.5418) for i in range(3)]
+    far = make_scooter('SC009', 47.3800, 8.5418)
+    scooter_index.rebuild([(s.id, s.latitude, s.longitude) for s in stale + [far]])
+    # Taken out of service behind the index's back, e.g. by another worker
+    db.session.execute(update(Scooter).where(Scooter.id.in_([s.id for s in stale])).values(status='maintenance'))
+    db.session.commit()
+
+    resource = NearbyScootersResource.get.__wrapped__
+    with app.test_request_context('/?latitude=47.3769&longitude=8.5417&radius=2&limit=1'):
+        data, _ = resource(NearbyScootersResource())
+
+    assert [s['id'] for s in data] == [far.id]
+
+
+def test_nearest_scans_linearly_instead_of_walking_to_an_outlier():
+    index = ScooterGridIndex(cell_size=0.01)
+    points = [(i, 47.30 + (i % 10) * 0.01, 8.50 + (i // 10) * 0.01) for i in range(50)]
+    index.rebuild(points + [(99, 0.0, 0.0)])
+
+    rings = []
+    ring_cells = index._ring_cells
+    index._ring_cells = lambda center, ring: rings.append(ring) or ring_cells(center, ring)
+
+    hits = index.nearest(47.355, 8.561, 60)
+
+    assert len(hits) == 51
+    assert hits[-1][1] == 99
+    assert max(rings) < 5
@@ -0,0 +1,106 @@
+from app import db
+from app.services.identity_service import identity_cache
+
+
+def _user_queries(statements):
+    return [s for s in statements if 'FROM users' in s]
+
+
+def test_authorization_checks_need_no_query_once_cached(app, provider, count_queries):
+    identity_cache.get(provider.id)
+
+    with count_queries() as statements:
+        identity = identity_cache.get(str(provider.id))
+        assert (identity.id, identity.is_active) == (provider.id, True)
+        assert identity.can_manage_scooters() and identity.is_provider() and not identity.is_admin()
+
+    assert statements == []
+
+
+def test_other_attributes_load_the_user_once(app, customer, count_queries):
+    identity = identity_cache.get(customer.id)
+    db.session.expunge_all()
+
+    with count_queries() as statements:
+        assert identity.email == 'customer@example.com'
+        assert identity.get_full_name() == 'Carla Customer'
+    assert len(statements) == 1
+
+    identity.first_name = 'Carlotta'
+    db.session.commit()
+    assert identity_cache.get(customer.id).first_name == 'Carlotta'
+
+
+def test_changes_invalidate_after_commit_only(app, customer):
+    assert identity_cache.get(customer.id).role == 'customer'
+
+    customer.role = 'provider'
+    db.session.flush()
+    assert identity_cache.get(customer.id).role == 'customer'
+
+    db.session.commit()
+    assert identity_cache.get(customer.id).role == 'provider'
+
+
+def test_rolled_back_change_keeps_the_cached_identity(app, customer):
+    identity_cache.get(customer.id)
+
+    customer.is_active = False
+    db.session.rollback()
+
+    assert identity_cache.get(customer.id).is_active is True
+
+
+def test_password_change_drops_the_identity(app, customer):
+    identity_cache.get(customer.id)
+    identity_cache.backend.set(identity_cache._key(customer.id), '[0, "admin", true]')
+
+    customer.set_password('another-password')
+    db.session.commit()
+
+    assert identity_cache.get(customer.id).role == 'customer'
+
+
+def test_deactivated_user_is_logged_out(app, client, login, customer):
+    login(customer)
+    assert client.get('/dashboard').status_code == 200
+
+    customer.is_active = False
+    db.session.commit()
+
+    response = client.get('/dashboard')
+    assert response.status_code == 302
+    assert '/login' in response.headers['Location']
+
+
+def test_jwt_admin_check_uses_the_cache(app, client, admin, customer, jwt_headers, count_queries):
+    headers = jwt_headers(admin)
+    client.post('/api/telemetry', headers=headers, json=[])
+
+    with count_queries() as statements:
+        assert client.post('/api/telemetry', headers=headers, json=[]).status_code == 200
+    assert _user_queries(statements) == []
+
+    admin.role = 'customer'
+    db.session.commit()
+    assert client.post('/api/telemetry', headers=headers, json=[]).status_code == 403
+
+
+def test_zero_ttl_disables_caching(app, customer, count_queries):
+    identity_cache.ttl = 0
+    identity_cache.get(customer.id)
+
+    with count_queries() as statements:
+        identity_cache.get(customer.id)
+
+    assert len(_user_queries(statements)) == 1
+
+
+def test_identities_are_not_cached_per_worker_with_several_workers(monkeypatch):
+    import config
+    from app import create_app
+
+    monkeypatch.setitem(config.config, 'workers', type('WorkersConfig', (config.TestingConfig,), {'WEB_CONCURRENCY': 4}))
+    create_app('workers')
+
+    assert identity_cache.ttl == 0
@@ -0,0 +1,119 @@
+import os
+import re
+import time
+
+import pytest
+
+from app import db
+from app.models.payment import Payment
+from app.services import rental_service
+from app.utils.metrics import EXITED_FILE, MetricsRegistry, merge_exited, metrics
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    metrics.clear()
+    yield
+    metrics.clear()
+
+
+def _value(text, series):
+    match = re.search(rf'^{re.escape(series)} (\S+)$', text, re.MULTILINE)
+    return float(match.group(1)) if match else None
+
+
+def test_requests_are_timed_per_endpoint(app, client, customer, jwt_headers):
+    client.get('/api/scooters', headers=jwt_headers(customer))
+    client.get('/api/scooters', headers=jwt_headers(customer))
+    client.get('/no-such-page')
+
+    text = client.get('/metrics').get_data(as_text=True)
+
+    labels = 'blueprint="api",endpoint="api.get_scooters"'
+    assert '# TYPE scootrapid_http_request_duration_seconds histogram' in text
+    assert _value(text, f'scootrapid_http_request_duration_seconds_count{{{labels}}}') == 2
+    assert _value(text, f'scootrapid_http_request_duration_seconds_bucket{{{labels},le="+Inf"}}') == 2
+    assert _value(text, f'scootrapid_http_requests_total{{{labels},method="GET",status="200"}}') == 2
+    assert _value(text, 'scootrapid_http_requests_total{blueprint="",endpoint="unmatched",method="GET",status="404"}') == 1
+
+
+def test_domain_counters_count_committed_changes(app, client, customer, make_scooter, make_rental):
+    scooter = make_scooter('SC001')
+    rental = rental_service.start_rental(customer.id, scooter.id)
+    rental_service.end_rental(rental)
+    rental_service.cancel_rental(make_rental(make_scooter('SC002'), status='active'))
+    make_rental(make_scooter('SC003'))
+
+    payment = Payment(user_id=customer.id, rental_id=rental.id, amount=4.5, payment_method='card')
+    db.session.add(payment)
+    db.session.commit()
+    payment.complete_payment()
+    db.session.rollback()
+    payment.complete_payment()
+    db.session.commit()
+
+    text = client.get('/metrics').get_data(as_text=True)
+    assert _value(text, 'scootrapid_rentals_started_total') == 2
+    assert _value(text, 'scootrapid_rentals_ended_total') == 1
+    assert _value(text, 'scootrapid_rentals_cancelled_total') == 1
+    assert _value(text, 'scootrapid_payments_completed_total') == 1
+
+
+def test_workers_share_their_values_through_the_directory(tmp_path):
+    first = MetricsRegistry(directory=str(tmp_path))
+    second = MetricsRegistry(directory=str(tmp_path))
+    for registry, seconds in ((first, 0.003), (second, 0.2)):
+        registry.inc('scootrapid_rentals_started_total')
+        registry.observe('scootrapid_http_request_duration_seconds', seconds, blueprint='api', endpoint='api.health_check')
+    first.flush()
+
+    # The answering worker reads its own values from memory, not from a stale file
+    second.inc('scootrapid_rentals_started_total')
+    text = second.render()
+
+    assert _value(text, 'scootrapid_rentals_started_total') == 3
+    labels = 'blueprint="api",endpoint="api.health_check"'
+    assert _value(text, f'scootrapid_http_request_duration_seconds_bucket{{{labels},le="0.005"}}') == 1
+    assert _value(text, f'scootrapid_http_request_duration_seconds_bucket{{{labels},le="0.25"}}') == 2
+    assert _value(text, f'scootrapid_http_request_duration_seconds_sum{{{labels}}}') == pytest.approx(0.203)
+
+
+def test_metrics_token_is_required_when_configured(app, client):
+    app.config['METRICS_TOKEN'] = 'scrape-secret'
+
+    assert client.get('/metrics').status_code == 401
+    response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'})
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+
+
+def test_values_are_written_without_further_requests(tmp_path):
+    registry = MetricsRegistry(directory=str(tmp_path), flush_interval=0.01)
+    registry.inc('scootrapid_rentals_started_total')
+
+    reader = MetricsRegistry(directory=str(tmp_path))
+    for _ in range(100):
+        if _value(reader.render(), 'scootrapid_rentals_started_total') == 1:
+            break
+        time.sleep(0.01)
+    assert _value(reader.render(), 'scootrapid_rentals_started_total') == 1
+    # Let the writer thread sleep for the rest of the run
+    registry.flush_interval = 3600
+
+
+def test_exited_workers_are_merged_into_one_file(tmp_path):
+    for _ in range(2):
+        worker = MetricsRegistry(directory=str(tmp_path))
+        worker.inc('scootrapid_rentals_started_total', 2)
+        worker.flush()
+        merge_exited(str(tmp_path), os.getpid())
+
+    assert sorted(os.listdir(tmp_path)) == ['.lock', EXITED_FILE]
+    text = MetricsRegistry(directory=str(tmp_path)).render()
+    assert _value(text, 'scootrapid_rentals_started_total') == 4
+
+
+def test_metrics_are_private_without_a_token_in_production(app, client):
+    app.config['METRICS_PUBLIC'] = False
+
+    assert client.get('/metrics').status_code == 403
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+import pytest
+
+from app.models.scooter import Scooter
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_paginate
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 10, 17, 12, 30, 1, 250)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+
+    with pytest.raises(ValueError):
+        decode_cursor('not-a-cursor')
+
+
+def test_keyset_pages_are_stable_with_equal_timestamps(app, make_scooter):
+    created_at = datetime(2026, 10, 17, 8, 0)
+    ids = [make_scooter(f'SC{i:04d}', created_at=created_at).id for i in range(25)]
+
+    seen = []
+    cursor = None
+    while True:
+        page, cursor = keyset_paginate(Scooter.query, Scooter, cursor, limit=10)
+        seen.extend(s.id for s in page)
+        if cursor is None:
+            break
+
+    assert seen == sorted(ids, reverse=True)
+
+
+def test_json_api_scooters_follow_next_cursor(app, client, provider, make_scooter, jwt_headers):
+    for i in range(5):
+        make_scooter(f'SC{i:04d}')
+    headers = jwt_headers(provider)
+
+    first = client.get('/api/scooters?limit=3', headers=headers).get_json()
+    second = client.get(f"/api/scooters?limit=3&cursor={first['next_cursor']}", headers=headers).get_json()
+
+    assert len(first['scooters']) == 3
+    assert len(second['scooters']) == 2
+    assert second['next_cursor'] is None
+    assert not {s['id'] for s in first['scooters']} & {s['id'] for s in second['scooters']}
+
+    response = client.get('/api/scooters?cursor=garbage', headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,93 @@
+import pytest
+
+from app import db
+from app.services.password_service import PasswordHasher, PasswordHashingBusy, password_hasher
+
+
+@pytest.mark.parametrize('algorithm, cost', [('pbkdf2', 1000), ('bcrypt', 4)])
+def test_hashes_roundtrip(algorithm, cost):
+    hasher = PasswordHasher(algorithm, cost, workers=1, queue=0)
+    stored = hasher.hash('secret-123')
+
+    assert hasher.verify('secret-123', stored)
+    assert not hasher.verify('wrong', stored)
+    assert not hasher.needs_rehash(stored)
+
+
+def test_hashes_of_other_settings_need_rehash_but_still_verify():
+    old = PasswordHasher('pbkdf2', 1000, workers=0).hash('secret-123')
+    hasher = PasswordHasher('bcrypt', 4, workers=0)
+
+    assert hasher.verify('secret-123', old)
+    assert hasher.needs_rehash(old)
+    assert hasher.needs_rehash('not-a-hash')
+    assert not hasher.verify('secret-123', None)
+
+
+def test_bcrypt_reads_passwords_past_72_bytes():
+    import bcrypt
+
+    hasher = PasswordHasher('bcrypt', 4, workers=0)
+    long_password = 'x' * 72
+    stored = hasher.hash(long_password + 'a')
+
+    assert hasher.verify(long_password + 'a', stored)
+    assert not hasher.verify(long_password + 'b', stored)
+
+    # Plain bcrypt hashes verify but are replaced, and never match past 72 bytes
+    plain = bcrypt.hashpw(long_password.encode(), bcrypt.gensalt(rounds=4)).decode()
+    assert hasher.verify(long_password, plain)
+    assert not hasher.verify(long_password + 'b', plain)
+    assert hasher.needs_rehash(plain)
+
+
+def test_login_upgrades_an_outdated_hash(app, login, customer):
+    password_hasher.configure(algorithm='bcrypt', cost=4)
+
+    assert login(customer).status_code == 302
+
+    db.session.expire_all()
+    assert customer.password_hash.startswith('bcrypt-sha256$$2b$04$')
+    assert customer.check_password('test123456')
+
+
+def test_failed_login_keeps_the_hash(app, login, customer):
+    stored = customer.password_hash
+    password_hasher.configure(algorithm='bcrypt', cost=4)
+
+    assert login(customer, password='wrong').status_code == 200
+
+    db.session.expire_all()
+    assert customer.password_hash == stored
+
+
+def test_api_login_upgrades_an_outdated_hash(app, client, customer):
+    password_hasher.configure(cost=2000)
+
+    response = client.post('/api/login', json={'email': customer.email, 'password': 'test123456'})
+    assert response.status_code == 200
+
+    db.session.expire_all()
+    assert customer.password_hash.startswith('pbkdf2:sha256:2000$')
+
+
+def test_full_queue_rejects_logins(app, client, login, customer):
+    password_hasher.configure(workers=1, queue=0)
+    password_hasher._slots.acquire()
+    try:
+        assert login(customer).status_code == 503
+        response = client.post('/api/login', json={'email': customer.email, 'password': 'test123456'})
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+    finally:
+        password_hasher._slots.release()
+
+    assert login(customer).status_code == 302
+
+
+def test_busy_hasher_raises():
+    hasher = PasswordHasher('pbkdf2', 1000, workers=1, queue=0)
+    hasher._slots.acquire()
+
+    with pytest.raises(PasswordHashingBusy):
+        hasher.hash('secret-123')
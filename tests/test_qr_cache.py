@@ -0,0 +1,86 @@
+import pytest
+
+from app.utils import qr_generator
+from app.utils.qr_generator import QRCodeCache, qr_cache, scooter_qr_payload
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Payloads rendered while the test runs"""
+    rendered = []
+    render = qr_generator.render_qr_png
+
+    def counting_render(payload, **options):
+        rendered.append(payload)
+        return render(payload, **options)
+
+    monkeypatch.setattr(qr_generator, 'render_qr_png', counting_render)
+    return rendered
+
+
+def test_png_is_rendered_once_per_payload_and_options(renders):
+    cache = QRCodeCache()
+
+    key, png = cache.get('SR-SCOOTER-1-A')
+    assert cache.get('SR-SCOOTER-1-A') == (key, png)
+    other_key, _ = cache.get('SR-SCOOTER-1-A', fill_color='#27ae60')
+
+    assert png.startswith(b'\x89PNG')
+    assert key != other_key
+    assert renders == ['SR-SCOOTER-1-A', 'SR-SCOOTER-1-A']
+
+
+def test_least_recently_used_entries_are_evicted(renders):
+    cache = QRCodeCache(max_entries=2)
+
+    cache.get('a')
+    cache.get('b')
+    cache.get('a')
+    cache.get('c')
+    cache.get('a')
+    cache.get('b')
+
+    assert renders == ['a', 'b', 'c', 'b']
+
+
+def test_disk_layer_is_shared_between_caches(renders, tmp_path):
+    key, png = QRCodeCache(directory=str(tmp_path)).get('SR-SCOOTER-1-A')
+
+    assert QRCodeCache(directory=str(tmp_path)).get('SR-SCOOTER-1-A') == (key, png)
+    assert renders == ['SR-SCOOTER-1-A']
+    assert QRCodeCache(directory=str(tmp_path)).warm(['SR-SCOOTER-1-A', 'SR-SCOOTER-2-B']) == 1
+
+
+def test_qr_route_serves_png_with_etag(app, client, login, provider, make_scooter):
+    scooter = make_scooter('SC001')
+    login(provider)
+
+    response = client.get(f'/scooters/{scooter.id}/qr.png')
+    assert response.status_code == 200
+    assert response.mimetype == 'image/png'
+    assert response.data.startswith(b'\x89PNG')
+    etag = response.headers['ETag']
+
+    cached = client.get(f'/scooters/{scooter.id}/qr.png', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+    assert client.get('/scooters/9999/qr.png').status_code == 404
+
+
+def test_detail_page_links_the_image_instead_of_inlining_it(app, client, login, provider, make_scooter):
+    scooter = make_scooter('SC001')
+    login(provider)
+
+    page = client.get(f'/scooters/{scooter.id}').data
+
+    assert f'/scooters/{scooter.id}/qr.png'.encode() in page
+    assert b'data:image/png' not in page
+
+
+def test_warm_command_renders_missing_codes(app, make_scooter, renders):
+    scooters = [make_scooter('SC001'), make_scooter('SC002')]
+    qr_cache.clear()
+    runner = app.test_cli_runner()
+
+    assert 'Rendered 2 QR code(s).' in runner.invoke(args=['warm-qr-codes']).output
+    assert 'Rendered 0 QR code(s).' in runner.invoke(args=['warm-qr-codes']).output
+    assert sorted(renders) == sorted(scooter_qr_payload(s) for s in scooters)
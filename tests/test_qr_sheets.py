@@ -0,0 +1,77 @@
+import io
+import zipfile
+
+import pytest
+from PIL import Image
+
+from app.utils import qr_sheets
+
+LABELS = [(f'SR-SCOOTER-{i}-SR-SC{i:03d}', f'SC{i:03d}') for i in range(30)]
+
+
+def test_labels_are_tiled_onto_a4_pages():
+    pages = qr_sheets.render_pages(LABELS, workers=1)
+
+    assert len(pages) == 2
+    assert Image.open(io.BytesIO(pages[0])).size == qr_sheets.PAGE_SIZE
+
+
+def test_pool_renders_the_same_pages_in_order(monkeypatch):
+    monkeypatch.setattr(qr_sheets, 'MIN_PAGES_FOR_POOL', 1)
+    progress = []
+
+    pages = qr_sheets.render_pages(LABELS, workers=2, progress=lambda done, total: progress.append((done, total)))
+
+    assert pages == qr_sheets.render_pages(LABELS, workers=1)
+    assert progress == [(1, 2), (2, 2)]
+
+
+def test_sheets_are_written_as_pdf_or_zip():
+    pages = qr_sheets.render_pages(LABELS, workers=1)
+
+    pdf = qr_sheets.write_sheets(pages, 'pdf')
+    assert pdf.startswith(b'%PDF')
+    assert pdf.count(b'/Type /Page\n') == 2
+
+    archive = zipfile.ZipFile(io.BytesIO(qr_sheets.write_sheets(pages, 'png')))
+    assert archive.namelist() == ['page-0001.png', 'page-0002.png']
+
+    with pytest.raises(ValueError):
+        qr_sheets.write_sheets(pages, 'tiff')
+
+
+def test_admin_downloads_a_providers_sheets(app, client, admin, customer, provider, make_scooter, jwt_headers):
+    for i in range(3):
+        make_scooter(f'SC{i:03d}')
+
+    response = client.get(f'/api/admin/qr-sheets?provider_id={provider.id}', headers=jwt_headers(admin))
+    assert response.status_code == 200
+    assert response.mimetype == 'application/pdf'
+    assert response.headers['X-Scooter-Count'] == '3'
+    assert response.data.startswith(b'%PDF')
+
+    assert client.get('/api/admin/qr-sheets?format=tiff', headers=jwt_headers(admin)).status_code == 400
+    assert client.get(f'/api/admin/qr-sheets?provider_id={admin.id}', headers=jwt_headers(admin)).status_code == 404
+    assert client.get('/api/admin/qr-sheets', headers=jwt_headers(customer)).status_code == 403
+
+
+def test_large_fleets_are_refused_by_the_api(app, client, admin, make_scooter, jwt_headers):
+    app.config['QR_SHEET_MAX_LABELS'] = 2
+    for i in range(3):
+        make_scooter(f'SC{i:03d}')
+
+    response = client.get('/api/admin/qr-sheets', headers=jwt_headers(admin))
+
+    assert response.status_code == 413
+    assert 'flask qr-sheets' in response.get_json()['error']
+
+
+def test_qr_sheets_command(app, make_scooter, tmp_path):
+    make_scooter('SC001')
+    output = tmp_path / 'sheets.zip'
+
+    result = app.test_cli_runner().invoke(args=['qr-sheets', '--format', 'png', '--output', str(output)])
+
+    assert 'Rendered 1/1 pages' in result.output
+    assert f'Wrote 1 QR code(s) to {output}.' in result.output
+    assert zipfile.ZipFile(output).namelist() == ['page-0001.png']
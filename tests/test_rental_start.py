@@ -0,0 +1,125 @@
+import threading
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.models.rental import Rental
+from app.models.scooter import Scooter
+from app.services import rental_service
+from app.services.rental_service import (
+    ActiveRentalExists, ScooterNotFound, ScooterUnavailable, start_rental
+)
+
+
+def test_start_claims_scooter_with_one_commit(app, customer, make_scooter, commits):
+    scooter = make_scooter('SC001')
+    commits.clear()
+
+    rental = start_rental(customer.id, scooter.id)
+
+    assert len(commits) == 1
+    assert rental.status == 'active'
+    assert (rental.start_latitude, rental.start_longitude) == (scooter.latitude, scooter.longitude)
+    assert db.session.get(Scooter, scooter.id).status == 'in_use'
+
+
+def test_start_rejects_unavailable_and_missing_scooters(app, customer, make_scooter):
+    busy = make_scooter('SC001', status='maintenance')
+    empty = make_scooter('SC002', battery_level=10)
+
+    with pytest.raises(ScooterUnavailable):
+        start_rental(customer.id, busy.id)
+    with pytest.raises(ScooterUnavailable):
+        start_rental(customer.id, empty.id)
+    with pytest.raises(ScooterNotFound):
+        start_rental(customer.id, 9999)
+    assert Rental.query.count() == 0
+
+
+def test_second_active_rental_rolls_back_the_claim(app, customer, make_scooter):
+    first = make_scooter('SC001')
+    second = make_scooter('SC002')
+    start_rental(customer.id, first.id)
+
+    with pytest.raises(ActiveRentalExists):
+        start_rental(customer.id, second.id)
+
+    assert db.session.get(Scooter, second.id).status == 'available'
+    assert Rental.query.count() == 1
+
+
+def test_lock_timeouts_are_retried(app, customer, make_scooter, monkeypatch):
+    scooter = make_scooter('SC001')
+    attempts = []
+    original = rental_service._start_rental
+
+    def flaky(*args):
+        attempts.append(args)
+        if len(attempts) < 3:
+            raise OperationalError('UPDATE scooters', {}, Exception('database is locked'))
+        return original(*args)
+
+    monkeypatch.setattr(rental_service, '_start_rental', flaky)
+
+    assert start_rental(customer.id, scooter.id, retries=2).status == 'active'
+    assert len(attempts) == 3
+
+    attempts.clear()
+    with pytest.raises(OperationalError):
+        start_rental(customer.id, scooter.id, retries=1)
+
+
+def test_concurrent_starts_have_exactly_one_winner(tmp_path, monkeypatch):
+    from app import create_app
+    from app.models.user import User
+    from config import TestingConfig, config
+
+    riders = 8
+    database = tmp_path / 'rentals.db'
+    monkeypatch.setitem(config, 'file', type('FileConfig', (TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database}'
+    }))
+    app = create_app('file')
+
+    with app.app_context():
+        db.create_all()
+        users = [User(email=f'rider{i}@example.com', first_name='Rider', last_name=str(i), role='customer')
+                 for i in range(riders + 1)]
+        for user in users:
+            user.password_hash = 'x'
+        db.session.add_all(users)
+        db.session.flush()
+        scooter = Scooter(identifier='SC001', model='Mi Pro 2', brand='Xiaomi',
+                          latitude=47.3769, longitude=8.5417, provider_id=users[-1].id)
+        db.session.add(scooter)
+        db.session.commit()
+        user_ids = [user.id for user in users[:riders]]
+        scooter_id = scooter.id
+
+    barrier = threading.Barrier(riders)
+    outcomes = []
+
+    def rider(user_id):
+        with app.app_context():
+            barrier.wait()
+            try:
+                start_rental(user_id, scooter_id)
+                outcomes.append('won')
+            except ScooterUnavailable:
+                outcomes.append('unavailable')
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=rider, args=(user_id,)) for user_id in user_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(outcomes) == ['unavailable'] * (riders - 1) + ['won']
+    with app.app_context():
+        assert Rental.query.filter_by(scooter_id=scooter_id, status='active').count() == 1
+        assert db.session.get(Scooter, scooter_id).status == 'in_use'
+        db.drop_all()
+        db.engine.dispose()
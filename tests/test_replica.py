@@ -0,0 +1,142 @@
+import pytest
+from sqlalchemy import insert, select, update
+
+import config
+from app import create_app, db
+from app.models.scooter import Scooter
+from app.utils.db_routing import replica_router
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    """App reading from a second SQLite file standing in for the replica"""
+    class ReplicatedConfig(config.TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path}/primary.db'
+        SQLALCHEMY_BINDS = {'replica': f'sqlite:///{tmp_path}/replica.db'}
+
+    monkeypatch.setitem(config.config, 'replicated', ReplicatedConfig)
+    app = create_app('replicated')
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines['replica'])
+        yield app
+        db.session.remove()
+        db.drop_all()
+        db.metadata.drop_all(db.engines['replica'])
+        # init_app registered a metadata for the bind; other apps have no such bind
+        db.metadatas.pop('replica', None)
+
+
+def replicate():
+    """Copy every row of the primary to the replica"""
+    db.session.commit()
+    with db.engines[None].connect() as primary, db.engines['replica'].begin() as replica:
+        for table in db.metadata.sorted_tables:
+            rows = [dict(row._mapping) for row in primary.execute(select(table))]
+            if rows:
+                replica.execute(insert(table), rows)
+
+
+def start_request():
+    """Forget the set-up's objects and writes, as a new request's session would"""
+    db.session.commit()
+    db.session.expunge_all()
+    db.session.info.clear()
+
+
+@pytest.fixture
+def scooter_id(make_scooter, customer):
+    scooter_id = make_scooter('SC001', battery_level=80).id
+    replicate()
+    # The primary moved on, the replica lags behind
+    db.session.execute(update(Scooter).where(Scooter.id == scooter_id).values(battery_level=40))
+    db.session.commit()
+    return scooter_id
+
+
+def battery_level(scooter_id, **options):
+    query = select(Scooter.battery_level).where(Scooter.id == scooter_id)
+    if options.get('for_update'):
+        query = query.with_for_update()
+    return db.session.execute(query).scalar()
+
+
+def test_marked_views_read_from_the_replica(app, client, customer, scooter_id, jwt_headers):
+    headers = jwt_headers(customer)
+    start_request()
+
+    response = client.get(f'/api/scooters/{scooter_id}', headers=headers)
+
+    assert response.get_json()['battery_level'] == 80
+    assert battery_level(scooter_id) == 40
+
+
+def test_writes_and_locking_reads_stay_on_the_primary(app, scooter_id):
+    start_request()
+    with replica_router.reads(db.session()):
+        assert battery_level(scooter_id) == 80
+        assert battery_level(scooter_id, for_update=True) == 40
+
+        db.session.get(Scooter, scooter_id).battery_level = 30
+        db.session.flush()
+        assert battery_level(scooter_id) == 30
+
+    db.session.rollback()
+
+
+def test_users_read_their_own_writes(app, client, customer, scooter_id, jwt_headers):
+    headers = jwt_headers(customer)
+    start_request()
+    assert client.get('/api/rentals', headers=headers).get_json()['rentals'] == []
+
+    response = client.post('/api/rentals/start', headers=headers, json={'scooter_id': scooter_id})
+    assert response.status_code == 201
+
+    # The replica has no rental yet, the user's next reads go to the primary
+    assert len(client.get('/api/rentals', headers=headers).get_json()['rentals']) == 1
+
+    replica_router.backend.clear()
+    assert client.get('/api/rentals', headers=headers).get_json()['rentals'] == []
+
+
+def test_availability_cache_fills_from_the_primary(app, client, customer, make_scooter, jwt_headers):
+    from app.services.availability_service import availability_cache
+
+    scooter_id = make_scooter('SC002', status='maintenance').id
+    replicate()
+    # Back in service on the primary; the commit retired the cached available set
+    db.session.execute(update(Scooter).where(Scooter.id == scooter_id).values(status='available'))
+    db.session.commit()
+    availability_cache.invalidate()
+    headers = jwt_headers(customer)
+    start_request()
+
+    response = client.get('/api/scooters/available', headers=headers)
+
+    assert [scooter['id'] for scooter in response.get_json()['scooters']] == [scooter_id]
+    assert availability_cache.get(scooter_id)['status'] == 'available'
+
+
+def test_fleet_summary_fills_from_the_primary(app, make_scooter):
+    from app.services.dashboard_service import fleet_summary_cache, get_fleet_summary
+
+    scooter_id = make_scooter('SC002', status='maintenance').id
+    replicate()
+    db.session.execute(update(Scooter).where(Scooter.id == scooter_id).values(status='available'))
+    db.session.commit()
+    fleet_summary_cache.clear()
+    start_request()
+
+    with replica_router.reads(db.session()):
+        assert db.session.execute(select(Scooter.status)).scalar() == 'maintenance'
+        summary = get_fleet_summary()
+
+    assert summary['available_scooters'] == 1
+    assert fleet_summary_cache.get_or_set('fleet', dict)['maintenance_scooters'] == 0
+
+
+def test_without_a_replica_bind_everything_reads_the_primary(monkeypatch, tmp_path):
+    monkeypatch.setitem(config.config, 'single', config.TestingConfig)
+    create_app('single')
+
+    assert replica_router.enabled is False
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+from app import db
+from app.models.rental import Rental
+from app.services import rental_service
+from app.services.scheduler import Scheduler, advisory_lock
+
+
+def test_overdue_rentals_are_flagged_with_one_update(app, make_scooter, make_rental, count_queries):
+    now = datetime.utcnow()
+    old = make_rental(make_scooter('SC001', status='in_use'), status='active', start_time=now - timedelta(hours=13))
+    recent = make_rental(make_scooter('SC002', status='in_use'), status='active', start_time=now - timedelta(hours=1))
+    done = make_rental(make_scooter('SC003'), status='completed', start_time=now - timedelta(days=2))
+    ids = (old.id, recent.id, done.id)
+
+    with count_queries() as statements:
+        result = rental_service.flag_overdue_rentals()
+
+    assert result == {'flagged': 1}
+    assert len([s for s in statements if s.startswith('UPDATE')]) == 1
+    assert [db.session.get(Rental, rental_id).status for rental_id in ids] == ['overdue', 'active', 'completed']
+    assert rental_service.flag_overdue_rentals() == {'flagged': 0}
+
+
+def test_overdue_rental_can_still_be_ended(app, make_scooter, make_rental):
+    scooter = make_scooter('SC001', status='in_use')
+    rental = make_rental(scooter, status='overdue', start_time=datetime.utcnow() - timedelta(hours=13))
+
+    assert scooter.get_current_rental().id == rental.id
+    rental_service.end_rental(rental, 47.40, 8.60)
+
+    assert rental.status == 'completed'
+    assert scooter.status == 'available'
+
+
+def test_advisory_lock_is_exclusive(app):
+    with advisory_lock('scootrapid:test') as first:
+        with advisory_lock('scootrapid:test') as second:
+            assert (first, second) == (True, False)
+    with advisory_lock('scootrapid:test') as again:
+        assert again
+
+
+def test_jobs_run_when_due_and_skip_when_locked(app):
+    scheduler = Scheduler()
+    calls = []
+    scheduler.add_job('count', lambda: calls.append(1) or {'calls': len(calls)}, interval=60)
+
+    assert scheduler.run_pending(now=1000) == {'count': {'calls': 1}}
+    assert scheduler.run_pending(now=1030) == {}
+    with advisory_lock('scootrapid:job:count'):
+        assert scheduler.run_pending(now=1060) == {'count': None}
+    assert scheduler.run_pending(now=1120) == {'count': {'calls': 2}}
+
+
+def test_failing_job_does_not_stop_the_others(app):
+    scheduler = Scheduler()
+    scheduler.add_job('broken', lambda: 1 / 0, interval=60)
+    scheduler.add_job('fine', lambda: 'ok', interval=60)
+
+    assert scheduler.run_pending(now=0) == {'fine': 'ok'}
+
+
+def test_run_jobs_once_command(app, make_scooter, make_rental):
+    make_rental(make_scooter('SC001', status='in_use'), status='active',
+                start_time=datetime.utcnow() - timedelta(hours=13))
+
+    result = app.test_cli_runner().invoke(args=['run-jobs', '--once'])
+
+    assert "flag_overdue_rentals: {'flagged': 1}" in result.output
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+
+def test_rental_stats_aggregates_in_one_query(app, make_scooter, make_rental, count_queries):
+    scooter = make_scooter('SC001', created_at=datetime.utcnow() - timedelta(days=10))
+    make_rental(scooter, total_cost=10.5, duration_minutes=30, rating=4)
+    make_rental(scooter, total_cost=4.5, duration_minutes=10, rating=2)
+    make_rental(scooter, total_cost=3.0, duration_minutes=5)
+    make_rental(scooter, total_cost=2.0, duration_minutes=3, rating=0)
+    make_rental(scooter, status='cancelled', total_cost=1.5, duration_minutes=2, rating=1)
+    make_rental(scooter, status='active')
+    assert scooter.created_at  # load the scooter row outside the counted block
+
+    with count_queries() as statements:
+        stats = scooter.get_rental_stats()
+
+    assert len(statements) == 1
+    assert stats['rental_count'] == 6
+    assert stats['completed_rentals'] == 4
+    assert stats['total_revenue'] == 20.0
+    assert stats['rented_minutes'] == 48
+    assert stats['avg_rating'] == 3.0
+    assert stats['total_ratings'] == 2
+    assert stats['utilization_rate'] == 48 / (10 * 24 * 60) * 100
+
+
+def test_rental_stats_are_reused_until_commit(app, make_scooter, make_rental, count_queries):
+    scooter = make_scooter('SC001')
+    make_rental(scooter, total_cost=10.0, duration_minutes=30)
+    assert scooter.created_at
+
+    with count_queries() as statements:
+        assert scooter.get_total_revenue() == 10.0
+        assert scooter.get_utilization_rate() > 0
+        assert scooter.get_rental_stats()['completed_rentals'] == 1
+    assert len(statements) == 1
+
+    make_rental(scooter, total_cost=5.0, duration_minutes=10)
+    assert scooter.get_total_revenue() == 15.0
+
+
+def test_changing_rental_stats_leaves_the_cached_result_alone(app, make_scooter):
+    scooter = make_scooter('SC001')
+
+    scooter.get_rental_stats()['needs_maintenance'] = True
+
+    assert 'needs_maintenance' not in scooter.get_rental_stats()
+
+
+def test_rental_stats_without_rentals(app, make_scooter):
+    scooter = make_scooter('SC001')
+
+    stats = scooter.get_rental_stats()
+
+    assert stats['rental_count'] == 0
+    assert stats['total_revenue'] == 0.0
+    assert stats['utilization_rate'] == 0.0
+    assert stats['avg_rating'] == 0
+    assert scooter.get_total_revenue() == 0.0
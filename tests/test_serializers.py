@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models.payment import Payment
+from app.models.rental import Rental
+from app.models.scooter import Scooter
+from app.models.serializers import payment_serializer, rental_serializer, scooter_serializer, user_serializer
+from app.models.user import User
+
+
+@pytest.fixture
+def fleet(make_scooter, make_rental):
+    scooter = make_scooter('SC0001', battery_level=10, last_maintenance=datetime(2026, 9, 1))
+    make_scooter('SC0002', address='Bahnhofstrasse 1')
+    rental = make_rental(scooter, total_cost=4.2, duration_minutes=9, rating=5, feedback='Super',
+                         end_time=datetime.utcnow())
+    make_rental(scooter, status='active', start_time=datetime.utcnow() - timedelta(minutes=3))
+    orphan = make_rental(scooter)
+    orphan.scooter_id = None
+    db.session.add(Payment(user_id=rental.user_id, rental_id=rental.id, amount=4.2, payment_method='card'))
+    db.session.commit()
+
+
+@pytest.mark.parametrize('serializer, model', [
+    (scooter_serializer, Scooter),
+    (rental_serializer, Rental),
+    (payment_serializer, Payment),
+    (user_serializer, User)
+])
+@pytest.mark.parametrize('include_sensitive', [False, True])
+def test_serializer_matches_to_dict(app, fleet, serializer, model, include_sensitive):
+    expected = [obj.to_dict(include_sensitive=include_sensitive) for obj in model.query.order_by(model.id)]
+
+    rows = serializer.query(include_sensitive).order_by(model.id).all()
+
+    assert serializer.dump_all(rows, include_sensitive) == expected
+
+
+def test_serializer_selects_only_needed_columns(app):
+    statement = str(scooter_serializer.query().statement)
+
+    assert 'qr_code' not in statement
+    assert 'qr_code' in str(scooter_serializer.query(include_sensitive=True).statement)
@@ -0,0 +1,59 @@
+import logging
+import re
+
+from app.utils.sql_profiler import sql_profiler
+
+
+def _server_timing(response):
+    match = re.match(r'db;dur=([\d.]+);desc="(\d+) queries", total;dur=([\d.]+)', response.headers['Server-Timing'])
+    assert match, response.headers['Server-Timing']
+    return float(match.group(1)), int(match.group(2)), float(match.group(3))
+
+
+def test_requests_report_their_statements(app, client, customer, make_scooter, jwt_headers, count_queries):
+    make_scooter('SC001')
+    headers = jwt_headers(customer)
+
+    with count_queries() as statements:
+        response = client.get('/api/scooters', headers=headers)
+
+    db_ms, queries, total_ms = _server_timing(response)
+    assert queries == len(statements)
+    assert 0 < db_ms <= total_ms
+
+
+def test_endpoint_totals_keep_the_slowest_statement(app, client, admin, customer, make_scooter, jwt_headers):
+    sql_profiler.reset()
+    make_scooter('SC001')
+    for _ in range(2):
+        client.get('/api/scooters', headers=jwt_headers(customer))
+
+    endpoints = client.get('/api/admin/sql-profile', headers=jwt_headers(admin)).get_json()['endpoints']
+    stats = next(stats for stats in endpoints if stats['endpoint'] == 'api.get_scooters')
+    assert stats['requests'] == 2
+    assert stats['statements'] >= 2
+    assert 'scooters' in stats['slowest_statement']
+
+    assert client.get('/api/admin/sql-profile', headers=jwt_headers(customer)).status_code == 403
+
+
+def test_unsampled_requests_are_not_profiled(app, client, customer, jwt_headers):
+    sql_profiler.reset()
+    sql_profiler.configure(sample_rate=0)
+
+    response = client.get('/api/scooters', headers=jwt_headers(customer))
+
+    assert 'Server-Timing' not in response.headers
+    assert sql_profiler.snapshot() == []
+
+
+def test_slow_queries_are_logged_with_their_call_site(app, client, customer, jwt_headers, caplog):
+    sql_profiler.configure(slow_threshold_ms=0)
+
+    with caplog.at_level(logging.WARNING):
+        client.get('/api/scooters', headers=jwt_headers(customer))
+
+    messages = [record.getMessage() for record in caplog.records if record.getMessage().startswith('Slow query')]
+    # The innermost application frame: the pagination helper the view calls
+    assert any(re.search(r'at app/utils/pagination\.py:\d+ in keyset_paginate: SELECT scooters', message)
+               for message in messages)
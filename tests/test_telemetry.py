@@ -0,0 +1,126 @@
+import json
+
+from app import db
+from app.models.scooter import Scooter
+from app.services import telemetry_service
+
+
+def _report(identifier, ts, lat=47.40, lon=8.60, battery_level=None):
+    report = {'identifier': identifier, 'lat': lat, 'lon': lon, 'ts': ts}
+    if battery_level is not None:
+        report['battery_level'] = battery_level
+    return report
+
+
+def test_json_batch_updates_positions_and_battery(app, client, admin, make_scooter, jwt_headers):
+    first = make_scooter('SC001')
+    second = make_scooter('SC002')
+
+    response = client.post('/api/telemetry', headers=jwt_headers(admin), json={'reports': [
+        _report('sc001', '2026-10-17T10:00:00Z', battery_level=55),
+        _report('SC002', 1792231200, lat=47.41, lon=8.61),
+        _report('SC999', '2026-10-17T10:00:00Z'),
+        {'identifier': 'SC001', 'lat': 'north'}
+    ]})
+
+    assert response.status_code == 200
+    stats = response.get_json()
+    assert {k: stats[k] for k in ('received', 'applied', 'stale', 'rejected', 'unknown', 'chunks')} == {
+        'received': 4, 'applied': 2, 'stale': 0, 'rejected': 1, 'unknown': 1, 'chunks': 1
+    }
+    assert stats['rows_per_second'] > 0
+
+    first = db.session.get(Scooter, first.id)
+    assert (first.latitude, first.longitude, first.battery_level) == (47.40, 8.60, 55)
+    assert first.last_seen_at.isoformat() == '2026-10-17T10:00:00'
+    assert db.session.get(Scooter, second.id).battery_level == 100
+
+
+def test_ndjson_batch(app, client, admin, make_scooter, jwt_headers):
+    scooter = make_scooter('SC001')
+    body = '\n'.join(json.dumps(_report('SC001', f'2026-10-17T10:00:0{i}', lat=47.0 + i)) for i in range(3))
+
+    response = client.post('/api/telemetry', headers=jwt_headers(admin), data=body,
+                           content_type='application/x-ndjson')
+
+    assert response.get_json()['applied'] == 1
+    assert response.get_json()['stale'] == 2
+    assert db.session.get(Scooter, scooter.id).latitude == 49.0
+
+
+def test_out_of_order_reports_are_dropped(app, make_scooter):
+    scooter = make_scooter('SC001')
+
+    telemetry_service.ingest([_report('SC001', '2026-10-17T10:00:05', lat=47.5)])
+    stats = telemetry_service.ingest([_report('SC001', '2026-10-17T10:00:01', lat=47.1)])
+
+    assert (stats['applied'], stats['stale']) == (0, 1)
+    assert db.session.get(Scooter, scooter.id).latitude == 47.5
+
+
+def test_batches_are_committed_in_chunks(app, make_scooter, commits):
+    for i in range(5):
+        make_scooter(f'SC{i:03d}')
+    commits.clear()
+
+    stats = telemetry_service.ingest(
+        [_report(f'SC{i:03d}', '2026-10-17T10:00:00', battery_level=40) for i in range(5)], chunk_size=2
+    )
+
+    assert (stats['applied'], stats['chunks']) == (5, 3)
+    assert len(commits) == 3
+    assert Scooter.query.filter_by(battery_level=40).count() == 5
+
+
+def test_applied_reports_reach_the_availability_cache(app, make_scooter):
+    from app.services.availability_service import availability_cache
+
+    scooter = make_scooter('SC001')
+    availability_cache.available()
+
+    telemetry_service.ingest([_report('SC001', '2026-10-17T10:00:00', battery_level=10)])
+
+    state = availability_cache.get(scooter.id)
+    assert (state['latitude'], state['battery_level'], state['is_available']) == (47.40, 10, False)
+    assert availability_cache.available(min_battery=15) == []
+
+
+def test_drivers_without_multi_rowcount_keep_the_batch_path(app, make_scooter, monkeypatch):
+    from sqlalchemy import event
+    from app.services.availability_service import availability_cache
+
+    monkeypatch.setattr(db.engine.dialect, 'supports_sane_multi_rowcount', False)
+    first = make_scooter('SC001')
+    second = make_scooter('SC002')
+    availability_cache.available()
+    forgotten = []
+    monkeypatch.setattr(availability_cache, 'forget', forgotten.extend)
+
+    raced = []
+
+    def concurrent_batch(conn, cursor, statement, parameters, context, executemany):
+        # A newer report of SC002 lands between the read and the UPDATE
+        if statement.startswith('UPDATE scooters') and not raced:
+            raced.append(second.id)
+            cursor.execute("UPDATE scooters SET latitude = 47.6, last_seen_at = '2026-10-17 10:00:09.000000' "
+                           "WHERE id = ?", (second.id,))
+
+    event.listen(db.engine, 'before_cursor_execute', concurrent_batch)
+    try:
+        stats = telemetry_service.ingest([
+            _report('SC001', '2026-10-17T10:00:00', battery_level=70),
+            _report('SC002', '2026-10-17T10:00:05', lat=47.1)
+        ])
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', concurrent_batch)
+
+    assert (stats['applied'], stats['stale']) == (1, 1)
+    assert availability_cache.get(first.id)['battery_level'] == 70
+    assert db.session.get(Scooter, second.id).latitude == 47.6
+    assert forgotten == [second.id]
+
+
+def test_telemetry_requires_admin(app, client, customer, jwt_headers):
+    response = client.post('/api/telemetry', headers=jwt_headers(customer), json=[])
+
+    assert response.status_code == 403
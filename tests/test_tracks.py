@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models.scooter_track import ScooterTrack
+from app.services import rental_service, telemetry_service, track_service
+from app.services.transaction import transaction
+from app.utils.distance import path_length_km
+from app.utils.tracks import downsample, pack_points, unpack_points
+
+HOUR = datetime(2026, 10, 17, 10)
+
+
+def _record(points):
+    with transaction():
+        track_service.record(points)
+
+
+def test_packed_points_roundtrip_in_time_order():
+    blob = pack_points([(30.0, 47.2, 8.2)]) + pack_points([(10.0, 47.1, 8.1), (20.0, 47.15, 8.15)])
+
+    offsets, lats, lons = unpack_points(blob)
+
+    assert list(offsets) == [10.0, 20.0, 30.0]
+    assert list(lats) == [47.1, 47.15, 47.2]
+    assert list(lons) == [8.1, 8.15, 8.2]
+
+
+def test_path_length_follows_the_points():
+    # Roughly 11.1 km per 0.1 degree of latitude
+    assert path_length_km([47.0, 47.1, 47.0], [8.0, 8.0, 8.0]) == pytest.approx(22.24, abs=0.01)
+    assert path_length_km([47.0], [8.0]) == 0.0
+
+
+def test_appends_are_concatenated_per_hour(app, make_scooter):
+    scooter = make_scooter('SC001')
+
+    _record([(scooter.id, HOUR + timedelta(minutes=1), 47.1, 8.1)])
+    _record([
+        (scooter.id, HOUR + timedelta(minutes=2), 47.2, 8.2),
+        (scooter.id, HOUR + timedelta(hours=1), 47.3, 8.3)
+    ])
+
+    buckets = ScooterTrack.query.order_by(ScooterTrack.bucket_start).all()
+    assert [(b.bucket_start, b.point_count) for b in buckets] == [(HOUR, 2), (HOUR + timedelta(hours=1), 1)]
+    offsets, lats, _ = unpack_points(buckets[0].points)
+    assert (list(offsets), list(lats)) == ([60.0, 120.0], [47.1, 47.2])
+
+
+def test_telemetry_records_at_most_one_point_per_interval(app, make_scooter):
+    app.config['TRACK_MIN_INTERVAL'] = 10
+    scooter = make_scooter('SC001')
+
+    for second in (0, 4, 8, 12, 16, 20):
+        telemetry_service.ingest([{
+            'identifier': 'SC001', 'lat': 47.0 + second / 1000, 'lon': 8.0,
+            'ts': (HOUR + timedelta(seconds=second)).isoformat()
+        }])
+
+    lats, _ = track_service.track(scooter.id, HOUR, HOUR + timedelta(minutes=1))
+    assert lats == [47.0, 47.012, 47.02]
+
+
+def test_ending_a_rental_measures_the_track(app, make_scooter, make_rental):
+    scooter = make_scooter('SC001', latitude=47.0, longitude=8.0, status='in_use')
+    started = datetime.utcnow() - timedelta(minutes=10)
+    rental = make_rental(scooter, status='active', start_time=started)
+    _record([
+        (scooter.id, started + timedelta(minutes=3), 47.1, 8.0),
+        (scooter.id, started + timedelta(minutes=6), 47.0, 8.0),
+        # Outside the rental
+        (scooter.id, started - timedelta(minutes=1), 48.0, 8.0)
+    ])
+
+    rental_service.end_rental(rental, 47.05, 8.0)
+
+    assert db.session.get(type(rental), rental.id).distance_km == pytest.approx(27.80, abs=0.01)
+
+
+def test_distance_reads_a_bounded_number_of_points(app, make_scooter):
+    app.config['TRACK_MAX_DISTANCE_POINTS'] = 100
+    scooter = make_scooter('SC001')
+    _record([(scooter.id, HOUR + timedelta(seconds=i), 47.0 + i / 10000, 8.0) for i in range(1000)])
+
+    lats, lons = track_service.track(scooter.id, HOUR, HOUR + timedelta(hours=1))
+
+    assert len(lats) <= 100
+    assert lats[-1] == 47.0 + 999 / 10000
+    # A straight track loses no length when thinned out
+    assert path_length_km(lats, lons) == pytest.approx(path_length_km([47.0, 47.0999], [8.0, 8.0]), rel=0.02)
+
+
+def test_compaction_downsamples_old_buckets_only(app, make_scooter):
+    scooter = make_scooter('SC001')
+    now = datetime.utcnow()
+    old = track_service.bucket_start(now - timedelta(days=3))
+    _record([(scooter.id, old + timedelta(seconds=5 * i), 47.0, 8.0 + i / 1000) for i in range(720)])
+    _record([(scooter.id, now, 47.0, 8.0), (scooter.id, now, 47.0, 8.0)])
+
+    stats = track_service.compact(resolution=60, batch_size=1)
+
+    assert stats == {'buckets': 1, 'points_before': 720, 'points_after': 60}
+    bucket = ScooterTrack.query.filter_by(bucket_start=old).one()
+    offsets, _, lons = unpack_points(bucket.points)
+    assert bucket.point_count == len(offsets) == 60
+    assert offsets[-1] == 3595.0 and lons[-1] == pytest.approx(8.719)
+    assert track_service.compact(resolution=60)['buckets'] == 0
+
+
+def test_downsample_keeps_last_point_per_slot():
+    assert downsample([0, 30, 59, 61], [1, 2, 3, 4], [5, 6, 7, 8], 60) == [(59.0, 3.0, 7.0), (61.0, 4.0, 8.0)]
+
+
+def test_compact_tracks_command(app, make_scooter):
+    scooter = make_scooter('SC001')
+    _record([(scooter.id, HOUR + timedelta(seconds=i), 47.0, 8.0) for i in range(120)])
+
+    result = app.test_cli_runner().invoke(args=['compact-tracks', '--hours', '0'])
+
+    assert 'Compacted 1 bucket(s): 120 -> 2 points.' in result.output
@@ -0,0 +1,67 @@
+import pytest
+
+from app import db
+from app.models.rental import Rental
+from app.models.scooter import Scooter
+from app.services import rental_service
+from app.services.transaction import after_commit, transaction
+
+
+def test_nested_blocks_commit_once_then_run_callbacks(app, make_scooter, commits):
+    scooter = make_scooter('SC001')
+    commits.clear()
+    calls = []
+
+    with transaction():
+        scooter.set_battery_level(40)
+        with transaction():
+            scooter.set_status('maintenance')
+            after_commit(lambda: calls.append(len(commits)))
+        assert commits == []
+
+    assert len(commits) == 1
+    assert calls == [1]
+
+
+def test_failed_block_rolls_back_and_drops_callbacks(app, make_scooter, commits):
+    scooter = make_scooter('SC001')
+    commits.clear()
+    calls = []
+
+    with pytest.raises(ValueError):
+        with transaction():
+            scooter.set_battery_level(40)
+            after_commit(calls.append, 'published')
+            scooter.set_status('broken')
+
+    assert commits == []
+    assert calls == []
+    assert db.session.get(Scooter, scooter.id).battery_level == 100
+
+
+@pytest.mark.parametrize('operation, status', [
+    (lambda rental: rental_service.end_rental(rental, 47.40, 8.60), 'completed'),
+    (lambda rental: rental_service.cancel_rental(rental), 'cancelled')
+])
+def test_rental_operations_commit_once(app, make_scooter, make_rental, commits, operation, status):
+    scooter = make_scooter('SC001', status='in_use')
+    rental = make_rental(scooter, status='active')
+    commits.clear()
+
+    operation(rental)
+
+    assert len(commits) == 1
+    assert db.session.get(Rental, rental.id).status == status
+    assert db.session.get(Scooter, scooter.id).status == 'available'
+
+
+def test_rejected_operation_changes_nothing(app, make_scooter, make_rental, commits):
+    scooter = make_scooter('SC001', status='in_use')
+    rental = make_rental(scooter, status='completed')
+    commits.clear()
+
+    with pytest.raises(ValueError):
+        rental_service.end_rental(rental)
+
+    assert commits == []
+    assert db.session.get(Scooter, scooter.id).status == 'in_use'